@@ -22,6 +22,7 @@ import os
 import six
 import argparse
 import pkgutil
+import functools
 from . import subcommands
 
 def import_func(path):
@@ -44,24 +45,35 @@ def add_subcommands(subparsers):
         func = import_func("quantrocket._cli.subcommands.{0}.add_subparser".format(service))
         func(subparsers)
 
-def handle_error(msg):
-    import logging
+@functools.lru_cache(maxsize=None)
+def _get_service_name():
+    """
+    Return the name of the service this process is running in, from the
+    QUANTROCKET_SERVICE_NAME environment variable or else the servicename
+    command, or "cli" if neither is available.
+    """
+    servicename = os.environ.get("QUANTROCKET_SERVICE_NAME")
+    if servicename:
+        return servicename
+
     import subprocess
-    import os.path
-    from ..flightlog import FlightlogHandler
     servicename_path = "/opt/conda/bin/servicename"
     if os.path.exists(servicename_path):
-        servicename = subprocess.check_output([servicename_path], universal_newlines=True).strip()
-    else:
-        servicename = "cli"
-    logger = logging.getLogger("quantrocket.{0}".format(servicename))
+        return subprocess.check_output([servicename_path], universal_newlines=True).strip()
+
+    return "cli"
+
+def handle_error(msg):
+    import logging
+    from ..flightlog import FlightlogHandler
+    logger = logging.getLogger("quantrocket.{0}".format(_get_service_name()))
     handler = FlightlogHandler(background=False)
     logger.addHandler(handler)
-    logger.error("Error running {0}".format(" ".join(sys.argv)))
     if not isinstance(msg, six.string_types):
         msg = repr(msg)
-    for l in msg.splitlines():
-        logger.error(l)
+    # send the error and traceback as one multi-line record, so that they
+    # are sent in one request
+    logger.error("Error running {0}\n{1}".format(" ".join(sys.argv), msg.rstrip("\n")))
 
 class ArgumentParser(argparse.ArgumentParser):
     """
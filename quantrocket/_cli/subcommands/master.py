@@ -520,6 +520,52 @@ terminal display:
         'to see all available fields.').completer = completers.master_fields_completer
     parser.set_defaults(func="quantrocket.master._cli_download_master_file")
 
+    examples = """
+Create or update a local replica of the securities master database, for
+answering master file queries without a request to the master service.
+
+The replica is a SQLite database containing all master fields, with indexes
+on Sid, Symbol, Exchange, and universe membership. Syncing an existing
+replica only rewrites securities whose details have changed and removes
+securities that no longer exist.
+
+The replica is opt-in. Set the QUANTROCKET_MASTER_REPLICA environment variable
+to the path of the replica to have master file queries answered from the
+replica, where possible. Re-sync the replica after collecting listings.
+
+Notes
+-----
+Usage Guide:
+
+* Master file: https://qrok.it/dl/qr/master-file
+
+Examples
+--------
+
+Sync the replica to the path in QUANTROCKET_MASTER_REPLICA:
+
+.. code-block:: bash
+
+    quantrocket master sync-replica
+
+Sync the replica to a specific path:
+
+.. code-block:: bash
+
+    quantrocket master sync-replica -f /codeload/.master-replica.sqlite
+    """
+    parser = _subparsers.add_parser(
+        "sync-replica",
+        help="create or update a local replica of the securities master database",
+        epilog=examples,
+        formatter_class=HelpFormatter)
+    parser.add_argument(
+        "-f", "--filepath",
+        metavar="FILEPATH",
+        help="path to the SQLite database file (defaults to the path in the "
+        "QUANTROCKET_MASTER_REPLICA environment variable)")
+    parser.set_defaults(func="quantrocket.master._cli_sync_master_replica")
+
     examples = """
 List exchanges by security type and country as found on the IBKR website.
 
@@ -1037,6 +1083,13 @@ Check whether CME will be open or closed in 30 minutes:
         action="store_true",
         help="check extended hours calendar (default is to check regular "
         "trading hours calendar)")
+    parser.add_argument(
+        "-c", "--cache",
+        action="store_true",
+        dest="use_cache",
+        help="answer from a local cache of calendar statuses where possible, "
+        "only querying the master service for exchanges that aren't cached "
+        "or whose cached status has expired")
     parser.set_defaults(func="quantrocket.master._cli_list_calendar_statuses")
 
     examples = """
@@ -1070,6 +1123,14 @@ Log a message if the London Stock Exchange will be open in 30 minutes:
 .. code-block:: bash
 
     quantrocket master isopen LSE --in 30min && quantrocket flightlog log 'the market opens soon!'
+
+Place Moonshot orders if NYSE is open now, using the local calendar cache
+to avoid querying the master service every time the command runs (for
+example from a crontab that runs every minute):
+
+.. code-block:: bash
+
+    quantrocket master isopen NYSE --cache && quantrocket moonshot orders my-strategy | quantrocket blotter order -f -
     """
     sectype_choices = ["STK", "FUT", "CASH", "OPT"]
     parser = _subparsers.add_parser(
@@ -1123,6 +1184,13 @@ Log a message if the London Stock Exchange will be open in 30 minutes:
         action="store_true",
         help="check extended hours calendar (default is to check regular "
         "trading hours calendar)")
+    parser.add_argument(
+        "-c", "--cache",
+        action="store_true",
+        dest="use_cache",
+        help="answer from a local cache of calendar statuses where possible, "
+        "only querying the master service for exchanges that aren't cached "
+        "or whose cached status has expired")
     parser.set_defaults(func="quantrocket.master._cli_isopen")
 
     examples = """
@@ -1221,6 +1289,13 @@ Place Moonshot orders if the NYSE will be closed in 1 hour and remain closed thr
         action="store_true",
         help="check extended hours calendar (default is to check regular "
         "trading hours calendar)")
+    parser.add_argument(
+        "-c", "--cache",
+        action="store_true",
+        dest="use_cache",
+        help="answer from a local cache of calendar statuses where possible, "
+        "only querying the master service for exchanges that aren't cached "
+        "or whose cached status has expired")
     parser.set_defaults(func="quantrocket.master._cli_isclosed")
 
     examples = """
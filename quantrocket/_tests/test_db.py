@@ -0,0 +1,464 @@
+# Copyright 2017-2024 QuantRocket LLC - All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# To run: pytest path/to/quantrocket/tests -v
+
+import io
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import types
+import unittest
+try:
+    from unittest.mock import patch, MagicMock
+except ImportError:
+    # py27
+    from mock import patch, MagicMock
+import pandas as pd
+import numpy as np
+from quantrocket.db import (
+    connect_sqlite,
+    insert_or_fail,
+    insert_or_replace,
+    insert_or_ignore,
+    insert_stream,
+    read_table)
+from quantrocket.exceptions import DataInsertionError, ParameterError
+
+class ConnectSqliteTestCase(unittest.TestCase):
+    """
+    Tests for connect_sqlite with a mock sqlalchemy module.
+    """
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tempdir)
+        self.db_path = os.path.join(self.tempdir, "custom.sqlite")
+
+        # engine: list of connect listeners
+        self.listeners = {}
+
+        def create_engine(url, connect_args=None):
+            engine = MagicMock(name=url)
+            self.listeners[engine] = []
+            return engine
+
+        def listens_for(target, identifier):
+            def decorator(fn):
+                self.assertEqual(identifier, "connect")
+                self.listeners[target].append(fn)
+                return fn
+            return decorator
+
+        self.mock_create_engine = MagicMock(side_effect=create_engine)
+
+        sqlalchemy = types.ModuleType("sqlalchemy")
+        sqlalchemy.create_engine = self.mock_create_engine
+        sqlalchemy.event = types.SimpleNamespace(listens_for=listens_for)
+
+        modules = patch.dict(sys.modules, {"sqlalchemy": sqlalchemy})
+        modules.start()
+        self.addCleanup(modules.stop)
+
+        engines = patch.dict("quantrocket.db._sqlite_engines", clear=True)
+        engines.start()
+        self.addCleanup(engines.stop)
+
+    def _get_pragmas(self, engine, names):
+        """
+        Run the engine's connect listeners on a new sqlite3 connection and
+        return the resulting PRAGMA values.
+        """
+        db = sqlite3.connect(self.db_path)
+        try:
+            for listener in self.listeners[engine]:
+                listener(db, None)
+            return dict(
+                (name, db.execute("PRAGMA {0}".format(name)).fetchone()[0])
+                for name in names)
+        finally:
+            db.close()
+
+    def test_profiles(self):
+        """
+        Tests that the connect listener applies each profile's PRAGMAs.
+        """
+        engine = connect_sqlite(self.db_path)
+        self.mock_create_engine.assert_called_once_with(
+            "sqlite:///{0}".format(self.db_path), connect_args={"isolation_level": None})
+        # connects right away
+        engine.connect.assert_called_once_with()
+
+        self.assertDictEqual(
+            self._get_pragmas(
+                engine, ["synchronous", "cache_size", "temp_store", "busy_timeout", "journal_mode"]),
+            {"synchronous": 0, "cache_size": 50000, "temp_store": 2,
+             "busy_timeout": 10000, "journal_mode": "delete"})
+
+        engine = connect_sqlite(self.db_path, profile="bulk_write")
+        self.assertDictEqual(
+            self._get_pragmas(engine, ["synchronous", "cache_size", "journal_mode"]),
+            {"synchronous": 0, "cache_size": 200000, "journal_mode": "wal"})
+
+        engine = connect_sqlite(self.db_path, profile="read", pragmas={"cache_size": 1000})
+        pragmas = self._get_pragmas(engine, ["cache_size", "journal_mode", "busy_timeout"])
+        self.assertEqual(pragmas["cache_size"], 1000)
+        self.assertEqual(pragmas["journal_mode"], "wal")
+        self.assertEqual(pragmas["busy_timeout"], 10000)
+
+        # mmap_size reads back capped at SQLite's compile-time maximum, so
+        # check the statement instead
+        dbapi_connection = MagicMock()
+        for listener in self.listeners[engine]:
+            listener(dbapi_connection, None)
+        dbapi_connection.cursor.return_value.execute.assert_any_call(
+            "PRAGMA mmap_size = 8589934592")
+        dbapi_connection.cursor.return_value.close.assert_called_once_with()
+
+        with self.assertRaises(ParameterError) as cm:
+            connect_sqlite(self.db_path, profile="fast")
+
+        self.assertIn("profile must be one of default, read, bulk_write", repr(cm.exception))
+
+    def test_cache(self):
+        """
+        Tests that engines are reused per path, profile, and pragmas unless
+        use_cache is False.
+        """
+        engine = connect_sqlite(self.db_path)
+        self.assertIs(connect_sqlite(self.db_path), engine)
+        self.assertIs(
+            connect_sqlite(os.path.join(self.tempdir, ".", "custom.sqlite")), engine)
+        self.assertEqual(self.mock_create_engine.call_count, 1)
+
+        read_engine = connect_sqlite(self.db_path, profile="read")
+        self.assertIsNot(read_engine, engine)
+        self.assertIs(connect_sqlite(self.db_path, profile="read"), read_engine)
+
+        pragma_engine = connect_sqlite(self.db_path, pragmas={"cache_size": 1000})
+        self.assertIsNot(pragma_engine, engine)
+        self.assertIs(connect_sqlite(self.db_path, pragmas={"cache_size": 1000}), pragma_engine)
+
+        other_engine = connect_sqlite(os.path.join(self.tempdir, "other.sqlite"))
+        self.assertIsNot(other_engine, engine)
+        self.assertEqual(self.mock_create_engine.call_count, 4)
+
+        uncached_engine = connect_sqlite(self.db_path, use_cache=False)
+        self.assertIsNot(uncached_engine, engine)
+        self.assertEqual(self.mock_create_engine.call_count, 5)
+        # an uncached engine doesn't replace the cached one
+        self.assertIs(connect_sqlite(self.db_path), engine)
+
+class InsertIntoTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tempdir, "custom.sqlite")
+        db = sqlite3.connect(self.db_path)
+        db.execute(
+            "CREATE TABLE Prices (Sid TEXT, Date TEXT, Close REAL, Volume INTEGER, "
+            "IsActive INTEGER, Note TEXT, PRIMARY KEY (Sid, Date))")
+        db.commit()
+        db.close()
+
+        # stands in for a sqlalchemy Engine
+        self.conn = MagicMock()
+        self.conn.url.database = self.db_path
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def _query(self, sql="SELECT * FROM Prices ORDER BY Sid, Date"):
+        db = sqlite3.connect(self.db_path)
+        try:
+            return db.execute(sql).fetchall()
+        finally:
+            db.close()
+
+    def test_insert(self):
+        """
+        Tests that nulls, booleans, and datetimes are stored as NULLs, ints,
+        and ISO strings.
+        """
+        df = pd.DataFrame(dict(
+            Sid=["FI1", "FI1", "FI2"],
+            Date=pd.to_datetime(["2024-01-02 09:30:00", "2024-01-02 09:31:00", None]),
+            Close=[10.5, np.nan, 20.0],
+            Volume=[100, 200, 300],
+            IsActive=[True, False, True],
+            Note=["a", "", None]))
+
+        insert_or_fail(df, "Prices", self.conn)
+
+        self.conn.dispose.assert_called_once_with()
+        self.assertListEqual(
+            self._query(),
+            [("FI1", "2024-01-02T09:30:00", 10.5, 100, 1, "a"),
+             ("FI1", "2024-01-02T09:31:00", None, 200, 0, None),
+             ("FI2", None, 20.0, 300, 1, None)])
+
+        # the DataFrame isn't modified
+        self.assertEqual(df.IsActive.dtype, bool)
+
+        # dates are stored as YYYY-MM-DD
+        df = pd.DataFrame(dict(
+            Sid=["FI3"], Date=pd.to_datetime(["2024-01-03"]), Close=[1.0]))
+        insert_or_fail(df, "Prices", self.conn)
+        self.assertListEqual(
+            self._query("SELECT Date FROM Prices WHERE Sid = 'FI3'"), [("2024-01-03",)])
+
+    def test_on_conflict(self):
+        """
+        Tests replacing, ignoring, and failing on duplicates.
+        """
+        df = pd.DataFrame(dict(Sid=["FI1", "FI2"], Date=["2024-01-02", "2024-01-02"], Close=[1.0, 2.0]))
+        insert_or_fail(df, "Prices", self.conn)
+
+        insert_or_ignore(
+            pd.DataFrame(dict(Sid=["FI1", "FI3"], Date=["2024-01-02", "2024-01-02"], Close=[9.0, 3.0])),
+            "Prices", self.conn)
+        self.assertListEqual(
+            self._query("SELECT Sid, Close FROM Prices ORDER BY Sid"),
+            [("FI1", 1.0), ("FI2", 2.0), ("FI3", 3.0)])
+
+        insert_or_replace(
+            pd.DataFrame(dict(Sid=["FI1"], Date=["2024-01-02"], Close=[9.0])),
+            "Prices", self.conn)
+        self.assertListEqual(
+            self._query("SELECT Sid, Close FROM Prices ORDER BY Sid"),
+            [("FI1", 9.0), ("FI2", 2.0), ("FI3", 3.0)])
+
+        # a failure rolls back the whole insert
+        with self.assertRaises(DataInsertionError) as cm:
+            insert_or_fail(
+                pd.DataFrame(dict(Sid=["FI4", "FI1"], Date=["2024-01-02", "2024-01-02"], Close=[4.0, 1.0])),
+                "Prices", self.conn)
+
+        self.assertIn("UNIQUE constraint failed", repr(cm.exception))
+        self.assertEqual(self._query("SELECT COUNT(*) FROM Prices")[0][0], 3)
+
+    @patch("quantrocket.db._INSERT_CHUNKSIZE", new=2)
+    def test_chunks(self):
+        """
+        Tests inserting a DataFrame larger than the chunk size.
+        """
+        df = pd.DataFrame(dict(
+            Sid=["FI{0}".format(i) for i in range(5)],
+            Date="2024-01-02",
+            Volume=np.arange(5, dtype=np.int64)))
+        insert_or_fail(df, "Prices", self.conn)
+        self.assertListEqual(
+            self._query("SELECT Sid, Volume FROM Prices ORDER BY Sid"),
+            [("FI{0}".format(i), i) for i in range(5)])
+
+class InsertStreamTestCase(unittest.TestCase):
+
+    setUp = InsertIntoTestCase.setUp
+    tearDown = InsertIntoTestCase.tearDown
+    _query = InsertIntoTestCase._query
+
+    def test_insert_stream(self):
+        """
+        Tests inserting the chunks of a CSV file.
+        """
+        f = io.StringIO(
+            "Sid,Date,Close\n"
+            + "".join("FI{0},2024-01-02,{0}.5\n".format(i) for i in range(7)))
+
+        num_rows = insert_stream(
+            pd.read_csv(f, chunksize=3), "Prices", self.conn, on_conflict="replace")
+
+        self.assertEqual(num_rows, 7)
+        self.assertListEqual(
+            self._query("SELECT Sid, Close FROM Prices ORDER BY Sid"),
+            [("FI{0}".format(i), i + 0.5) for i in range(7)])
+
+    def test_insert_single_dataframe(self):
+        """
+        Tests that a single DataFrame can be passed instead of an iterable.
+        """
+        df = pd.DataFrame(dict(Sid=["FI1", "FI2"], Date="2024-01-02", Close=[1.5, 2.5]))
+
+        num_rows = insert_stream(df, "Prices", self.conn)
+
+        self.assertEqual(num_rows, 2)
+        self.assertListEqual(
+            self._query("SELECT Sid, Close FROM Prices ORDER BY Sid"),
+            [("FI1", 1.5), ("FI2", 2.5)])
+
+    def test_rollback_without_checkpoints(self):
+        """
+        Tests that nothing is inserted if a later DataFrame fails.
+        """
+        frames = [
+            pd.DataFrame(dict(Sid=["FI1", "FI2"], Date="2024-01-02")),
+            pd.DataFrame(dict(Sid=["FI3", "FI1"], Date="2024-01-02")),
+        ]
+        with self.assertRaises(DataInsertionError) as cm:
+            insert_stream(iter(frames), "Prices", self.conn)
+
+        self.assertIn("UNIQUE constraint failed", repr(cm.exception))
+        self.assertEqual(self._query("SELECT COUNT(*) FROM Prices")[0][0], 0)
+
+    @patch("quantrocket.db._INSERT_CHUNKSIZE", new=2)
+    def test_checkpoints(self):
+        """
+        Tests that rows committed at checkpoints are kept if a later
+        transaction fails.
+        """
+        frames = [
+            pd.DataFrame(dict(Sid=["FI1", "FI2", "FI3"], Date="2024-01-02")),
+            pd.DataFrame(dict(Sid=["FI4", "FI5", "FI1"], Date="2024-01-02")),
+        ]
+        with self.assertRaises(DataInsertionError) as cm:
+            insert_stream(frames, "Prices", self.conn, rows_per_transaction=2)
+
+        # commits happen after each chunk that reaches rows_per_transaction
+        self.assertIn("(5 rows were committed before the error)", repr(cm.exception))
+        self.assertListEqual(
+            self._query("SELECT Sid FROM Prices ORDER BY Sid"),
+            [("FI1",), ("FI2",), ("FI3",), ("FI4",), ("FI5",)])
+
+        with self.assertRaises(ParameterError):
+            insert_stream(frames, "Prices", self.conn, on_conflict="update")
+
+class ReadTableTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tempdir, "custom.sqlite")
+        db = sqlite3.connect(self.db_path)
+        db.execute(
+            "CREATE TABLE Prices (Sid TEXT, Date DATE, Time DATETIME, Close REAL, "
+            "Volume INTEGER, Note TEXT, Updated TEXT)")
+        db.executemany(
+            "INSERT INTO Prices VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                ("FI1", "2024-01-02", "2024-01-02T09:30:00", 10.5, 100, "a", "2024-01-05"),
+                ("FI1", "2024-01-03", "2024-01-03T09:30:00", None, 200, None, "2024-01-05"),
+                ("FI2", "2024-01-02", None, 20.0, None, "c", None),
+            ])
+        db.commit()
+        db.close()
+
+        # stands in for a sqlalchemy Engine
+        self.conn = MagicMock()
+        self.conn.url.database = self.db_path
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_read_table(self):
+        """
+        Tests that columns are converted based on their declared types.
+        """
+        df = read_table(self.conn, "Prices", parse_dates=["Updated"])
+
+        self.assertListEqual(
+            list(df.columns),
+            ["Sid", "Date", "Time", "Close", "Volume", "Note", "Updated"])
+        self.assertEqual(df["Sid"].dtype, object)
+        self.assertEqual(df["Date"].dtype, "datetime64[ns]")
+        self.assertEqual(df["Time"].dtype, "datetime64[ns]")
+        self.assertEqual(df["Updated"].dtype, "datetime64[ns]")
+        self.assertEqual(df["Close"].dtype, np.float64)
+        # nulls make the INTEGER column float
+        self.assertEqual(df["Volume"].dtype, np.float64)
+
+        df = df.astype({"Date": str, "Time": str, "Updated": str})
+        self.assertListEqual(
+            df.fillna("nan").to_dict(orient="records"),
+            [
+                {"Sid": "FI1", "Date": "2024-01-02", "Time": "2024-01-02 09:30:00",
+                 "Close": 10.5, "Volume": 100.0, "Note": "a", "Updated": "2024-01-05"},
+                {"Sid": "FI1", "Date": "2024-01-03", "Time": "2024-01-03 09:30:00",
+                 "Close": "nan", "Volume": 200.0, "Note": "nan", "Updated": "2024-01-05"},
+                {"Sid": "FI2", "Date": "2024-01-02", "Time": "NaT",
+                 "Close": 20.0, "Volume": "nan", "Note": "c", "Updated": "NaT"},
+            ])
+
+    def test_columns_and_where(self):
+        """
+        Tests selecting columns and filtering rows.
+        """
+        df = read_table(
+            self.conn, "Prices", columns=["Sid", "Volume"], where="Sid = 'FI1'")
+
+        self.assertListEqual(list(df.columns), ["Sid", "Volume"])
+        self.assertEqual(df["Volume"].dtype, np.int64)
+        self.assertListEqual(df["Volume"].tolist(), [100, 200])
+
+    def test_real_values_in_integer_column(self):
+        """
+        Tests that REAL values in an INTEGER column are not truncated.
+        """
+        db = sqlite3.connect(self.db_path)
+        db.execute(
+            "INSERT INTO Prices (Sid, Date, Close, Volume) VALUES ('FI3', '2024-01-02', 'n/a', 1.5)")
+        db.commit()
+        db.close()
+
+        df = read_table(self.conn, "Prices", columns=["Sid", "Volume"], where="Sid = 'FI3'")
+        self.assertEqual(df["Volume"].dtype, np.float64)
+        self.assertListEqual(df["Volume"].tolist(), [1.5])
+
+        # also when text in the REAL column forces per-column conversion
+        df = read_table(self.conn, "Prices", columns=["Volume", "Close"], where="Sid != 'FI2'")
+        self.assertEqual(df["Volume"].dtype, np.float64)
+        self.assertListEqual(df["Volume"].tolist(), [100.0, 200.0, 1.5])
+        self.assertEqual(df["Close"].dtype, object)
+        self.assertListEqual(df["Close"].fillna("nan").tolist(), [10.5, "nan", "n/a"])
+
+    def test_empty(self):
+        """
+        Tests that an empty result returns an empty DataFrame with the
+        expected dtypes.
+        """
+        df = read_table(self.conn, "Prices", where="Sid = 'FI99'")
+
+        self.assertTrue(df.empty)
+        self.assertEqual(df["Date"].dtype, "datetime64[ns]")
+        self.assertEqual(df["Close"].dtype, np.float64)
+
+        self.assertListEqual(
+            list(read_table(self.conn, "Prices", where="Sid = 'FI99'", chunksize=2)),
+            [])
+
+    @patch("quantrocket.db._READ_CHUNKSIZE", new=2)
+    def test_chunks(self):
+        """
+        Tests reading in chunks.
+        """
+        chunks = list(read_table(self.conn, "Prices", columns=["Sid", "Close"], chunksize=2))
+
+        self.assertListEqual([len(chunk) for chunk in chunks], [2, 1])
+
+        # without chunksize, internal chunks are concatenated
+        df = read_table(self.conn, "Prices", columns=["Sid", "Volume"])
+        self.assertListEqual(df.index.tolist(), [0, 1, 2])
+        self.assertEqual(df["Volume"].dtype, np.float64)
+
+    def test_invalid_table_or_columns(self):
+        """
+        Tests that unknown tables or columns raise ParameterError.
+        """
+        with self.assertRaises(ParameterError) as cm:
+            read_table(self.conn, "Nope")
+        self.assertIn("no such table: Nope", repr(cm.exception))
+
+        with self.assertRaises(ParameterError) as cm:
+            read_table(self.conn, "Prices", columns=["Sid", "Open"])
+        self.assertIn("unknown columns for table Prices: Open", repr(cm.exception))
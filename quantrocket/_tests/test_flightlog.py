@@ -0,0 +1,573 @@
+# Copyright 2017-2024 QuantRocket LLC - All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# To run: pytest path/to/quantrocket/tests -v
+
+import os
+import json
+import datetime
+import time
+import logging
+import unittest
+import requests
+try:
+    from unittest.mock import patch, MagicMock
+except ImportError:
+    # py27
+    from mock import patch, MagicMock
+from six.moves import queue
+from quantrocket.flightlog import (
+    FlightlogHandler,
+    stream_log_records,
+    _BatchingHttpHandler,
+    _BoundedQueueHandler,
+    _DrainingQueueListener,
+    _FlightlogStats,
+    LOG_RECORD_TYPE_BOUNDARY)
+from quantrocket.exceptions import ParameterError
+
+class FlightlogHandlerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.env_patcher = patch.dict(os.environ, {
+            "HOUSTON_URL": "http://houston:1969",
+            "HOUSTON_USERNAME": "me",
+            "HOUSTON_PASSWORD": "secret"})
+        self.env_patcher.start()
+        self.handlers_patcher = patch.dict("quantrocket.flightlog._flightlog_handlers", clear=True)
+        self.handlers_patcher.start()
+        self.support_patcher = patch.dict("quantrocket.flightlog._batch_endpoint_support", clear=True)
+        self.support_patcher.start()
+
+    def tearDown(self):
+        self.support_patcher.stop()
+        self.handlers_patcher.stop()
+        self.env_patcher.stop()
+
+    def _get_logger(self, handler):
+        logger = logging.getLogger("quantrocket.tests.flightlog")
+        logger.handlers = [handler]
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        return logger
+
+    def test_foreground(self):
+        """
+        Tests that foreground records are posted as forms as they are
+        logged, over one session, with a per-request timeout.
+        """
+        handler = FlightlogHandler(background=False)
+        self.assertIs(FlightlogHandler(background=False), handler)
+        self.assertEqual(handler.session.auth, ("me", "secret"))
+
+        logger = self._get_logger(handler)
+
+        with patch.object(handler.session, "post") as mock_post:
+            mock_post.return_value.status_code = 200
+            logger.info("hello %s", "world")
+            logger.info("goodbye")
+
+        self.assertEqual(mock_post.call_count, 2)
+        args, kwargs = mock_post.call_args_list[0]
+        self.assertEqual(args[0], "http://houston:1969/flightlog/handler")
+        self.assertEqual(kwargs["timeout"], 3)
+        self.assertEqual(kwargs["data"]["msg"], "str{0}hello %s".format(LOG_RECORD_TYPE_BOUNDARY))
+        self.assertEqual(handler.get_stats()["sent"], 2)
+
+        handler.close()
+
+    @patch.dict(os.environ, {"FLIGHTLOG_BATCH": "true"})
+    def test_batch_endpoint(self):
+        """
+        Tests that records are posted to the batch endpoint as compact JSON
+        lines if FLIGHTLOG_BATCH is set.
+        """
+        handler = FlightlogHandler(background=False)
+        logger = self._get_logger(handler)
+
+        with patch.object(handler.session, "post") as mock_post:
+            mock_post.return_value.status_code = 200
+            logger.info("hello %s", "world")
+            try:
+                1 / 0
+            except ZeroDivisionError:
+                logger.exception("goodbye")
+
+        self.assertEqual(mock_post.call_count, 2)
+        args, kwargs = mock_post.call_args_list[0]
+        self.assertEqual(args[0], "http://houston:1969/flightlog/handler/batch")
+        self.assertEqual(kwargs["timeout"], 3)
+        self.assertEqual(kwargs["headers"]["Content-Type"], "application/x-ndjson")
+        record = json.loads(kwargs["data"])
+        self.assertEqual(record["msg"], "hello world")
+        self.assertEqual(record["levelname"], "INFO")
+        self.assertEqual(record["name"], "quantrocket.tests.flightlog")
+        self.assertNotIn("args", record)
+        self.assertNotIn("exc_text", record)
+
+        args, kwargs = mock_post.call_args_list[1]
+        record = json.loads(kwargs["data"])
+        self.assertEqual(record["msg"], "goodbye")
+        self.assertIn("ZeroDivisionError", record["exc_text"])
+
+        self.assertEqual(handler.get_stats()["sent"], 2)
+
+        handler.close()
+
+    @patch.dict(os.environ, {"FLIGHTLOG_BATCH": "true"})
+    def test_fall_back_to_forms(self):
+        """
+        Tests that records are posted as forms if flightlog doesn't support
+        batches, and that the batch endpoint isn't tried again in the same
+        process.
+        """
+        handler = FlightlogHandler(background=False)
+        logger = self._get_logger(handler)
+
+        def _mock_post(url, *args, **kwargs):
+            response = MagicMock()
+            response.status_code = 404 if url.endswith("/batch") else 200
+            return response
+
+        with patch.object(handler.session, "post", side_effect=_mock_post) as mock_post:
+            logger.info("hello %s", "world")
+            logger.info("goodbye")
+
+        self.assertListEqual(
+            [call[0][0] for call in mock_post.call_args_list],
+            ["http://houston:1969/flightlog/handler/batch",
+             "http://houston:1969/flightlog/handler",
+             "http://houston:1969/flightlog/handler"])
+        args, kwargs = mock_post.call_args_list[1]
+        self.assertEqual(kwargs["data"]["msg"], "str{0}hello %s".format(LOG_RECORD_TYPE_BOUNDARY))
+        self.assertEqual(kwargs["data"]["levelname"], "str{0}INFO".format(LOG_RECORD_TYPE_BOUNDARY))
+        self.assertEqual(handler.get_stats()["sent"], 2)
+
+        handler.close()
+
+        # a new handler goes straight to forms
+        handler = _BatchingHttpHandler(
+            "http://houston:1969/flightlog/handler", use_batch_endpoint=True)
+        logger = self._get_logger(handler)
+
+        with patch.object(handler.session, "post", side_effect=_mock_post) as mock_post:
+            logger.info("hello again")
+
+        self.assertListEqual(
+            [call[0][0] for call in mock_post.call_args_list],
+            ["http://houston:1969/flightlog/handler"])
+
+        handler.close()
+
+    def test_batches(self):
+        """
+        Tests that batched records are flushed on size or time.
+        """
+        handler = _BatchingHttpHandler(
+            "http://houston:1969/flightlog/handler", batch_size=3, flush_interval=0.05,
+            use_batch_endpoint=True)
+        logger = self._get_logger(handler)
+
+        with patch.object(handler.session, "post") as mock_post:
+            for i in range(4):
+                logger.info("message %s", i)
+
+            mock_post.return_value.status_code = 200
+
+            # flushed on size
+            self.assertEqual(mock_post.call_count, 1)
+            self.assertEqual(len(mock_post.call_args[1]["data"].splitlines()), 3)
+
+            # flushed on time
+            time.sleep(0.2)
+            self.assertEqual(mock_post.call_count, 2)
+            self.assertEqual(len(mock_post.call_args[1]["data"].splitlines()), 1)
+
+        handler.close()
+
+class BoundedQueueTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.support_patcher = patch.dict("quantrocket.flightlog._batch_endpoint_support", clear=True)
+        self.support_patcher.start()
+
+    def tearDown(self):
+        self.support_patcher.stop()
+
+    def _get_handler(self, overflow="drop_oldest", queue_size=2, drain_timeout=5):
+        log_queue = queue.Queue(queue_size)
+        http_handler = _BatchingHttpHandler(
+            "http://houston:1969/flightlog/handler", batch_size=100, flush_interval=1,
+            stats=_FlightlogStats(), use_batch_endpoint=True)
+        listener = _DrainingQueueListener(log_queue, http_handler)
+        handler = _BoundedQueueHandler(
+            log_queue, listener, overflow=overflow, drain_timeout=drain_timeout)
+
+        logger = logging.getLogger("quantrocket.tests.flightlog.queue")
+        logger.handlers = [handler]
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+
+        return handler, http_handler, logger
+
+    def test_drop_oldest(self):
+        """
+        Tests that the oldest record is dropped when the queue is full, and
+        that queued records are sent when the handler is closed.
+        """
+        handler, http_handler, logger = self._get_handler("drop_oldest")
+
+        for i in range(3):
+            logger.info("message %s", i)
+
+        self.assertListEqual(
+            [record.msg for record in handler.queue.queue], ["message 1", "message 2"])
+
+        handler.listener.start()
+        with patch.object(http_handler.session, "post") as mock_post:
+            mock_post.return_value.status_code = 200
+            handler.close()
+
+        self.assertEqual(mock_post.call_count, 1)
+        stats = handler.get_stats()
+        self.assertEqual(stats["enqueued"], 3)
+        self.assertEqual(stats["dropped"], 1)
+        self.assertEqual(stats["sent"], 2)
+        self.assertEqual(stats["failed"], 0)
+        self.assertEqual(stats["flushes"], 1)
+
+    def test_drop_newest(self):
+        """
+        Tests that the new record is dropped when the queue is full.
+        """
+        handler, http_handler, logger = self._get_handler("drop_newest")
+
+        for i in range(3):
+            logger.info("message %s", i)
+
+        self.assertListEqual(
+            [record.msg for record in handler.queue.queue], ["message 0", "message 1"])
+        self.assertEqual(handler.get_stats()["dropped"], 1)
+        self.assertEqual(handler.get_stats()["enqueued"], 2)
+
+    def test_drain_deadline(self):
+        """
+        Tests that records still unsent at the drain deadline are dropped.
+        """
+        handler, http_handler, logger = self._get_handler(
+            queue_size=10, drain_timeout=0.1)
+
+        for i in range(3):
+            logger.info("message %s", i)
+
+        def _mock_post(url, *args, **kwargs):
+            time.sleep(0.2)
+            response = MagicMock()
+            response.status_code = 404
+            return response
+
+        handler.listener.start()
+        with patch.object(http_handler.session, "post", side_effect=_mock_post) as mock_post:
+            handler.close()
+
+        # the batch endpoint isn't supported, and by then the deadline has passed
+        self.assertEqual(mock_post.call_count, 1)
+        stats = handler.get_stats()
+        self.assertEqual(stats["enqueued"], 3)
+        self.assertEqual(stats["dropped"], 3)
+        self.assertEqual(stats["sent"], 0)
+
+    def test_failed(self):
+        """
+        Tests that failed posts are counted.
+        """
+        handler, http_handler, logger = self._get_handler(queue_size=10)
+
+        for i in range(3):
+            logger.info("message %s", i)
+
+        handler.listener.start()
+        with patch.object(http_handler.session, "post", side_effect=IOError("flightlog is down")):
+            with patch.object(http_handler, "handleError") as mock_handle_error:
+                handler.close()
+
+        self.assertEqual(mock_handle_error.call_count, 1)
+        stats = handler.get_stats()
+        self.assertEqual(stats["failed"], 3)
+        self.assertEqual(stats["sent"], 0)
+
+    def test_invalid_overflow(self):
+        """
+        Tests that an invalid overflow policy is rejected.
+        """
+        with self.assertRaises(ParameterError) as cm:
+            FlightlogHandler(overflow="drop_everything")
+
+        self.assertIn("overflow must be one of drop_oldest, drop_newest, block", repr(cm.exception))
+
+class StreamLogRecordsTestCase(unittest.TestCase):
+
+    def _get_mock_response(self, lines, error=None):
+        def _iter_lines():
+            for line in lines:
+                yield line.encode("utf-8")
+            if error:
+                raise error
+
+        response = MagicMock()
+        response.iter_lines.side_effect = _iter_lines
+        return response
+
+    @patch("quantrocket.flightlog.houston")
+    def test_parse_and_filter(self, mock_houston):
+        """
+        Tests parsing and filtering log lines.
+        """
+        mock_houston.get.return_value = self._get_mock_response([
+            "2024-01-02 09:30:00 quantrocket.master: INFO [usstock-1d] Collected 5 securities",
+            "",
+            "2024-01-02 09:30:01 quantrocket.history: ERROR [usstock-1d] Collection failed",
+            "2024-01-02 09:30:02 quantrocket.history: INFO [usstock-1d] Collecting again",
+            "2024-01-02 09:30:03 quantrocket.history: WARNING [other-1d] Something",
+            "Traceback (most recent call last):",
+        ])
+
+        records = list(stream_log_records(hist=10, reconnect=False))
+        self.assertEqual(len(records), 5)
+        self.assertDictEqual(
+            records[0],
+            {"timestamp": datetime.datetime(2024, 1, 2, 9, 30),
+             "service": "quantrocket.master",
+             "level": "INFO",
+             "message": "[usstock-1d] Collected 5 securities"})
+        self.assertDictEqual(
+            records[-1],
+            {"timestamp": None,
+             "service": None,
+             "level": None,
+             "message": "Traceback (most recent call last):"})
+
+        mock_houston.get.assert_called_with(
+            "/flightlog/stream/logs", stream=True, params={"nocolor": "true", "hist": 10})
+
+        records = list(stream_log_records(
+            services="quantrocket.history", min_level="WARNING", reconnect=False))
+        self.assertListEqual(
+            [record["message"] for record in records],
+            ["[usstock-1d] Collection failed", "[other-1d] Something"])
+
+        records = list(stream_log_records(match="[usstock-1d] Coll", reconnect=False))
+        self.assertEqual(len(records), 3)
+
+        records = list(stream_log_records(match=r"^\[usstock-1d\] Collect(ed|ing)", regex=True, reconnect=False))
+        self.assertListEqual(
+            [record["message"] for record in records],
+            ["[usstock-1d] Collected 5 securities", "[usstock-1d] Collecting again"])
+
+        with self.assertRaises(ParameterError) as cm:
+            list(stream_log_records(min_level="LOUD"))
+
+        self.assertIn("min_level must be one of DEBUG, INFO, WARNING, ERROR, CRITICAL", repr(cm.exception))
+
+    @patch("quantrocket.flightlog.houston")
+    def test_min_level_nonstandard_level(self, mock_houston):
+        """
+        Tests that lines with a non-standard level are excluded by
+        min_level rather than ending the stream.
+        """
+        mock_houston.get.return_value = self._get_mock_response([
+            "2024-01-02 09:30:00 quantrocket.master: NOTICE something",
+            "2024-01-02 09:30:01 quantrocket.master: ERROR failed",
+        ])
+
+        records = list(stream_log_records(min_level="WARNING", reconnect=False))
+        self.assertListEqual([record["message"] for record in records], ["failed"])
+
+        records = list(stream_log_records(reconnect=False))
+        self.assertListEqual([record["level"] for record in records], ["NOTICE", "ERROR"])
+
+    @patch("quantrocket.flightlog.time.sleep")
+    @patch("quantrocket.flightlog.houston")
+    def test_resume(self, mock_houston, mock_sleep):
+        """
+        Tests that the stream reconnects and resumes after the last line
+        received.
+        """
+        responses = [
+            self._get_mock_response([
+                "2024-01-02 09:30:00 quantrocket.master: INFO one",
+                "2024-01-02 09:30:01 quantrocket.master: INFO two",
+                "2024-01-02 09:30:01 quantrocket.master: INFO three",
+            ], error=requests.exceptions.ChunkedEncodingError("connection lost")),
+            self._get_mock_response([
+                "2024-01-02 09:29:59 quantrocket.master: INFO zero",
+                "2024-01-02 09:30:00 quantrocket.master: INFO one",
+                "2024-01-02 09:30:01 quantrocket.master: INFO two",
+                "2024-01-02 09:30:01 quantrocket.master: INFO three",
+                "2024-01-02 09:30:01 quantrocket.master: INFO four",
+                "2024-01-02 09:30:02 quantrocket.master: INFO five",
+            ]),
+        ]
+        mock_houston.get.side_effect = responses
+
+        stream = stream_log_records()
+        messages = [next(stream)["message"] for i in range(5)]
+        self.assertListEqual(messages, ["one", "two", "three", "four", "five"])
+
+        self.assertEqual(mock_houston.get.call_count, 2)
+        self.assertEqual(mock_houston.get.call_args[1]["params"]["hist"], 1000)
+        mock_sleep.assert_called_once_with(0)
+
+    @patch("quantrocket.flightlog.time.sleep")
+    @patch("quantrocket.flightlog.houston")
+    def test_reconnect_on_server_error(self, mock_houston, mock_sleep):
+        """
+        Tests that the stream reconnects on 5xx errors, such as while
+        flightlog restarts, but not on other HTTP errors.
+        """
+        responses = [
+            self._get_mock_response([]),
+            self._get_mock_response([
+                "2024-01-02 09:30:00 quantrocket.master: INFO one",
+            ]),
+        ]
+        params = []
+        def _mock_get(*args, **kwargs):
+            params.append(dict(kwargs["params"]))
+            return responses.pop(0)
+
+        mock_houston.get.side_effect = _mock_get
+
+        unavailable = MagicMock()
+        unavailable.status_code = 503
+        mock_houston.raise_for_status_with_json.side_effect = [
+            requests.HTTPError("503 Service Unavailable", response=unavailable),
+            None,
+        ]
+
+        stream = stream_log_records()
+        self.assertEqual(next(stream)["message"], "one")
+        mock_sleep.assert_called_once_with(0)
+        # nothing was received, so the reconnection doesn't request history
+        self.assertListEqual(params, [{"nocolor": "true"}, {"nocolor": "true"}])
+
+        not_found = MagicMock()
+        not_found.status_code = 404
+        mock_houston.get.side_effect = None
+        mock_houston.get.return_value = self._get_mock_response([])
+        mock_houston.raise_for_status_with_json.side_effect = requests.HTTPError(
+            "404 Not Found", response=not_found)
+
+        with self.assertRaises(requests.HTTPError):
+            next(stream_log_records())
+
+    @patch("quantrocket.flightlog.time.sleep")
+    @patch("quantrocket.flightlog.houston")
+    def test_reconnect_before_first_line(self, mock_houston, mock_sleep):
+        """
+        Tests that reconnecting before any lines are received requests the
+        original history rather than resume_hist.
+        """
+        responses = [
+            self._get_mock_response(
+                [], error=requests.exceptions.ChunkedEncodingError("connection lost")),
+            self._get_mock_response([
+                "2024-01-02 09:30:00 quantrocket.master: INFO one",
+            ]),
+        ]
+        params = []
+        def _mock_get(*args, **kwargs):
+            params.append(dict(kwargs["params"]))
+            return responses.pop(0)
+
+        mock_houston.get.side_effect = _mock_get
+
+        stream = stream_log_records(hist=5)
+        self.assertEqual(next(stream)["message"], "one")
+        self.assertListEqual(
+            params,
+            [{"nocolor": "true", "hist": 5}, {"nocolor": "true", "hist": 5}])
+
+class HandleErrorTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.env_patcher = patch.dict(os.environ, {
+            "HOUSTON_URL": "http://houston:1969",
+            "QUANTROCKET_SERVICE_NAME": "satellite"})
+        self.env_patcher.start()
+        self.handlers_patcher = patch.dict("quantrocket.flightlog._flightlog_handlers", clear=True)
+        self.handlers_patcher.start()
+        self.support_patcher = patch.dict("quantrocket.flightlog._batch_endpoint_support", clear=True)
+        self.support_patcher.start()
+        from quantrocket._cli.commands import _get_service_name
+        _get_service_name.cache_clear()
+
+    def tearDown(self):
+        from quantrocket._cli.commands import _get_service_name
+        _get_service_name.cache_clear()
+        logging.getLogger("quantrocket.satellite").handlers = []
+        self.support_patcher.stop()
+        self.handlers_patcher.stop()
+        self.env_patcher.stop()
+
+    @patch("subprocess.check_output")
+    def test_handle_error(self, mock_check_output):
+        """
+        Tests that the service name is read from the environment and that
+        the error and traceback are sent as one record in one request.
+        """
+        from quantrocket._cli.commands import handle_error
+
+        handler = FlightlogHandler(background=False)
+
+        with patch.object(handler.session, "post") as mock_post:
+            mock_post.return_value.status_code = 200
+            handle_error("Traceback (most recent call last):\n  File x\nValueError: bad\n")
+            handle_error("another error")
+
+        mock_check_output.assert_not_called()
+        self.assertEqual(mock_post.call_count, 2)
+        args, kwargs = mock_post.call_args_list[0]
+        self.assertEqual(args[0], "http://houston:1969/flightlog/handler")
+        msg = kwargs["data"]["msg"].split(LOG_RECORD_TYPE_BOUNDARY, 1)[1]
+        lines = msg.splitlines()
+        self.assertTrue(lines[0].startswith("Error running "))
+        self.assertListEqual(
+            lines[1:], ["Traceback (most recent call last):", "  File x", "ValueError: bad"])
+        self.assertEqual(
+            kwargs["data"]["name"], "str{0}quantrocket.satellite".format(LOG_RECORD_TYPE_BOUNDARY))
+
+    @patch.dict(os.environ, {"FLIGHTLOG_BATCH": "true"})
+    def test_handle_error_without_batch_endpoint(self):
+        """
+        Tests that, with the batch endpoint enabled but not supported by
+        flightlog, the error is sent with one batch attempt and one form.
+        """
+        from quantrocket._cli.commands import handle_error
+
+        handler = FlightlogHandler(background=False)
+
+        def _mock_post(url, *args, **kwargs):
+            response = MagicMock()
+            response.status_code = 404 if url.endswith("/batch") else 200
+            return response
+
+        with patch.object(handler.session, "post", side_effect=_mock_post) as mock_post:
+            handle_error("Traceback (most recent call last):\n  File x\nValueError: bad")
+
+        self.assertListEqual(
+            [call[0][0] for call in mock_post.call_args_list],
+            ["http://houston:1969/flightlog/handler/batch",
+             "http://houston:1969/flightlog/handler"])
+        self.assertEqual(handler.get_stats()["sent"], 1)
@@ -27,16 +27,22 @@ from quantrocket.fundamental import (
     get_reuters_estimates_reindexed_like,
     get_reuters_financials_reindexed_like,
     get_alpaca_etb_reindexed_like,
+    get_alpaca_etb_asof,
     get_ibkr_borrow_fees_reindexed_like,
+    get_ibkr_borrow_fees_asof,
     get_ibkr_shortable_shares_reindexed_like,
     get_ibkr_margin_requirements_reindexed_like,
     get_sharadar_fundamentals_reindexed_like,
+    get_sharadar_fundamentals_asof,
     get_sharadar_institutions_reindexed_like,
     get_sharadar_sec8_reindexed_like,
     get_sharadar_sp500_reindexed_like,
     get_wsh_earnings_dates_reindexed_like,
+    get_wsh_earnings_dates_asof,
     get_brain_bsi_reindexed_like,
+    get_brain_bsi_asof,
     get_brain_blmcf_reindexed_like,
+    get_brain_blmcf_asof,
     get_brain_blmect_reindexed_like,
 )
 from quantrocket.exceptions import ParameterError, MissingData, NoFundamentalData
@@ -1512,6 +1518,62 @@ class WSHEarningsDatesReindexedLikeTestCase(unittest.TestCase):
                  "FI23456": 'nan'}]
         )
 
+    @patch("quantrocket.fundamental._CSV_CHUNKSIZE", 1)
+    @patch("quantrocket.fundamental.download_wsh_earnings_dates")
+    def test_dedupe_across_chunks(self, mock_download_wsh_earnings_dates):
+        """
+        Tests that deduping on LastUpdated is correct when the download is
+        parsed in multiple chunks and the most recently updated record is
+        not the last record.
+        """
+
+        closes = pd.DataFrame(
+            np.random.rand(2,2),
+            columns=["FI12345","FI23456"],
+            index=pd.date_range(start="2018-05-01", periods=2, freq="D", name="Date"))
+
+        def _mock_download_wsh_earnings_dates(f, *args, **kwargs):
+            announcements = pd.DataFrame(
+                dict(Date=["2018-05-01",
+                           "2018-05-02",
+                           "2018-05-01",
+                           "2018-05-02"],
+                     Sid=["FI12345",
+                          "FI23456",
+                          "FI12345",
+                          "FI23456"],
+                     Time=["After Market",
+                           "Before Market",
+                           "Before Market",
+                           "Unspecified"],
+                     LastUpdated=["2018-04-09T07:48:20",
+                                  "2018-04-11T07:48:20",
+                                  "2018-03-11T07:48:20",
+                                  "2018-04-12T07:48:20"]))
+            announcements.to_csv(f, index=False)
+            f.seek(0)
+
+        mock_download_wsh_earnings_dates.side_effect = _mock_download_wsh_earnings_dates
+
+        announcements = get_wsh_earnings_dates_reindexed_like(closes,
+                                                              statuses=["Confirmed","Unconfirmed"])
+
+        announce_times = announcements.loc["Time"]
+        announce_times = announce_times.reset_index()
+        announce_times["Date"] = announce_times.Date.dt.strftime("%Y-%m-%dT%H:%M:%S%z")
+        announce_times = announce_times.fillna("nan")
+
+        self.assertListEqual(
+            announce_times.to_dict(orient="records"),
+            [
+                {'Date': '2018-05-01T00:00:00',
+                 "FI12345": 'After Market',
+                 "FI23456": 'nan'},
+                {'Date': '2018-05-02T00:00:00',
+                 "FI12345": 'nan',
+                 "FI23456": 'Unspecified'}]
+        )
+
     def test_tz_aware_index(self):
         """
         Tests that a tz-aware index in the input DataFrame can be handled.
@@ -1563,6 +1625,42 @@ class WSHEarningsDatesReindexedLikeTestCase(unittest.TestCase):
                  "FI23456": 'nan'}]
         )
 
+class WSHEarningsDatesAsOfTestCase(unittest.TestCase):
+
+    def test_asof(self):
+        """
+        Tests get_wsh_earnings_dates_asof, including that the most recently
+        updated record is used.
+        """
+        def mock_download_wsh_earnings_dates(f, *args, **kwargs):
+            announcements = pd.DataFrame(
+                dict(Date=["2018-05-02",
+                           "2018-05-02",
+                           "2018-05-02"],
+                     Sid=["FI12345",
+                          "FI12345",
+                          "FI23456"],
+                     Time=["Before Market",
+                           "After Market",
+                           "Unspecified"],
+                     LastUpdated=["2018-04-11T09:36:00",
+                                  "2018-04-12T09:36:00",
+                                  "2018-04-11T09:36:00"]))
+            announcements.to_csv(f, index=False)
+            f.seek(0)
+
+        with patch('quantrocket.fundamental.download_wsh_earnings_dates', new=mock_download_wsh_earnings_dates):
+
+            announcements = get_wsh_earnings_dates_asof(
+                ["FI12345", "FI23456", "FI34567"], as_of_date="2018-05-02")
+
+        announcements = announcements.fillna("nan")
+        self.assertDictEqual(
+            announcements.to_dict(orient="index"),
+            {"FI12345": {"Time": "After Market"},
+             "FI23456": {"Time": "Unspecified"},
+             "FI34567": {"Time": "nan"}})
+
 class StockloanDataReindexedLikeTestCase(unittest.TestCase):
     """
     Contains tests which are common to get_ibkr_shortable_shares_reindexed_like
@@ -3039,6 +3137,78 @@ class AlpacaETBReindexedLikeTestCase(unittest.TestCase):
                  {'Date': '2019-05-03T00:00:00-0400', "FI12345": True, "FI23456": True}]
             )
 
+class StockloanAsOfTestCase(unittest.TestCase):
+
+    def test_alpaca_etb_asof(self):
+        """
+        Tests get_alpaca_etb_asof.
+        """
+        def mock_download_alpaca_etb(f, *args, **kwargs):
+            etb = pd.DataFrame(
+                dict(Date=["2019-05-01",
+                           "2019-05-02",
+                           "2019-05-03",
+                           "2019-05-01",
+                           "2019-05-03",
+                           ],
+                     Sid=["FI12345",
+                          "FI12345",
+                          "FI12345",
+                          "FI23456",
+                          "FI23456"],
+                     EasyToBorrow=[1,
+                                   0,
+                                   1,
+                                   1,
+                                   0,
+                                   ]))
+            etb.to_csv(f, index=False)
+            f.seek(0)
+
+        with patch('quantrocket.fundamental.download_alpaca_etb', new=mock_download_alpaca_etb):
+
+            etb = get_alpaca_etb_asof(["FI12345", "FI23456", "FI34567"], as_of_date="2019-05-02")
+
+        self.assertEqual(etb.index.name, "Sid")
+        self.assertDictEqual(
+            etb.to_dict(),
+            {"FI12345": False, "FI23456": True, "FI34567": False})
+
+    @patch("quantrocket.fundamental.download_ibkr_borrow_fees")
+    def test_ibkr_borrow_fees_asof(self, mock_download_ibkr_borrow_fees):
+        """
+        Tests get_ibkr_borrow_fees_asof, including the query date range.
+        """
+        def _mock_download_ibkr_borrow_fees(f, *args, **kwargs):
+            borrow_fees = pd.DataFrame(
+                dict(Date=["2018-04-20",
+                           "2018-05-01",
+                           "2018-05-02",
+                           "2018-05-03"],
+                     Sid=["FI23456",
+                          "FI12345",
+                          "FI12345",
+                          "FI12345"],
+                     FeeRate=[0.35,
+                              1.75,
+                              1.79,
+                              1.85]))
+            borrow_fees.to_csv(f, index=False)
+            f.seek(0)
+
+        mock_download_ibkr_borrow_fees.side_effect = _mock_download_ibkr_borrow_fees
+
+        borrow_fees = get_ibkr_borrow_fees_asof(["FI12345", "FI23456"], as_of_date="2018-05-02")
+
+        _, args, kwargs = mock_download_ibkr_borrow_fees.mock_calls[0]
+        self.assertListEqual(kwargs["sids"], ["FI12345", "FI23456"])
+        self.assertEqual(kwargs["start_date"], "2018-03-18") # 45 days before as_of_date
+        self.assertEqual(kwargs["end_date"], "2018-05-02")
+
+        self.assertDictEqual(
+            borrow_fees.to_dict(),
+            {"FI12345": 1.79, "FI23456": 0.35})
+
 class SharadarFundamentalsReindexedLikeTestCase(unittest.TestCase):
 
     def test_complain_if_time_level_in_index(self):
@@ -3538,6 +3708,130 @@ class SharadarFundamentalsReindexedLikeTestCase(unittest.TestCase):
              {'Date': '2018-07-08T00:00:00-0400', "FI12345": 542.0}]
         )
 
+    def test_compact(self):
+        """
+        Tests that compact=True parses numeric fields as float32 and string
+        fields as categoricals, and that unrequested fields are excluded.
+        """
+        closes = pd.DataFrame(
+            np.random.rand(3,2),
+            columns=["FI12345", "FI23456"],
+            index=pd.date_range(start="2018-07-22", periods=3, freq="D", name="Date"))
+
+        def mock_download_sharadar_fundamentals(filepath_or_buffer, *args, **kwargs):
+            fundamentals = pd.DataFrame(
+                dict(
+                    DATEKEY=[
+                        "2018-04-23",
+                        "2018-07-23",
+                        "2018-05-01",
+                        ],
+                     Sid=[
+                         "FI12345",
+                         "FI12345",
+                         "FI23456",
+                         ],
+                     DIMENSION=[
+                         "ART",
+                         "ART",
+                         "ART",
+                     ],
+                     EPS=[
+                         565,
+                         580,
+                         8.5
+                     ],
+                     REVENUE=[
+                         301,
+                         302,
+                         75
+                     ]))
+            fundamentals.to_csv(filepath_or_buffer, index=False)
+            filepath_or_buffer.seek(0)
+
+        with patch('quantrocket.fundamental.download_sharadar_fundamentals', new=mock_download_sharadar_fundamentals):
+
+            fundamentals = get_sharadar_fundamentals_reindexed_like(
+                closes, fields=["EPS"], compact=True)
+
+        self.assertSetEqual(set(fundamentals.index.get_level_values("Field")), {"EPS"})
+
+        eps = fundamentals.loc["EPS"]
+        self.assertTrue((eps.dtypes == np.float32).all())
+        self.assertListEqual(list(eps.columns), ["FI12345", "FI23456"])
+        eps = eps.reset_index()
+        eps["Date"] = eps.Date.dt.strftime("%Y-%m-%d")
+        self.assertListEqual(
+            eps.to_dict(orient="records"),
+            [{'Date': '2018-07-22', "FI12345": 565.0, "FI23456": 8.5},
+             {'Date': '2018-07-23', "FI12345": 565.0, "FI23456": 8.5},
+             {'Date': '2018-07-24', "FI12345": 580.0, "FI23456": 8.5}]
+        )
+
+        with patch('quantrocket.fundamental.download_sharadar_fundamentals', new=mock_download_sharadar_fundamentals):
+
+            fundamentals = get_sharadar_fundamentals_reindexed_like(
+                closes, fields=["EPS", "DIMENSION"], compact=True)
+
+        self.assertSetEqual(set(fundamentals.index.get_level_values("Field")), {"EPS", "DIMENSION"})
+        dimensions = fundamentals.loc["DIMENSION"]
+        self.assertTrue((dimensions == "ART").all().all())
+
+class SharadarFundamentalsAsOfTestCase(unittest.TestCase):
+
+    @patch("quantrocket.fundamental.download_sharadar_fundamentals")
+    def test_asof(self, mock_download_sharadar_fundamentals):
+        """
+        Tests get_sharadar_fundamentals_asof, including that reports filed
+        on the as-of date are excluded, that the latest non-null value is
+        returned for each field, and that missing sids are NaN.
+        """
+        def _mock_download_sharadar_fundamentals(filepath_or_buffer, *args, **kwargs):
+            fundamentals = pd.DataFrame(
+                dict(
+                    DATEKEY=["2018-02-15",
+                             "2018-05-10",
+                             "2018-08-09",
+                             "2018-03-01",
+                             "2018-06-01"],
+                    Sid=["FI12345",
+                         "FI12345",
+                         "FI12345",
+                         "FI23456",
+                         "FI23456"],
+                    EPS=[565,
+                         581,
+                         590,
+                         8.3,
+                         None],
+                    REVENUE=[301,
+                             None,
+                             310,
+                             75,
+                             76]))
+            fundamentals.to_csv(filepath_or_buffer, index=False)
+            filepath_or_buffer.seek(0)
+
+        mock_download_sharadar_fundamentals.side_effect = _mock_download_sharadar_fundamentals
+
+        fundamentals = get_sharadar_fundamentals_asof(
+            ["FI12345", "FI23456", "FI34567"], as_of_date="2018-08-09",
+            fields=["EPS", "REVENUE"])
+
+        _, args, kwargs = mock_download_sharadar_fundamentals.mock_calls[0]
+        self.assertListEqual(kwargs["sids"], ["FI12345", "FI23456", "FI34567"])
+        self.assertEqual(kwargs["start_date"], "2017-02-10") # 545 days before as_of_date
+        self.assertEqual(kwargs["end_date"], "2018-08-09")
+        self.assertEqual(kwargs["dimensions"], "ART")
+
+        self.assertListEqual(list(fundamentals.columns), ["EPS", "REVENUE"])
+        fundamentals = fundamentals.fillna("nan")
+        self.assertDictEqual(
+            fundamentals.to_dict(orient="index"),
+            {"FI12345": {"EPS": 581.0, "REVENUE": 301.0},
+             "FI23456": {"EPS": 8.3, "REVENUE": 76.0},
+             "FI34567": {"EPS": "nan", "REVENUE": "nan"}})
+
 class SharadarInstitutionsReindexedLikeTestCase(unittest.TestCase):
 
     def test_complain_if_time_level_in_index(self):
@@ -3820,6 +4114,44 @@ class SharadarInstitutionsReindexedLikeTestCase(unittest.TestCase):
             {'Date': '2018-08-16T00:00:00-0400', 'FI12345': 600000.0, 'FI23456': 800000.0}]
         )
 
+    def test_compact(self):
+        """
+        Tests that compact=True parses numeric fields as float32.
+        """
+        closes = pd.DataFrame(
+            np.random.rand(2,1),
+            columns=["FI12345"],
+            index=pd.date_range(start="2018-05-15", periods=2, freq="D", name="Date"))
+
+        def mock_download_sharadar_institutions(filepath_or_buffer, *args, **kwargs):
+            institutions = pd.DataFrame(
+                dict(
+                    CALENDARDATE=[
+                        "2018-03-31",
+                        ],
+                     Sid=[
+                         "FI12345",
+                         ],
+                     TICKER=[
+                         "ABC",
+                         ],
+                     TOTALVALUE=[
+                         500000
+                     ]))
+            institutions.to_csv(filepath_or_buffer, index=False)
+            filepath_or_buffer.seek(0)
+
+        with patch('quantrocket.fundamental.download_sharadar_institutions', new=mock_download_sharadar_institutions):
+
+            institutions = get_sharadar_institutions_reindexed_like(
+                closes, fields=["TOTALVALUE"], compact=True)
+
+        self.assertSetEqual(set(institutions.index.get_level_values("Field")), {"TOTALVALUE"})
+
+        total_values = institutions.loc["TOTALVALUE"]
+        self.assertEqual(total_values["FI12345"].dtype, np.float32)
+        self.assertListEqual(list(total_values["FI12345"]), [500000.0, 500000.0])
+
 class SharadarSEC8ReindexedLikeTestCase(unittest.TestCase):
 
     def test_complain_if_time_level_in_index(self):
@@ -4236,6 +4568,56 @@ class SharadarSP500ReindexedLikeTestCase(unittest.TestCase):
             {'Date': '2018-08-18T00:00:00', 'FI12345': False, 'FI23456': True}]
         )
 
+    def test_in_sp500_sparse_and_unsorted_index(self):
+        """
+        Tests requesting S&P 500 membership as a sparse DataFrame, using an
+        unsorted reindex_like index and multiple changes for a sid.
+        """
+        closes = pd.DataFrame(
+            np.random.rand(4,2),
+            columns=["FI12345","FI23456"],
+            index=pd.DatetimeIndex(
+                ["2018-08-16", "2018-08-13", "2018-08-15", "2018-08-14"], name="Date"))
+
+        def mock_download_sharadar_sp500(filepath_or_buffer, *args, **kwargs):
+            sp500 = pd.DataFrame(
+                dict(
+                    DATE=[
+                        "2018-08-14",
+                        "2018-08-15",
+                        "2018-08-16",
+                        "2018-08-01"
+                        ],
+                    Sid=[
+                         "FI12345",
+                         "FI12345",
+                         "FI12345",
+                         "FI23456",
+                         ],
+                     ACTION=[
+                         "added",
+                         "removed",
+                         "added",
+                         "added"
+                     ],
+                     ))
+            sp500.to_csv(filepath_or_buffer, index=False)
+            filepath_or_buffer.seek(0)
+
+        with patch("quantrocket.fundamental.download_sharadar_sp500", new=mock_download_sharadar_sp500):
+            in_sp500 = get_sharadar_sp500_reindexed_like(closes, sparse=True)
+
+        self.assertIsInstance(in_sp500["FI12345"].dtype, pd.SparseDtype)
+        in_sp500 = in_sp500.sparse.to_dense().reset_index()
+        in_sp500["Date"] = in_sp500.Date.dt.strftime("%Y-%m-%d")
+        self.assertListEqual(
+            in_sp500.to_dict(orient="records"),
+            [{'Date': '2018-08-16', 'FI12345': True, 'FI23456': True},
+            {'Date': '2018-08-13', 'FI12345': False, 'FI23456': True},
+            {'Date': '2018-08-15', 'FI12345': False, 'FI23456': True},
+            {'Date': '2018-08-14', 'FI12345': True, 'FI23456': True}]
+        )
+
     def test_no_matching_events(self):
         """
         Tests that False is returned (not an exception) when the securities were never
@@ -4654,6 +5036,115 @@ class BrainReindexedLikeTestCase(unittest.TestCase):
              {'Date': '2018-08-18T00:00:00-0400', 'FI12345': 0.55, 'FI23456': 0.45}]
         )
 
+    def test_blmcf_max_staleness(self):
+        """
+        Tests that get_brain_blmcf_reindexed_like doesn't forward-fill
+        metrics beyond max_staleness and skips null values when
+        forward-filling.
+        """
+        closes = pd.DataFrame(
+            np.random.rand(6,2),
+            columns=["FI12345","FI23456"],
+            index=pd.date_range(start="2018-08-13", periods=6, freq="D", name="Date"))
+
+        def mock_download_brain_blmcf(filepath_or_buffer, *args, **kwargs):
+            metrics = pd.DataFrame(
+                dict(
+                    Date=[
+                        "2018-05-15",
+                        "2018-6-01",
+                        "2018-08-15",
+                        "2018-08-16",
+                        "2018-08-17",
+                        ],
+                    Sid=[
+                         "FI12345",
+                         "FI23456",
+                         "FI12345",
+                         "FI23456",
+                         "FI12345",
+                         ],
+                     SENTIMENT=[
+                         0.5,
+                         0.4,
+                         0.55,
+                         0.45,
+                         None,
+                     ],
+                    ))
+            metrics.to_csv(filepath_or_buffer, index=False)
+            filepath_or_buffer.seek(0)
+
+        with patch("quantrocket.fundamental.download_brain_blmcf", new=mock_download_brain_blmcf):
+            metrics = get_brain_blmcf_reindexed_like(
+                closes, fields=["SENTIMENT"], max_staleness="75D")
+
+        metrics = metrics.loc["SENTIMENT"].reset_index()
+        metrics["Date"] = metrics.Date.dt.strftime("%Y-%m-%dT%H:%M:%S%z")
+        metrics = metrics.fillna("nan")
+        self.assertListEqual(
+            metrics.to_dict(orient="records"),
+            [{'Date': '2018-08-13T00:00:00', 'FI12345': "nan", 'FI23456': 0.4},
+             {'Date': '2018-08-14T00:00:00', 'FI12345': "nan", 'FI23456': 0.4},
+             {'Date': '2018-08-15T00:00:00', 'FI12345': 0.55, 'FI23456': 0.4},
+             {'Date': '2018-08-16T00:00:00', 'FI12345': 0.55, 'FI23456': 0.45},
+             {'Date': '2018-08-17T00:00:00', 'FI12345': 0.55, 'FI23456': 0.45},
+             {'Date': '2018-08-18T00:00:00', 'FI12345': 0.55, 'FI23456': 0.45}]
+        )
+
+    def test_blmcf_date_and_numeric_fields(self):
+        """
+        Tests that date fields requested alongside numeric fields keep
+        Timestamps and NaT.
+        """
+        closes = pd.DataFrame(
+            np.random.rand(3,2),
+            columns=["FI12345","FI23456"],
+            index=pd.date_range(start="2018-08-13", periods=3, freq="D", name="Date"))
+
+        def mock_download_brain_blmcf(filepath_or_buffer, *args, **kwargs):
+            metrics = pd.DataFrame(
+                dict(
+                    Date=[
+                        "2018-05-15",
+                        "2018-08-14",
+                        ],
+                    Sid=[
+                         "FI12345",
+                         "FI12345",
+                         ],
+                     SENTIMENT=[
+                         0.5,
+                         0.55,
+                     ],
+                    LAST_REPORT_DATE=[
+                        "2018-05-10",
+                        "2018-08-10",
+                    ],
+                    ))
+            metrics.to_csv(filepath_or_buffer, index=False)
+            filepath_or_buffer.seek(0)
+
+        with patch("quantrocket.fundamental.download_brain_blmcf", new=mock_download_brain_blmcf):
+            metrics = get_brain_blmcf_reindexed_like(
+                closes, fields=["SENTIMENT", "LAST_REPORT_DATE"])
+
+        report_dates = metrics.loc["LAST_REPORT_DATE"]
+        self.assertListEqual(
+            report_dates["FI12345"].tolist(),
+            [pd.Timestamp("2018-05-10"), pd.Timestamp("2018-08-10"), pd.Timestamp("2018-08-10")])
+        self.assertTrue(report_dates["FI23456"].isna().all())
+        self.assertTrue(all(value is pd.NaT for value in report_dates["FI23456"]))
+
+        sentiment = metrics.loc["SENTIMENT"].reset_index()
+        sentiment["Date"] = sentiment.Date.dt.strftime("%Y-%m-%dT%H:%M:%S%z")
+        self.assertListEqual(
+            sentiment.fillna("nan").to_dict(orient="records"),
+            [{'Date': '2018-08-13T00:00:00', 'FI12345': 0.5, 'FI23456': "nan"},
+             {'Date': '2018-08-14T00:00:00', 'FI12345': 0.55, 'FI23456': "nan"},
+             {'Date': '2018-08-15T00:00:00', 'FI12345': 0.55, 'FI23456': "nan"}]
+        )
+
     def test_blmect(self):
         """
         Tests get_brain_blmect_reindexed_like.
@@ -4703,3 +5194,75 @@ class BrainReindexedLikeTestCase(unittest.TestCase):
              {'Date': '2018-08-17T00:00:00', 'FI12345': 0.55, 'FI23456': 0.45},
              {'Date': '2018-08-18T00:00:00', 'FI12345': 0.55, 'FI23456': 0.45}]
         )
+
+class BrainAsOfTestCase(unittest.TestCase):
+
+    @patch("quantrocket.fundamental.download_brain_bsi")
+    def test_bsi_asof(self, mock_download_brain_bsi):
+        """
+        Tests get_brain_bsi_asof.
+        """
+        def _mock_download_brain_bsi(filepath_or_buffer, *args, **kwargs):
+            bsi = pd.DataFrame(
+                dict(
+                    Date=["2022-05-02",
+                          "2022-05-02"],
+                    Sid=["FI12345",
+                         "FI23456"],
+                    SENTIMENT_SCORE=[0.5,
+                                     -0.3]))
+            bsi.to_csv(filepath_or_buffer, index=False)
+            filepath_or_buffer.seek(0)
+
+        mock_download_brain_bsi.side_effect = _mock_download_brain_bsi
+
+        bsi = get_brain_bsi_asof(["FI12345", "FI23456"], as_of_date="2022-05-02",
+                                 fields="SENTIMENT_SCORE")
+
+        _, args, kwargs = mock_download_brain_bsi.mock_calls[0]
+        self.assertEqual(kwargs["start_date"], "2022-05-02")
+        self.assertEqual(kwargs["end_date"], "2022-05-02")
+
+        self.assertDictEqual(
+            bsi.to_dict(orient="index"),
+            {"FI12345": {"SENTIMENT_SCORE": 0.5},
+             "FI23456": {"SENTIMENT_SCORE": -0.3}})
+
+    @patch("quantrocket.fundamental.download_brain_blmcf")
+    def test_blmcf_asof(self, mock_download_brain_blmcf):
+        """
+        Tests get_brain_blmcf_asof, including that reports dated on the
+        as-of date are included.
+        """
+        def _mock_download_brain_blmcf(filepath_or_buffer, *args, **kwargs):
+            blmcf = pd.DataFrame(
+                dict(
+                    Date=["2022-02-01",
+                          "2022-05-02",
+                          "2022-05-03",
+                          "2022-03-01"],
+                    Sid=["FI12345",
+                         "FI12345",
+                         "FI12345",
+                         "FI23456"],
+                    SENTIMENT=[0.1,
+                               0.2,
+                               0.3,
+                               0.4]))
+            blmcf.to_csv(filepath_or_buffer, index=False)
+            filepath_or_buffer.seek(0)
+
+        mock_download_brain_blmcf.side_effect = _mock_download_brain_blmcf
+
+        blmcf = get_brain_blmcf_asof(["FI12345", "FI23456"], as_of_date="2022-05-02",
+                                     report_category="10-K")
+
+        _, args, kwargs = mock_download_brain_blmcf.mock_calls[0]
+        self.assertEqual(kwargs["start_date"], "2020-11-03")
+        self.assertEqual(kwargs["end_date"], "2022-05-02")
+        self.assertEqual(kwargs["report_category"], "10-K")
+
+        self.assertDictEqual(
+            blmcf.to_dict(orient="index"),
+            {"FI12345": {"SENTIMENT": 0.2},
+             "FI23456": {"SENTIMENT": 0.4}})
@@ -14,20 +14,29 @@
 
 # To run: pytest path/to/quantrocket/tests -v
 
+import io
+import os
+import shutil
+import tempfile
 import unittest
 try:
-    from unittest.mock import patch
+    from unittest.mock import patch, MagicMock
 except ImportError:
     # py27
-    from mock import patch
+    from mock import patch, MagicMock
 import pandas as pd
 import pytz
 import numpy as np
 from quantrocket.master import (
     get_securities,
+    list_calendar_statuses,
+    round_dataframe_to_tick_sizes,
+    sync_master_replica,
+    SecurityIndex,
+    delete_universe,
     get_securities_reindexed_like,
     get_contract_nums_reindexed_like)
-from quantrocket.exceptions import ParameterError
+from quantrocket.exceptions import ParameterError, NoMasterData
 
 class GetSecuritiesTestCase(unittest.TestCase):
 
@@ -802,6 +811,40 @@ class GetSecuritiesTestCase(unittest.TestCase):
             'usstock_Symbol': 'nan'}]
                     )
 
+    @patch("quantrocket.master.download_master_file")
+    def test_compact(self, mock_download_master_file):
+        """
+        Tests that low-cardinality string fields are parsed as categoricals
+        if compact=True.
+        """
+        def _mock_download_master_file(f, *args, **kwargs):
+            securities = pd.DataFrame(
+                dict(Sid=["FI12345","FI23456","FI34567"],
+                     Symbol=["ABC","DEF","GHI"],
+                     Exchange=["XNYS","XNAS","XNYS"],
+                     Currency=["USD","USD","USD"],
+                     Timezone=["America/New_York","America/New_York","America/New_York"],
+                     ibkr_Currency=["USD",None,"USD"],
+                     Etf=[1, None, 0],
+                     DateDelisted=[None, "2019-10-25", None]))
+            securities.to_csv(f, index=False)
+            f.seek(0)
+
+        mock_download_master_file.side_effect = _mock_download_master_file
+
+        securities = get_securities(sids=["FI12345","FI23456","FI34567"], fields="*")
+        self.assertEqual(securities.Exchange.dtype.name, "object")
+        self.assertEqual(securities.Etf.dtype.name, "bool")
+        self.assertEqual(securities.DateDelisted.dtype.name, "datetime64[ns]")
+
+        securities = get_securities(sids=["FI12345","FI23456","FI34567"], fields="*", compact=True)
+        for field in ("Exchange", "Currency", "Timezone", "ibkr_Currency"):
+            self.assertEqual(securities[field].dtype.name, "category", field)
+        self.assertEqual(securities.Symbol.dtype.name, "object")
+        self.assertListEqual(list(securities.Etf), [True, False, False])
+        self.assertEqual(securities.DateDelisted.dtype.name, "datetime64[ns]")
+        self.assertListEqual(list(securities.Exchange), ["XNYS","XNAS","XNYS"])
+
 class SecuritiesReindexedLikeTestCase(unittest.TestCase):
 
     @patch("quantrocket.master.download_master_file")
@@ -1048,6 +1091,51 @@ class SecuritiesReindexedLikeTestCase(unittest.TestCase):
                   'Field': 'Symbol',
                   'Time': '09:31:00'}]
             )
+
+    def test_securities_reindexed_like_static(self):
+        """
+        Tests get_securities_reindexed_like with static=True.
+        """
+        closes = pd.DataFrame(
+            np.random.rand(3,3),
+            columns=["FI23456","FI12345","FI99999"],
+            index=pd.date_range(start="2018-05-01",
+                                periods=3,
+                                freq="D",
+                                name="Date"))
+
+        def mock_download_master_file(f, *args, **kwargs):
+            securities = pd.DataFrame(
+                dict(Sid=["FI12345",
+                            "FI23456"],
+                     Symbol=["ABC",
+                             "DEF"],
+                     Etf=[1,
+                          0]))
+            securities.to_csv(f, index=False)
+            f.seek(0)
+
+        with patch('quantrocket.master.download_master_file', new=mock_download_master_file):
+
+            securities = get_securities_reindexed_like(
+                closes,
+                fields=["Symbol", "Etf"],
+                static=True)
+
+        self.assertEqual(securities.index.name, "Field")
+        self.assertListEqual(list(securities.columns), ["FI23456","FI12345","FI99999"])
+
+        securities = securities.fillna("nan")
+        self.assertDictEqual(
+            securities.to_dict(orient="index"),
+            {'Etf': {"FI23456": False, "FI12345": True, "FI99999": "nan"},
+             'Symbol': {"FI23456": 'DEF', "FI12345": 'ABC', "FI99999": "nan"}}
+        )
+
+        are_etfs = securities.loc["Etf"] == True
+        etf_closes = closes.loc[:, are_etfs]
+        self.assertListEqual(list(etf_closes.columns), ["FI12345"])
+
 class ContractNumsReindexedLikeTestCase(unittest.TestCase):
 
     @patch("quantrocket.master.download_master_file")
@@ -1369,6 +1457,58 @@ class ContractNumsReindexedLikeTestCase(unittest.TestCase):
                  "FI67890": 2.0}}
         )
 
+    def test_unsorted_index_and_missing_rollover_date(self):
+        """
+        Tests get_contract_nums_reindexed_like with an unsorted index and a
+        contract with no RolloverDate, which is excluded from the sequence.
+        """
+        closes = pd.DataFrame(
+            np.random.rand(3,3),
+            columns=["FI12345","FI23456", "FI34567"],
+            index=pd.DatetimeIndex(["2018-05-03", "2018-05-01", "2018-06-04"], name="Date"))
+
+        def mock_download_master_file(f, *args, **kwargs):
+            securities = pd.DataFrame(
+                dict(Sid=["FI12345",
+                            "FI23456",
+                            "FI34567"],
+                     ibkr_UnderConId=[1,
+                                 1,
+                                 1],
+                     SecType=["FUT",
+                              "FUT",
+                              "FUT"],
+                     RolloverDate=[
+                         "2018-05-02",
+                         None,
+                         "2018-06-03",
+                     ]))
+            securities.to_csv(f, index=False)
+            f.seek(0)
+
+        with patch('quantrocket.master.download_master_file', new=mock_download_master_file):
+
+            contract_nums = get_contract_nums_reindexed_like(closes)
+
+        contract_nums.index = contract_nums.index.strftime("%Y-%m-%d")
+        contract_nums = contract_nums.fillna("nan")
+        self.assertListEqual(list(contract_nums.index), ['2018-05-03', '2018-05-01', '2018-06-04'])
+        self.assertDictEqual(
+            contract_nums.to_dict(orient="index"),
+            {'2018-05-01': {
+                "FI12345": 1.0,
+                "FI23456": 'nan',
+                "FI34567": 2.0},
+             '2018-05-03': {
+                 "FI12345": 'nan',
+                 "FI23456": 'nan',
+                 "FI34567": 1.0},
+             '2018-06-04': {
+                 "FI12345": 'nan',
+                 "FI23456": 'nan',
+                 "FI34567": 'nan'}}
+        )
+
     def test_contract_nums_reindexed_like_intraday(self):
         """
         Tests get_contract_nums_reindexed_like when the input DataFrame includes
@@ -1493,3 +1633,431 @@ class ContractNumsReindexedLikeTestCase(unittest.TestCase):
               'Date': '2018-05-04',
               'Time': '09:31:00'}]
         )
+
+class MasterReplicaTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.replica_path = os.path.join(self.tmpdir, "master.sqlite")
+
+        self.securities = pd.DataFrame(
+            dict(Sid=["FI12345","FI23456","FI34567"],
+                 Symbol=["ABC","DEF","GHI"],
+                 Exchange=["XNYS","XNAS","XNYS"],
+                 Currency=["USD","USD","USD"],
+                 SecType=["STK","STK","ETF"],
+                 Delisted=[0, 1, 0],
+                 ibkr_ConId=[1, 2, 3]))
+        self.universes = {"my-universe": ["FI12345", "FI34567"]}
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _mock_get_master_file_response(self, params, output="csv"):
+        """
+        Mocks the master service by filtering self.securities.
+        """
+        securities = self.securities
+        if params.get("universes"):
+            securities = securities[securities.Sid.isin(self.universes.get(params["universes"], []))]
+        elif params.get("sids"):
+            securities = securities[securities.Sid.isin([params["sids"]])]
+
+        if params.get("fields") == "*":
+            fields = list(securities.columns)
+        elif params.get("fields"):
+            fields = ["Sid"]
+        else:
+            fields = ["Sid", "Symbol", "Exchange", "Currency", "SecType", "Delisted"]
+
+        content = securities[fields].to_csv(index=False).encode("utf-8")
+
+        class MockResponse:
+            def iter_content(self, chunk_size=1024):
+                yield content
+
+        return MockResponse()
+
+    def test_sync_and_query_replica(self):
+        """
+        Tests that sync_master_replica creates a replica and that
+        get_securities answers supported queries from it.
+        """
+        with patch("quantrocket.master._get_master_file_response", new=self._mock_get_master_file_response):
+            with patch("quantrocket.master.list_universes", return_value={"my-universe": 2}):
+                counts = sync_master_replica(self.replica_path)
+
+        self.assertDictEqual(
+            counts,
+            {"inserted": 3, "updated": 0, "deleted": 0, "unchanged": 0, "universes": 1})
+
+        with patch.dict(os.environ, {"QUANTROCKET_MASTER_REPLICA": self.replica_path}):
+            with patch("quantrocket.master._get_master_file_response") as mock_get_master_file_response:
+
+                securities = get_securities(sids=["FI23456", "FI12345"])
+                self.assertListEqual(
+                    list(securities.columns),
+                    ["Symbol", "Exchange", "Currency", "SecType", "Delisted"])
+                self.assertListEqual(list(securities.index), ["FI12345", "FI23456"])
+                self.assertListEqual(list(securities.Delisted), [False, True])
+
+                securities = get_securities(
+                    universes="my-universe", exchanges="XNYS", fields=["Symbol", "ibkr*"])
+                self.assertListEqual(list(securities.columns), ["Symbol", "ibkr_ConId"])
+                self.assertListEqual(list(securities.index), ["FI12345", "FI34567"])
+
+                # sids are always included, and exclusions are ORed
+                securities = get_securities(
+                    sec_types="ETF", sids="FI23456", exclude_sids="FI34567", fields="Symbol")
+                self.assertListEqual(list(securities.index), ["FI23456"])
+
+                securities = get_securities(
+                    exchanges=["XNYS", "XNAS"], exclude_delisted=True, fields="Symbol")
+                self.assertListEqual(list(securities.index), ["FI12345", "FI34567"])
+
+                with self.assertRaises(NoMasterData):
+                    get_securities(sids="FI12345", exclude_universes="my-universe")
+
+                mock_get_master_file_response.assert_not_called()
+
+    def test_fall_back_to_master_service(self):
+        """
+        Tests that queries the replica can't answer are sent to the master
+        service.
+        """
+        with patch("quantrocket.master._get_master_file_response", new=self._mock_get_master_file_response):
+            with patch("quantrocket.master.list_universes", return_value={"my-universe": 2}):
+                sync_master_replica(self.replica_path)
+
+        with patch.dict(os.environ, {"QUANTROCKET_MASTER_REPLICA": self.replica_path}):
+            for kwargs in (
+                # unsupported parameter
+                dict(exchanges="XNYS", frontmonth=True),
+                # vendor exchange code not in replica
+                dict(exchanges="NYSE"),
+                # unknown universe
+                dict(universes="other-universe"),
+                # unknown field
+                dict(sids="FI12345", fields="?"),
+                ):
+                with patch("quantrocket.master._get_master_file_response", wraps=self._mock_get_master_file_response) as mock_get_master_file_response:
+                    get_securities(**kwargs)
+                    self.assertEqual(mock_get_master_file_response.call_count, 1, kwargs)
+
+    def test_fall_back_for_sids_not_in_replica(self):
+        """
+        Tests that queries for sids listed since the last sync are sent to
+        the master service.
+        """
+        with patch("quantrocket.master._get_master_file_response", new=self._mock_get_master_file_response):
+            with patch("quantrocket.master.list_universes", return_value={"my-universe": 2}):
+                sync_master_replica(self.replica_path)
+
+        self.securities = pd.concat([self.securities, pd.DataFrame(
+            dict(Sid=["FI45678"], Symbol=["JKL"], Exchange=["XNYS"], Currency=["USD"],
+                 SecType=["STK"], Delisted=[0], ibkr_ConId=[4]))], ignore_index=True)
+
+        with patch.dict(os.environ, {"QUANTROCKET_MASTER_REPLICA": self.replica_path}):
+            for kwargs in (
+                dict(sids="FI45678"),
+                dict(sids=["FI12345", "FI45678"]),
+                dict(sec_types="ETF", sids="FI45678"),
+                ):
+                with patch("quantrocket.master._get_master_file_response", wraps=self._mock_get_master_file_response) as mock_get_master_file_response:
+                    securities = get_securities(**kwargs)
+                    self.assertEqual(mock_get_master_file_response.call_count, 1, kwargs)
+
+            self.assertListEqual(list(securities.index), ["FI45678"])
+            self.assertEqual(securities.loc["FI45678", "Symbol"], "JKL")
+
+    def test_incremental_sync(self):
+        """
+        Tests that re-syncing the replica only updates changed securities.
+        """
+        with patch("quantrocket.master._get_master_file_response", new=self._mock_get_master_file_response):
+            with patch("quantrocket.master.list_universes", return_value={"my-universe": 2}):
+                sync_master_replica(self.replica_path)
+
+                self.securities.loc[self.securities.Sid == "FI12345", "Symbol"] = "ABCD"
+                self.securities = self.securities[self.securities.Sid != "FI34567"]
+                self.universes = {"my-universe": ["FI12345"]}
+
+                counts = sync_master_replica(self.replica_path)
+
+        self.assertDictEqual(
+            counts,
+            {"inserted": 0, "updated": 1, "deleted": 1, "unchanged": 1, "universes": 1})
+
+        with patch.dict(os.environ, {"QUANTROCKET_MASTER_REPLICA": self.replica_path}):
+            securities = get_securities(universes="my-universe")
+        self.assertListEqual(list(securities.index), ["FI12345"])
+        self.assertListEqual(list(securities.Symbol), ["ABCD"])
+
+class CalendarCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.env_patcher = patch.dict(os.environ, {"QUANTROCKET_TMP_DIR": self.tmpdir})
+        self.env_patcher.start()
+        self.cache_patcher = patch.dict("quantrocket.master._CALENDAR_STATUS_CACHE", clear=True)
+        self.cache_patcher.start()
+
+    def tearDown(self):
+        self.cache_patcher.stop()
+        self.env_patcher.stop()
+        shutil.rmtree(self.tmpdir)
+
+    def _mock_get(self, url, params=None):
+        now = pd.Timestamp.now("America/New_York").tz_localize(None)
+        statuses = {}
+        exchanges = params["exchanges"]
+        if isinstance(exchanges, str):
+            exchanges = [exchanges]
+        for exchange in exchanges:
+            statuses[exchange] = {
+                "status": "open",
+                "since": (now - pd.Timedelta("1h")).isoformat(),
+                "until": (now + pd.Timedelta("1h")).isoformat(),
+                "timezone": "America/New_York"}
+        response = MagicMock()
+        response.json.return_value = statuses
+        return response
+
+    def test_use_cache(self):
+        """
+        Tests that list_calendar_statuses answers from the cache while
+        cached statuses apply, and queries the master service otherwise.
+        """
+        with patch("quantrocket.master.houston.get", side_effect=self._mock_get) as mock_get:
+            with patch("quantrocket.master.houston.raise_for_status_with_json"):
+
+                statuses = list_calendar_statuses("XNYS", use_cache=True)
+                self.assertEqual(statuses["XNYS"]["status"], "open")
+                self.assertEqual(mock_get.call_count, 1)
+
+                # cached
+                statuses = list_calendar_statuses(["XNYS"], use_cache=True, in_="30min")
+                self.assertEqual(statuses["XNYS"]["status"], "open")
+                self.assertEqual(mock_get.call_count, 1)
+
+                # only the uncached exchange is queried
+                statuses = list_calendar_statuses(["XNAS", "XNYS"], use_cache=True)
+                self.assertListEqual(list(statuses), ["XNAS", "XNYS"])
+                self.assertEqual(mock_get.call_count, 2)
+                self.assertEqual(mock_get.call_args[1]["params"]["exchanges"], ["XNAS"])
+
+                # outside the cached period
+                list_calendar_statuses("XNYS", use_cache=True, in_="2h")
+                self.assertEqual(mock_get.call_count, 3)
+
+                # different calendar
+                list_calendar_statuses("XNYS", use_cache=True, outside_rth=True)
+                self.assertEqual(mock_get.call_count, 4)
+
+                # not using cache
+                list_calendar_statuses("XNYS")
+                self.assertEqual(mock_get.call_count, 5)
+
+    def test_file_cache_shared_across_processes(self):
+        """
+        Tests that cached statuses are loaded from the file cache when not
+        in the in-process cache.
+        """
+        with patch("quantrocket.master.houston.get", side_effect=self._mock_get) as mock_get:
+            with patch("quantrocket.master.houston.raise_for_status_with_json"):
+                list_calendar_statuses("XNYS", use_cache=True)
+                self.assertEqual(mock_get.call_count, 1)
+
+        with patch.dict("quantrocket.master._CALENDAR_STATUS_CACHE", clear=True):
+            with patch("quantrocket.master.houston.get", side_effect=self._mock_get) as mock_get:
+                statuses = list_calendar_statuses("XNYS", use_cache=True)
+                self.assertEqual(statuses["XNYS"]["status"], "open")
+                mock_get.assert_not_called()
+
+class RoundDataFrameToTickSizesTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_patcher = patch.dict("quantrocket.master._TICK_SIZE_CACHE", clear=True)
+        self.cache_patcher.start()
+
+    def tearDown(self):
+        self.cache_patcher.stop()
+
+    def _mock_get(self, url, params=None, data=None):
+        """
+        Mocks the master service, using a tick size of 0.0001 below 1 and
+        0.01 from 1.
+        """
+        prices = pd.read_csv(io.BytesIO(data))
+        for field in params["round_fields"]:
+            tick_sizes = np.where(prices[field] < 1, 0.0001, 0.01)
+            tick_sizes = np.where(prices[field].isnull(), np.nan, tick_sizes)
+            prices[field] = (prices[field] / tick_sizes).round() * tick_sizes
+            prices[field] = prices[field].round(10)
+            prices["{0}TickSize".format(field)] = tick_sizes
+        response = MagicMock()
+        response.content = prices.to_csv(index=False).encode("utf-8")
+        return response
+
+    def test_round_in_batches(self):
+        """
+        Tests that round_dataframe_to_tick_sizes sends batches to the
+        master service and returns a DataFrame.
+        """
+        orders = pd.DataFrame(
+            dict(Sid=["FI1","FI2","FI3","FI4","FI5"],
+                 Exchange=["XNYS","XNYS","XNAS","XNAS","XNAS"],
+                 Quantity=[100, 200, 300, 400, 500],
+                 LmtPrice=[10.123, 0.56789, 25.005001, None, 3.3333]))
+
+        with patch("quantrocket.master.houston.get", side_effect=self._mock_get) as mock_get:
+            with patch("quantrocket.master.houston.raise_for_status_with_json"):
+                rounded = round_dataframe_to_tick_sizes(
+                    orders, "LmtPrice", append_ticksize=True, batch_size=2)
+
+        # the row without a price is not sent
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertListEqual(list(rounded.columns), ["Sid", "Exchange", "Quantity", "LmtPrice", "LmtPriceTickSize"])
+        self.assertListEqual(list(rounded.Quantity), [100, 200, 300, 400, 500])
+        rounded = rounded.fillna("nan")
+        self.assertListEqual(list(rounded.LmtPrice), [10.12, 0.5679, 25.01, "nan", 3.33])
+        self.assertListEqual(list(rounded.LmtPriceTickSize), [0.01, 0.0001, 0.01, "nan", 0.01])
+        # input is not modified
+        self.assertEqual(orders.LmtPrice.iloc[0], 10.123)
+
+    def test_use_cache(self):
+        """
+        Tests that cached tick sizes are used to round prices locally, but
+        only within the range of prices at which they were observed.
+        """
+        orders = pd.DataFrame(
+            dict(Sid=["FI1","FI1"],
+                 Exchange=["XNYS","XNYS"],
+                 LmtPrice=[10.123, 20.456]))
+
+        with patch("quantrocket.master.houston.get", side_effect=self._mock_get) as mock_get:
+            with patch("quantrocket.master.houston.raise_for_status_with_json"):
+                round_dataframe_to_tick_sizes(orders, "LmtPrice", use_cache=True)
+                self.assertEqual(mock_get.call_count, 1)
+
+                orders["LmtPrice"] = [15.555, 12.3449]
+                rounded = round_dataframe_to_tick_sizes(orders, "LmtPrice", use_cache=True)
+                self.assertEqual(mock_get.call_count, 1)
+                self.assertListEqual(list(rounded.LmtPrice), [15.56, 12.34])
+
+                rounded = round_dataframe_to_tick_sizes(orders, "LmtPrice", how="down", use_cache=True)
+                self.assertListEqual(list(rounded.LmtPrice), [15.55, 12.34])
+
+                # outside the cached range
+                orders["LmtPrice"] = [15.555, 0.98766]
+                rounded = round_dataframe_to_tick_sizes(orders, "LmtPrice", use_cache=True)
+                self.assertEqual(mock_get.call_count, 2)
+                self.assertListEqual(list(rounded.LmtPrice), [15.56, 0.9877])
+                self.assertEqual(len(mock_get.call_args[1]["data"].decode().strip().splitlines()), 2)
+
+    def test_complain_if_missing_columns(self):
+        """
+        Tests error handling when required columns are missing.
+        """
+        with self.assertRaises(ParameterError) as cm:
+            round_dataframe_to_tick_sizes(
+                pd.DataFrame(dict(Sid=["FI1"], LmtPrice=[10.1])), "LmtPrice")
+
+        self.assertIn("prices is missing required columns: Exchange", repr(cm.exception))
+
+class SecurityIndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.universe_queries = []
+
+        def _mock_download_master_file(f, *args, **kwargs):
+            if kwargs.get("universes") == "my-universe":
+                self.universe_queries.append(kwargs)
+                securities = pd.DataFrame(dict(Sid=["FI1", "FI3"]))
+            else:
+                securities = pd.DataFrame(
+                    dict(Sid=["FI1", "FI2", "FI3", "FI4", "FI5"],
+                         Symbol=["ABC", "ABC", "DEF", "GHI", "GHI"],
+                         Exchange=["XNYS", "XNAS", "XNAS", "XNYS", "XNAS"],
+                         Delisted=[0, 1, 0, 0, 0]))
+            securities.to_csv(f, index=False)
+            f.seek(0)
+
+        self.patcher = patch(
+            "quantrocket.master.download_master_file", new=_mock_download_master_file)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+
+    def test_resolve(self):
+        """
+        Tests resolving symbols to sids, preferring active listings.
+        """
+        index = SecurityIndex(exchanges=["XNYS", "XNAS"])
+
+        sids = index.resolve(["DEF", "ABC", "XYZ", "ABC"])
+        self.assertListEqual(list(sids.index), ["DEF", "ABC", "XYZ", "ABC"])
+        self.assertEqual(sids.loc["DEF"], "FI3")
+        self.assertListEqual(list(sids.loc["ABC"]), ["FI1", "FI1"])
+        self.assertTrue(pd.isnull(sids.loc["XYZ"]))
+
+        self.assertListEqual(index.lookup_sids("ABC"), ["FI1", "FI2"])
+        self.assertListEqual(index.lookup_sids("XYZ"), [])
+
+    def test_resolve_ambiguous_symbols(self):
+        """
+        Tests that ambiguous symbols raise an error unless an exchange is
+        specified.
+        """
+        index = SecurityIndex()
+
+        with self.assertRaises(ParameterError) as cm:
+            index.resolve(["ABC", "GHI"])
+
+        self.assertIn(
+            "symbols match multiple securities, please specify exchange: GHI",
+            repr(cm.exception))
+
+        sids = index.resolve(["ABC", "GHI"], exchange="XNAS")
+        self.assertEqual(sids.loc["ABC"], "FI2")
+        self.assertEqual(sids.loc["GHI"], "FI5")
+
+    def test_resolve_exchange_without_listings(self):
+        """
+        Tests that symbols resolve to NaN on an exchange with no listings.
+        """
+        index = SecurityIndex()
+
+        sids = index.resolve(["ABC", "XYZ"], exchange="ARCX")
+        self.assertListEqual(list(sids.index), ["ABC", "XYZ"])
+        self.assertTrue(sids.isnull().all())
+
+    def test_get_details(self):
+        """
+        Tests looking up security details by sid.
+        """
+        index = SecurityIndex()
+
+        securities = index.get_details(["FI4", "FI1", "FI9"], fields="Exchange")
+        self.assertDictEqual(
+            securities.to_dict(orient="index"),
+            {"FI4": {"Exchange": "XNYS"},
+             "FI1": {"Exchange": "XNYS"},
+             "FI9": {"Exchange": np.nan}})
+
+    @patch("quantrocket.master.houston")
+    def test_universe_sids_cached_until_universe_changes(self, mock_houston):
+        """
+        Tests that universe sids are cached until the universe is deleted.
+        """
+        index = SecurityIndex()
+
+        self.assertListEqual(index.get_universe_sids("my-universe"), ["FI1", "FI3"])
+        self.assertListEqual(index.get_universe_sids("my-universe"), ["FI1", "FI3"])
+        self.assertEqual(len(self.universe_queries), 1)
+
+        delete_universe("my-universe")
+
+        self.assertListEqual(index.get_universe_sids("my-universe"), ["FI1", "FI3"])
+        self.assertEqual(len(self.universe_queries), 2)
@@ -0,0 +1,500 @@
+# Copyright 2017-2024 QuantRocket LLC - All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# To run: pytest path/to/quantrocket/tests -v
+
+import asyncio
+import json
+import sys
+import types
+import unittest
+try:
+    from unittest.mock import patch
+except ImportError:
+    # py27
+    from mock import patch
+import pandas as pd
+import numpy as np
+from quantrocket.realtime import TickBuffer, BarAggregator, follow_market_data
+from quantrocket.realtime import _MarketDataStream
+from quantrocket.exceptions import NoRealtimeData
+from quantrocket.exceptions import ParameterError
+
+class ConnectionClosed(Exception):
+    pass
+
+class ConnectionClosedOK(ConnectionClosed):
+    pass
+
+class ConnectionClosedError(ConnectionClosed):
+    pass
+
+class TIMEOUT(object):
+    pass
+
+class MockWebSocket(object):
+    """
+    Mock websocket which returns the scripted messages from recv, raising
+    TimeoutError for TIMEOUT, then raises ConnectionClosedOK (or the
+    scripted exception).
+    """
+    def __init__(self, messages, exception=ConnectionClosedOK):
+        self.messages = list(messages)
+        self.exception = exception
+
+    def recv(self, timeout=None):
+        if not self.messages:
+            raise self.exception()
+        message = self.messages.pop(0)
+        if message is TIMEOUT:
+            raise TimeoutError()
+        return message
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+class MockAsyncWebSocket(MockWebSocket):
+
+    async def recv(self):
+        if self.messages and self.messages[0] is TIMEOUT:
+            self.messages.pop(0)
+            raise asyncio.TimeoutError()
+        return MockWebSocket.recv(self)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+class StopStream(Exception):
+    pass
+
+class MarketDataStreamTestCase(unittest.TestCase):
+    """
+    Tests for _MarketDataStream with mock websockets modules.
+    """
+
+    def setUp(self):
+        # each call to connect returns (or raises) the next item
+        self.connections = []
+        self.connect_urls = []
+
+        def connect(url, additional_headers=None):
+            self.connect_urls.append(url)
+            if not self.connections:
+                raise StopStream()
+            connection = self.connections.pop(0)
+            if isinstance(connection, Exception):
+                raise connection
+            return connection
+
+        exceptions = types.ModuleType("websockets.exceptions")
+        exceptions.ConnectionClosed = ConnectionClosed
+        exceptions.ConnectionClosedOK = ConnectionClosedOK
+        sync_client = types.ModuleType("websockets.sync.client")
+        sync_client.connect = connect
+        asyncio_client = types.ModuleType("websockets.asyncio.client")
+        asyncio_client.connect = connect
+
+        modules = patch.dict(sys.modules, {
+            "websockets": types.ModuleType("websockets"),
+            "websockets.exceptions": exceptions,
+            "websockets.sync": types.ModuleType("websockets.sync"),
+            "websockets.sync.client": sync_client,
+            "websockets.asyncio": types.ModuleType("websockets.asyncio"),
+            "websockets.asyncio.client": asyncio_client,
+            })
+        modules.start()
+        self.addCleanup(modules.stop)
+
+        self.sleeps = []
+        sleep = patch("quantrocket.realtime.time.sleep", new=self.sleeps.append)
+        sleep.start()
+        self.addCleanup(sleep.stop)
+
+    def test_batch_by_size(self):
+        """
+        Tests that batches are yielded when they reach batch_size, and that
+        JSON lists and objects are both added to the batch.
+        """
+        self.connections.append(MockWebSocket([
+            json.dumps([{"sid": "FI1", "i": 1}, {"sid": "FI1", "i": 2}]),
+            json.dumps({"sid": "FI2", "i": 3}),
+            json.dumps({"sid": "FI2", "i": 4}),
+            ]))
+
+        stream = _MarketDataStream("ws://houston/realtime/stream", batch_size=3, reconnect=False)
+        batches = list(stream)
+
+        self.assertListEqual(
+            [[record["i"] for record in batch] for batch in batches],
+            [[1, 2, 3], [4]])
+
+    def test_batch_by_timeout(self):
+        """
+        Tests that a partial batch is yielded when recv times out.
+        """
+        self.connections.append(MockWebSocket([
+            json.dumps({"i": 1}),
+            TIMEOUT,
+            json.dumps({"i": 2}),
+            json.dumps({"i": 3}),
+            ]))
+
+        stream = _MarketDataStream(
+            "ws://houston/realtime/stream", batch_size=100, reconnect=False, parse=False)
+        batches = list(stream)
+
+        self.assertListEqual(
+            batches,
+            [['{"i": 1}'], ['{"i": 2}', '{"i": 3}']])
+
+    def test_no_reconnect(self):
+        """
+        Tests that with reconnect=False, a clean close ends the stream and
+        an error close is raised.
+        """
+        self.connections.append(MockWebSocket([json.dumps({"i": 1})]))
+        stream = _MarketDataStream("ws://houston/realtime/stream", reconnect=False)
+        self.assertListEqual(list(stream), [[{"i": 1}]])
+        self.assertEqual(len(self.connect_urls), 1)
+        self.assertListEqual(self.sleeps, [])
+
+        self.connections.append(MockWebSocket(
+            [json.dumps({"i": 1})], exception=ConnectionClosedError))
+        batches = []
+        with self.assertRaises(ConnectionClosedError):
+            for batch in stream:
+                batches.append(batch)
+        # the pending batch is yielded before raising
+        self.assertListEqual(batches, [[{"i": 1}]])
+
+    def test_backoff(self):
+        """
+        Tests that reconnection waits double up to the maximum, including
+        for connections that close without delivering data, and reset after
+        a connection delivers data.
+        """
+        self.connections.extend([
+            OSError(),
+            MockWebSocket([]),
+            MockWebSocket([]),
+            OSError(),
+            OSError(),
+            OSError(),
+            MockWebSocket([json.dumps({"i": 1})]),
+            OSError(),
+            ])
+
+        stream = _MarketDataStream(
+            "ws://houston/realtime/stream", max_reconnect_wait=5)
+        batches = []
+        with self.assertRaises(StopStream):
+            for batch in stream:
+                batches.append(batch)
+
+        self.assertListEqual(batches, [[{"i": 1}]])
+        self.assertListEqual(self.sleeps, [0, 1, 2, 4, 5, 5, 0, 1])
+
+    def test_async(self):
+        """
+        Tests iterating the stream asynchronously.
+        """
+        self.connections.extend([
+            MockAsyncWebSocket([
+                json.dumps([{"i": 1}, {"i": 2}]),
+                TIMEOUT,
+                json.dumps({"i": 3}),
+                ]),
+            ])
+
+        stream = _MarketDataStream("ws://houston/realtime/stream", reconnect=False)
+
+        async def consume():
+            return [batch async for batch in stream]
+
+        batches = asyncio.run(consume())
+
+        self.assertListEqual(
+            [[record["i"] for record in batch] for batch in batches],
+            [[1, 2], [3]])
+
+    def test_async_backoff(self):
+        """
+        Tests that async reconnection waits back off like sync ones.
+        """
+        self.connections.extend([
+            OSError(),
+            MockAsyncWebSocket([]),
+            MockAsyncWebSocket([json.dumps({"i": 1})]),
+            OSError(),
+            ])
+
+        sleeps = []
+        async def sleep(seconds):
+            sleeps.append(seconds)
+
+        stream = _MarketDataStream("ws://houston/realtime/stream")
+
+        async def consume():
+            batches = []
+            async for batch in stream:
+                batches.append(batch)
+            return batches
+
+        with patch("asyncio.sleep", new=sleep):
+            with self.assertRaises(StopStream):
+                asyncio.run(consume())
+
+        self.assertListEqual(sleeps, [0, 1, 0, 1])
+
+class TickBufferTestCase(unittest.TestCase):
+
+    def test_latest(self):
+        """
+        Tests that the latest non-null value is kept per sid and field and
+        that ticks for other sids are ignored.
+        """
+        buffer = TickBuffer(["FI1", "FI2"], ["BidPrice", "AskPrice"])
+
+        buffer.append([
+            {"sid": "FI1", "date": "2024-01-02T14:30:00", "BidPrice": 10.0, "AskPrice": 10.1},
+            {"sid": "FI3", "date": "2024-01-02T14:30:00", "BidPrice": 50.0},
+            {"sid": "FI1", "date": "2024-01-02T14:30:01", "BidPrice": 10.02},
+        ])
+
+        latest = buffer.get_latest()
+        self.assertDictEqual(
+            latest.fillna("nan").to_dict(orient="index"),
+            {"FI1": {"BidPrice": 10.02, "AskPrice": 10.1},
+             "FI2": {"BidPrice": "nan", "AskPrice": "nan"}})
+
+        latest_times = buffer.get_latest_times()
+        self.assertEqual(latest_times.loc["FI1"], pd.Timestamp("2024-01-02 14:30:01"))
+        self.assertTrue(pd.isnull(latest_times.loc["FI2"]))
+
+        # the latest snapshot is a view
+        buffer.append([{"sid": "FI2", "date": "2024-01-02T14:30:02", "AskPrice": 20.5}])
+        self.assertEqual(latest.loc["FI2", "AskPrice"], 20.5)
+
+    def test_ring_buffer_wraps(self):
+        """
+        Tests that only the most recent ticks are kept, in order, across
+        batches and within a batch larger than the capacity.
+        """
+        buffer = TickBuffer(["FI1", "FI2"], ["LastPrice"], capacity=3)
+
+        buffer.append([
+            {"sid": "FI1", "date": "2024-01-02T14:30:00", "LastPrice": 1.0},
+            {"sid": "FI2", "date": "2024-01-02T14:30:00", "LastPrice": 101.0},
+            {"sid": "FI1", "date": "2024-01-02T14:30:01", "LastPrice": 2.0},
+        ])
+        times, values = buffer.get_arrays("FI1")
+        self.assertListEqual(values[:, 0].tolist(), [1.0, 2.0])
+
+        buffer.append([
+            {"sid": "FI1", "date": "2024-01-02T14:30:0{0}".format(i), "LastPrice": float(i + 1)}
+            for i in range(2, 7)])
+
+        ticks = buffer.get_ticks("FI1")
+        self.assertListEqual(ticks.LastPrice.tolist(), [5.0, 6.0, 7.0])
+        self.assertListEqual(
+            ticks.index.strftime("%H:%M:%S").tolist(),
+            ["14:30:04", "14:30:05", "14:30:06"])
+
+        buffer.append([{"sid": "FI1", "date": "2024-01-02T14:30:07", "LastPrice": 8.0}])
+        self.assertListEqual(buffer.get_ticks("FI1").LastPrice.tolist(), [6.0, 7.0, 8.0])
+        self.assertListEqual(buffer.get_ticks("FI2").LastPrice.tolist(), [101.0])
+
+    def test_seconds(self):
+        """
+        Tests limiting ticks to a trailing window of seconds.
+        """
+        buffer = TickBuffer(["FI1", "FI2"], ["LastPrice"])
+
+        buffer.append([
+            {"sid": "FI1", "date": "2024-01-02T14:30:00", "LastPrice": 1.0},
+            {"sid": "FI1", "date": "2024-01-02T14:30:05", "LastPrice": 2.0},
+            {"sid": "FI1", "date": "2024-01-02T14:30:09", "LastPrice": 3.0},
+            {"sid": "FI2", "date": "2024-01-02T14:30:10", "LastPrice": 4.0},
+        ])
+
+        ticks = buffer.get_ticks("FI1", seconds=5)
+        self.assertListEqual(ticks.LastPrice.tolist(), [2.0, 3.0])
+
+        with self.assertRaises(ParameterError) as cm:
+            buffer.get_ticks("FI3")
+
+        self.assertIn("sid FI3 is not in the buffer", repr(cm.exception))
+
+class BarAggregatorTestCase(unittest.TestCase):
+
+    def test_bars(self):
+        """
+        Tests aggregating ticks into completed and partial bars.
+        """
+        aggregator = BarAggregator(["FI1", "FI2"], bar_size="1min")
+
+        bars = aggregator.append([
+            {"sid": "FI1", "date": "2024-01-02T14:30:05", "LastPrice": 10.0, "LastSize": 100},
+            {"sid": "FI2", "date": "2024-01-02T14:30:06", "LastPrice": 20.0, "LastSize": 50},
+            {"sid": "FI1", "date": "2024-01-02T14:30:10", "LastPrice": 10.5, "LastSize": 300},
+            {"sid": "FI1", "date": "2024-01-02T14:30:20", "BidPrice": 9.9},
+            {"sid": "FI3", "date": "2024-01-02T14:30:20", "LastPrice": 50.0, "LastSize": 1},
+        ])
+        bars["Date"] = bars.Date.dt.strftime("%H:%M:%S")
+        self.assertListEqual(
+            bars.to_dict(orient="records"),
+            [{"Sid": "FI1", "Date": "14:30:00", "Open": 10.0, "High": 10.5, "Low": 10.0,
+              "Close": 10.5, "Volume": 400.0, "Vwap": 10.375, "Count": 2, "Complete": False},
+             {"Sid": "FI2", "Date": "14:30:00", "Open": 20.0, "High": 20.0, "Low": 20.0,
+              "Close": 20.0, "Volume": 50.0, "Vwap": 20.0, "Count": 1, "Complete": False}])
+
+        # a size without a price is assigned the previous price; a tick in the
+        # next bar completes the forming bars of all sids
+        bars = aggregator.append([
+            {"sid": "FI1", "date": "2024-01-02T14:30:30", "LastPrice": 9.5},
+            {"sid": "FI1", "date": "2024-01-02T14:30:31", "LastSize": 100},
+            {"sid": "FI1", "date": "2024-01-02T14:31:01", "LastPrice": 11.0, "LastSize": 10},
+        ])
+        bars["Date"] = bars.Date.dt.strftime("%H:%M:%S")
+        self.assertListEqual(
+            bars.to_dict(orient="records"),
+            [{"Sid": "FI1", "Date": "14:30:00", "Open": 10.0, "High": 10.5, "Low": 9.5,
+              "Close": 9.5, "Volume": 500.0, "Vwap": 10.2, "Count": 3, "Complete": True},
+             {"Sid": "FI2", "Date": "14:30:00", "Open": 20.0, "High": 20.0, "Low": 20.0,
+              "Close": 20.0, "Volume": 50.0, "Vwap": 20.0, "Count": 1, "Complete": True},
+             {"Sid": "FI1", "Date": "14:31:00", "Open": 11.0, "High": 11.0, "Low": 11.0,
+              "Close": 11.0, "Volume": 10.0, "Vwap": 11.0, "Count": 1, "Complete": False}])
+
+        # late ticks are ignored
+        bars = aggregator.append([
+            {"sid": "FI2", "date": "2024-01-02T14:30:59", "LastPrice": 21.0, "LastSize": 1}])
+        self.assertEqual(len(bars), 0)
+
+        partial_bars = aggregator.get_partial_bars()
+        self.assertListEqual(list(partial_bars.Sid), ["FI1"])
+
+        bars = aggregator.flush()
+        self.assertListEqual(list(bars.Sid), ["FI1"])
+        self.assertTrue(bars.Complete.all())
+        self.assertEqual(len(aggregator.get_partial_bars()), 0)
+
+    def test_multiple_bars_in_batch(self):
+        """
+        Tests a batch spanning several bars for a sid.
+        """
+        aggregator = BarAggregator("FI1", bar_size="5s")
+
+        bars = aggregator.append([
+            {"sid": "FI1", "date": "2024-01-02T14:30:01", "LastPrice": 1.0, "LastSize": 1},
+            {"sid": "FI1", "date": "2024-01-02T14:30:06", "LastPrice": 2.0, "LastSize": 1},
+            {"sid": "FI1", "date": "2024-01-02T14:30:07", "LastPrice": 3.0, "LastSize": 1},
+            {"sid": "FI1", "date": "2024-01-02T14:30:16", "LastPrice": 4.0, "LastSize": 1},
+        ])
+        bars["Date"] = bars.Date.dt.strftime("%H:%M:%S")
+        self.assertListEqual(
+            bars[["Date", "Open", "Close", "Count", "Complete"]].to_dict(orient="records"),
+            [{"Date": "14:30:00", "Open": 1.0, "Close": 1.0, "Count": 1, "Complete": True},
+             {"Date": "14:30:05", "Open": 2.0, "Close": 3.0, "Count": 2, "Complete": True},
+             {"Date": "14:30:15", "Open": 4.0, "Close": 4.0, "Count": 1, "Complete": False}])
+
+    def test_callback_and_async_iterator(self):
+        """
+        Tests emitting bars to a callback and through an async iterator.
+        """
+        batches = [
+            [{"sid": "FI1", "date": "2024-01-02T14:30:01", "LastPrice": 1.0, "LastSize": 1}],
+            [{"sid": "FI2", "date": "2024-01-02T14:30:02", "LastPrice": 1.0, "LastSize": 1}],
+            [{"sid": "FI1", "date": "2024-01-02T14:31:01", "LastPrice": 2.0, "LastSize": 1}],
+        ]
+
+        emitted = []
+        aggregator = BarAggregator(["FI1"], callback=emitted.append)
+        aggregator.consume(batches)
+        self.assertListEqual([len(bars) for bars in emitted], [1, 2])
+
+        async def _stream():
+            for batch in batches:
+                yield batch
+
+        async def _aggregate():
+            aggregator = BarAggregator(["FI1"])
+            return [bars async for bars in aggregator.aggregate(_stream())]
+
+        emitted = asyncio.run(_aggregate())
+        self.assertListEqual([list(bars.Complete) for bars in emitted], [[False], [True, False]])
+
+class FollowMarketDataTestCase(unittest.TestCase):
+
+    @patch("quantrocket.realtime.time.sleep")
+    @patch("quantrocket.realtime.download_market_data_file")
+    def test_follow(self, mock_download_market_data_file, mock_sleep):
+        """
+        Tests that each poll requests bars since the latest bar, refreshes
+        the latest bar, and appends newer bars.
+        """
+        polls = [
+            pd.DataFrame(
+                dict(Sid=["FI1", "FI2", "FI1"],
+                     Date=["2024-01-02T14:30:00+00", "2024-01-02T14:30:00+00", "2024-01-02T14:31:00+00"],
+                     LastPriceClose=[10.0, 20.0, 10.5])),
+            None,
+            pd.DataFrame(
+                dict(Sid=["FI1", "FI2", "FI3", "FI1"],
+                     Date=["2024-01-02T14:31:00+00", "2024-01-02T14:31:00+00",
+                           "2024-01-02T14:32:00+00", "2024-01-02T14:32:00+00"],
+                     LastPriceClose=[10.6, 20.5, 30.0, 10.7])),
+        ]
+        start_dates = []
+
+        def _mock_download_market_data_file(code, f, start_date=None, **kwargs):
+            start_dates.append(start_date)
+            bars = polls[len(start_dates) - 1]
+            if bars is None:
+                raise NoRealtimeData("no market data matches the query parameters")
+            bars.to_csv(f, index=False)
+
+        mock_download_market_data_file.side_effect = _mock_download_market_data_file
+
+        follower = follow_market_data(
+            "usa-stk-1min", start_date="09:30:00 America/New_York",
+            fields="LastPriceClose", timezone="America/New_York")
+
+        prices = next(follower)
+        self.assertListEqual(list(prices.columns.get_level_values("Sid")), ["FI1", "FI2"])
+        self.assertListEqual(
+            prices["LastPriceClose"].fillna("nan").reset_index().assign(
+                Date=lambda x: x.Date.dt.strftime("%H:%M")).to_dict(orient="records"),
+            [{"Date": "09:30", "FI1": 10.0, "FI2": 20.0},
+             {"Date": "09:31", "FI1": 10.5, "FI2": "nan"}])
+
+        prices = next(follower)
+        self.assertListEqual(
+            start_dates,
+            ["09:30:00 America/New_York", "2024-01-02 14:31:00 UTC", "2024-01-02 14:31:00 UTC"])
+        self.assertListEqual(
+            prices["LastPriceClose"].fillna("nan").reset_index().assign(
+                Date=lambda x: x.Date.dt.strftime("%H:%M")).to_dict(orient="records"),
+            [{"Date": "09:30", "FI1": 10.0, "FI2": 20.0, "FI3": "nan"},
+             {"Date": "09:31", "FI1": 10.6, "FI2": 20.5, "FI3": "nan"},
+             {"Date": "09:32", "FI1": 10.7, "FI2": "nan", "FI3": 30.0}])
+
+        self.assertEqual(mock_sleep.call_count, 2)
+        for call in mock_download_market_data_file.mock_calls:
+            self.assertEqual(call.kwargs["fields"], "LastPriceClose")
@@ -47,6 +47,12 @@ insert_or_replace
 insert_or_ignore
     Insert a DataFrame into a SQLite database, ignoring duplicates.
 
+insert_stream
+    Insert a stream of DataFrames into a SQLite database.
+
+read_table
+    Query a table in a SQLite database into a DataFrame.
+
 Notes
 -----
 Usage Guide:
@@ -54,13 +60,15 @@ Usage Guide:
 * Database Management: https://qrok.it/dl/qr/db
 * Custom Data: https://qrok.it/dl/qr/custom-data
 """
+import os
 import getpass
-from typing import TYPE_CHECKING, Union
+import warnings
+from typing import TYPE_CHECKING, Union, Literal, Iterable, Iterator
 if TYPE_CHECKING:
     import pandas as pd
     import sqlalchemy
 from quantrocket.houston import houston
-from quantrocket.exceptions import DataInsertionError
+from quantrocket.exceptions import DataInsertionError, ParameterError
 from quantrocket._cli.utils.output import json_to_cli
 
 __all__ = [
@@ -74,6 +82,8 @@ __all__ = [
     "insert_or_fail",
     "insert_or_replace",
     "insert_or_ignore",
+    "insert_stream",
+    "read_table",
 ]
 
 def list_databases(
@@ -348,17 +358,74 @@ def optimize_databases(
 def _cli_optimize_databases(*args, **kwargs):
     return json_to_cli(optimize_databases, *args, **kwargs)
 
+# PRAGMAs applied to each SQLite connection, by profile
+_SQLITE_PRAGMA_PROFILES = {
+    "default": {
+        # Hand off writes to the OS and don't wait
+        "synchronous": 0,
+        # Each page is ~1K; allow ~50MB
+        "cache_size": 50000,
+        # Store temp tables in memory
+        "temp_store": 2,
+        # Wait up to 10 seconds rather than instantly failing on SQLITE_BUSY
+        "busy_timeout": 10000,
+    },
+    "read": {
+        # Allow reads concurrent with a writer
+        "journal_mode": "WAL",
+        # Read the database through up to 8GB of memory-mapped I/O
+        "mmap_size": 8589934592,
+        "cache_size": 50000,
+        "temp_store": 2,
+        "busy_timeout": 10000,
+    },
+    "bulk_write": {
+        "journal_mode": "WAL",
+        "synchronous": 0,
+        # Each page is ~1K; allow ~200MB
+        "cache_size": 200000,
+        "temp_store": 2,
+        "busy_timeout": 10000,
+    },
+}
+
+# cache of (db_path, profile, pragmas): Engine
+_sqlite_engines = {}
+
 def connect_sqlite(
-    db_path: str
+    db_path: str,
+    profile: Literal["default", "read", "bulk_write"] = "default",
+    pragmas: dict[str, Union[str, int]] = None,
+    use_cache: bool = True
     ) -> 'sqlalchemy.engine.Engine':
     """
     Return a connection to a SQLite database.
 
+    The connection applies a profile of PRAGMAs to each underlying SQLite
+    connection. The "default" profile favors write speed over durability.
+    The "read" profile enables WAL mode, which allows reading while another
+    process writes, and memory-mapped I/O. The "bulk_write" profile enables
+    WAL mode with a larger cache. WAL mode, once enabled, persists in the
+    database file.
+
     Parameters
     ----------
     db_path : str, required
         full path to a SQLite database
 
+    profile : str
+        the PRAGMA profile to use. Possible choices: default, read,
+        bulk_write. Default is default.
+
+    pragmas : dict, optional
+        PRAGMAs to set in addition to, or instead of, the profile's PRAGMAs,
+        for example {"mmap_size": 1073741824}
+
+    use_cache : bool
+        return the connection already created by a previous call with the same
+        arguments, if any (default True). If False, always create a new
+        connection.
+
     Returns
     -------
     sqlalchemy.engine.Engine
@@ -369,83 +436,144 @@ def connect_sqlite(
     Usage Guide:
 
     * Custom Data: https://qrok.it/dl/qr/custom-data
+
+    Examples
+    --------
+    Connect to a custom database for research, allowing reads while the
+    database is being written to:
+
+    >>> conn = connect_sqlite("/var/lib/quantrocket/custom-data.sqlite", profile="read")
     """
     try:
-        from sqlalchemy import create_engine
+        from sqlalchemy import create_engine, event
     except ImportError:
         raise ValueError(
             "this function requires sqlalchemy and must be run in a QuantRocket container")
 
-    conn = create_engine("sqlite:///{0}".format(db_path),
-                         connect_args={"isolation_level": None})
-    # Set some speed optimizations
-    # Hand off writes to the OS and don't wait
-    conn.execute("PRAGMA synchronous = 0")
-    # Each page is ~1K; allow ~50MB
-    conn.execute("PRAGMA cache_size = 50000")
-    # Store temp tables in memory
-    conn.execute("PRAGMA temp_store = 2")
-    # Wait up to 10 seconds rather than instantly failing on SQLITE_BUSY
-    conn.execute("PRAGMA busy_timeout = 10000")
+    if profile not in _SQLITE_PRAGMA_PROFILES:
+        raise ParameterError("profile must be one of {0}".format(
+            ", ".join(_SQLITE_PRAGMA_PROFILES)))
 
-    return conn
+    profile_pragmas = _SQLITE_PRAGMA_PROFILES[profile].copy()
+    profile_pragmas.update(pragmas or {})
 
-def _insert_into(df, table_name, conn, on_conflict):
+    cache_key = (os.path.abspath(db_path), profile, tuple(sorted(profile_pragmas.items())))
+    if use_cache and cache_key in _sqlite_engines:
+        return _sqlite_engines[cache_key]
+
+    conn = create_engine("sqlite:///{0}".format(db_path),
+                         connect_args={"isolation_level": None})
 
-    import time
-    import subprocess
-    import os
+    @event.listens_for(conn, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in profile_pragmas.items():
+                cursor.execute("PRAGMA {0} = {1}".format(name, value))
+        finally:
+            cursor.close()
 
-    temp_table_name = "temp_{0}".format(str(time.time()).replace(".", ""))
+    # connect right away to surface any errors
+    with conn.connect():
+        pass
 
-    # Get the db path from the engine object
-    db_path = conn.url.database
+    if use_cache:
+        _sqlite_engines[cache_key] = conn
 
-    temp_file_name = "/tmp/sqlite_{}.csv".format(temp_table_name)
+    return conn
 
-    # Cast booleans to ints or they will load into SQLite as strings
-    df_bools = df.select_dtypes(['bool'])
-    if not df_bools.empty:
-        df[df_bools.columns] = df_bools.astype(int)
+# number of rows to convert and insert at a time
+_INSERT_CHUNKSIZE = 50000
 
-    # Cast datetimes to str and replace space separator with T separator
-    # (replace is a no-op for dates, which are cast to str as YYYY-MM-DD)
-    df_dts = df.select_dtypes(["datetime", "datetimetz"])
-    if not df_dts.empty:
-        df[df_dts.columns] = df_dts.astype(str).apply(
-            lambda col: col.str.replace(" ", "T"))
+def _insert_into(df, table_name, conn, on_conflict):
 
-    df.to_csv(temp_file_name, index=False)
+    import sqlite3
 
     # Close connection to avoid Database Is Locked
     conn.dispose()
 
-    from_cols = [f"NULLIF({col}, '')" for col in df.columns]
+    db = _connect_sqlite3(conn.url.database)
+    try:
+        db.execute("BEGIN IMMEDIATE")
+        for num_rows in _insert_chunks(db, df, table_name, on_conflict):
+            pass
+        db.execute("COMMIT")
+    except sqlite3.Error as e:
+        if db.in_transaction:
+            db.execute("ROLLBACK")
+        raise DataInsertionError(str(e))
+    finally:
+        db.close()
+
+def _connect_sqlite3(db_path):
+    """
+    Return a sqlite3 connection, in autocommit mode so that transactions are
+    explicit.
+    """
+    import sqlite3
 
-    queries = """
-PRAGMA busy_timeout = 10000;
-.bail on
-.mode csv
-.import {tempfile} {temptable}
-INSERT OR {on_conflict} INTO {table} ({into_cols}) SELECT {from_cols} FROM {temptable};
-DROP TABLE {temptable};
-    """.format(
-        table=table_name,
+    # Wait up to 10 seconds rather than instantly failing on SQLITE_BUSY
+    return sqlite3.connect(db_path, timeout=10, isolation_level=None)
+
+def _insert_chunks(db, df, table_name, on_conflict):
+    """
+    Insert the DataFrame in chunks with a prepared statement, yielding the
+    number of rows in each chunk after inserting it. The caller manages the
+    transaction.
+    """
+    columns = list(df.columns)
+    sql = "INSERT OR {on_conflict} INTO {table} ({into_cols}) VALUES ({placeholders})".format(
         on_conflict=on_conflict,
-        into_cols=",".join(df.columns),
-        from_cols=",".join(from_cols),
-        tempfile=temp_file_name,
-        temptable=temp_table_name)
+        table=table_name,
+        into_cols=",".join('"{0}"'.format(str(col).replace('"', '""')) for col in columns),
+        placeholders=",".join("?" for col in columns))
 
-    try:
-        subprocess.check_output(
-            ["sqlite3", db_path],
-            input=bytes(queries.encode("utf-8")),
-            stderr=subprocess.STDOUT)
-    except subprocess.CalledProcessError as e:
-        raise DataInsertionError(e.output)
+    for start in range(0, len(df.index), _INSERT_CHUNKSIZE):
+        chunk = df.iloc[start:start + _INSERT_CHUNKSIZE]
+        values = [_get_sqlite_values(chunk.iloc[:, i]) for i in range(len(columns))]
+        db.executemany(sql, zip(*values))
+        yield len(chunk.index)
 
-    os.remove(temp_file_name)
+def _get_sqlite_values(col):
+    """
+    Return a list of values that SQLite can bind for the Series. Nulls and
+    empty strings are None, booleans are ints, and datetimes are ISO strings
+    with a T separator (or YYYY-MM-DD for dates).
+    """
+    import numpy as np
+    import pandas as pd
+
+    dtype = col.dtype
+
+    if dtype == bool:
+        return col.to_numpy().astype(np.int64).tolist()
+
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        # Cast datetimes to str and replace space separator with T separator
+        # (replace is a no-op for dates, which are cast to str as YYYY-MM-DD)
+        strs = col.astype(str).str.replace(" ", "T", regex=False).to_numpy(dtype=object)
+        strs[col.isna().to_numpy()] = None
+        return strs.tolist()
+
+    if isinstance(dtype, np.dtype) and dtype.kind in "iu":
+        return col.to_numpy().tolist()
+
+    if isinstance(dtype, np.dtype) and dtype.kind == "f":
+        values = col.to_numpy()
+        are_null = np.isnan(values)
+        if not are_null.any():
+            return values.tolist()
+        values = values.astype(object)
+        values[are_null] = None
+        return values.tolist()
+
+    values = col.to_numpy(dtype=object)
+    values[pd.isna(values)] = None
+    return [
+        None if value is None or value == ""
+        else value if type(value) in (str, int, float)
+        else str(value)
+        for value in values.tolist()]
 
 def insert_or_fail(
     df: 'pd.DataFrame',
@@ -575,3 +703,351 @@ def insert_or_ignore(
     * Custom Data: https://qrok.it/dl/qr/custom-data
     """
     _insert_into(df, table_name, conn, "IGNORE")
+
+def insert_stream(
+    frames: Union[Iterable['pd.DataFrame'], 'pd.DataFrame'],
+    table_name: str,
+    conn: 'sqlalchemy.engine.Engine',
+    on_conflict: Literal["fail", "replace", "ignore"] = "fail",
+    rows_per_transaction: int = None
+    ) -> int:
+    """
+    Insert a stream of DataFrames into a SQLite database.
+
+    DataFrames are inserted one at a time as the iterator produces them, so
+    datasets too large to fit in memory can be loaded at constant memory,
+    for example by passing the chunks of `pd.read_csv(..., chunksize=...)`.
+
+    By default, all DataFrames are inserted in a single transaction, so that
+    either all or none are inserted. To bound the size of each transaction,
+    set `rows_per_transaction` to commit after that many rows; if an error
+    occurs, rows committed before the error remain in the database.
+
+    Parameters
+    ----------
+    frames : iterable of DataFrames or DataFrame, required
+        the DataFrames to insert. All DataFrame columns must
+        exist in the destination table. The DataFrame index
+        will not be inserted.
+
+    table_name : str, required
+        the name of the table to insert the DataFrames into.
+        The table must already exist in the database.
+
+    conn : sqlalchemy.engine.Engine, required
+        a connection object for the SQLite database
+
+    on_conflict : str
+        what to do in the case of a duplicate record insertion: fail, replace
+        the existing record, or ignore the incoming record. Possible choices:
+        fail, replace, ignore. Default fail.
+
+    rows_per_transaction : int, optional
+        commit after inserting this many rows (default is to insert all
+        rows in one transaction)
+
+    Returns
+    -------
+    int
+        the number of rows inserted
+
+    Raises
+    ------
+    quantrocket.exceptions.DataInsertionError
+        catch-all exception class for errors that occur when writing to the
+        SQLite database
+
+    Notes
+    -----
+    Usage Guide:
+
+    * Custom Data: https://qrok.it/dl/qr/custom-data
+
+    Examples
+    --------
+    Insert a large CSV file in chunks of 100,000 rows, committing every 1
+    million rows:
+
+    >>> conn = connect_sqlite("/var/lib/quantrocket/custom-data.sqlite")
+    >>> chunks = pd.read_csv("large-file.csv", parse_dates=["Date"], chunksize=100000)
+    >>> insert_stream(chunks, "Prices", conn, on_conflict="replace", rows_per_transaction=1000000)
+    """
+    import sqlite3
+    import pandas as pd
+
+    if on_conflict not in ("fail", "replace", "ignore"):
+        raise ParameterError("on_conflict must be one of fail, replace, ignore")
+
+    # iterating a DataFrame would iterate its column names
+    if isinstance(frames, pd.DataFrame):
+        frames = [frames]
+
+    # Close connection to avoid Database Is Locked
+    conn.dispose()
+
+    num_rows = 0
+    num_committed_rows = 0
+    num_uncommitted_rows = 0
+
+    db = _connect_sqlite3(conn.url.database)
+    try:
+        db.execute("BEGIN IMMEDIATE")
+        for df in frames:
+            for num_chunk_rows in _insert_chunks(db, df, table_name, on_conflict.upper()):
+                num_rows += num_chunk_rows
+                num_uncommitted_rows += num_chunk_rows
+                if rows_per_transaction and num_uncommitted_rows >= rows_per_transaction:
+                    db.execute("COMMIT")
+                    num_committed_rows = num_rows
+                    num_uncommitted_rows = 0
+                    db.execute("BEGIN IMMEDIATE")
+        db.execute("COMMIT")
+    except Exception as e:
+        if db.in_transaction:
+            db.execute("ROLLBACK")
+        if not isinstance(e, sqlite3.Error):
+            raise
+        msg = str(e)
+        if num_committed_rows:
+            msg += " ({0} rows were committed before the error)".format(num_committed_rows)
+        raise DataInsertionError(msg)
+    finally:
+        db.close()
+
+    return num_rows
+
+# number of rows to fetch and convert at a time
+_READ_CHUNKSIZE = 50000
+
+def read_table(
+    conn: 'sqlalchemy.engine.Engine',
+    table: str,
+    columns: list[str] = None,
+    where: str = None,
+    chunksize: int = None,
+    parse_dates: list[str] = None
+    ) -> Union['pd.DataFrame', Iterator['pd.DataFrame']]:
+    """
+    Query a table in a SQLite database into a DataFrame.
+
+    Rows are fetched in chunks and converted directly into a typed NumPy
+    array per column, and date columns are parsed from their ISO text in one
+    vectorized pass per chunk. This is faster than `pd.read_sql` for large
+    tables, and with `chunksize`, tables larger than memory can be processed
+    one chunk at a time.
+
+    Column dtypes are based on each column's declared type: INTEGER columns
+    are int64 (or float64 if they contain nulls or non-integer values), REAL
+    columns are float64,
+    columns whose declared type includes DATE or TIME (and any columns
+    named in `parse_dates`) are datetime64, and other columns are object.
+
+    Parameters
+    ----------
+    conn : sqlalchemy.engine.Engine, required
+        a connection object for the SQLite database
+
+    table : str, required
+        the name of the table to query
+
+    columns : list of str, optional
+        only return these columns (default is to return all columns)
+
+    where : str, optional
+        a SQL expression to filter rows by, for example
+        "Date >= '2024-01-01'"
+
+    chunksize : int, optional
+        return an iterator of DataFrames with up to this many rows each,
+        rather than a single DataFrame
+
+    parse_dates : list of str, optional
+        parse these columns as dates in addition to those whose declared type
+        includes DATE or TIME
+
+    Returns
+    -------
+    DataFrame or iterator of DataFrames
+        the table data, or an iterator of chunks if chunksize is specified
+
+    Notes
+    -----
+    Usage Guide:
+
+    * Custom Data: https://qrok.it/dl/qr/custom-data
+
+    Examples
+    --------
+    Query prices for 2024:
+
+    >>> conn = connect_sqlite("/var/lib/quantrocket/custom-data.sqlite", profile="read")
+    >>> prices = read_table(conn, "Prices", columns=["Sid", "Date", "Close"], where="Date >= '2024-01-01'")
+
+    Process a large table in chunks of 1 million rows:
+
+    >>> for chunk in read_table(conn, "Prices", chunksize=1000000):
+    ...     process(chunk)
+    """
+    chunks = _read_chunks(
+        conn, table, columns=columns, where=where,
+        chunksize=chunksize or _READ_CHUNKSIZE,
+        parse_dates=parse_dates,
+        yield_empty=not chunksize)
+
+    if chunksize:
+        return chunks
+
+    import pandas as pd
+
+    chunks = list(chunks)
+    if len(chunks) == 1:
+        return chunks[0]
+    return pd.concat(chunks, ignore_index=True)
+
+def _read_chunks(conn, table, columns, where, chunksize, parse_dates, yield_empty=False):
+    """
+    Validate the columns, then return a generator of DataFrames for the
+    query.
+    """
+    db = _connect_sqlite3(conn.url.database)
+    try:
+        declared_types = dict(
+            (row[1], row[2].upper())
+            for row in db.execute("PRAGMA table_info({0})".format(_quote_identifier(table))))
+        if not declared_types:
+            raise ParameterError("no such table: {0}".format(table))
+
+        columns = columns or list(declared_types)
+        unknown_columns = set(columns) - set(declared_types)
+        if unknown_columns:
+            raise ParameterError("unknown columns for table {0}: {1}".format(
+                table, ", ".join(sorted(unknown_columns))))
+
+        parse_dates = set(parse_dates or [])
+        column_kinds = [
+            "date" if col in parse_dates or "DATE" in declared_types[col] or "TIME" in declared_types[col]
+            else "int" if "INT" in declared_types[col]
+            else "float" if any(t in declared_types[col] for t in ("REAL", "FLOA", "DOUB"))
+            else "object"
+            for col in columns]
+
+        sql = "SELECT {0} FROM {1}".format(
+            ",".join(_quote_identifier(col) for col in columns),
+            _quote_identifier(table))
+        if where:
+            sql += " WHERE {0}".format(where)
+
+        cursor = db.execute(sql)
+    except Exception:
+        db.close()
+        raise
+
+    return _generate_chunks(db, cursor, columns, column_kinds, chunksize, yield_empty)
+
+def _generate_chunks(db, cursor, columns, column_kinds, chunksize, yield_empty):
+    """
+    Fetch rows from the cursor and yield them as DataFrames, closing the
+    connection when done. If yield_empty is True and there are no rows,
+    yield an empty DataFrame with the expected dtypes.
+    """
+    import pandas as pd
+
+    try:
+        while True:
+            rows = cursor.fetchmany(chunksize)
+            if not rows and not yield_empty:
+                break
+
+            yield_empty = False
+
+            data = _get_column_arrays(rows, columns, column_kinds)
+            yield pd.DataFrame(data, copy=False)
+
+            if len(rows) < chunksize:
+                break
+    finally:
+        db.close()
+
+def _get_column_arrays(rows, columns, column_kinds):
+    """
+    Convert a list of row tuples to a dict of column arrays.
+    """
+    import numpy as np
+
+    # Convert the rows directly into columns with a structured dtype,
+    # falling back to converting each column separately if the values
+    # don't fit (for example, text in a REAL column). INTEGER columns are
+    # extracted as objects, as they may also hold REAL values or nulls.
+    dtype = np.dtype([
+        ("f{0}".format(i), np.float64 if kind == "float" else object)
+        for i, kind in enumerate(column_kinds)])
+    try:
+        records = np.array(rows, dtype=dtype)
+    except (TypeError, ValueError):
+        return dict(
+            (col, _get_column_array(col_values, kind))
+            for col, col_values, kind in zip(columns, zip(*rows), column_kinds))
+
+    data = {}
+    for col, name, kind in zip(columns, dtype.names, column_kinds):
+        values = np.ascontiguousarray(records[name])
+        data[col] = values if kind == "float" else _get_column_array(values, kind)
+
+    return data
+
+def _get_column_array(values, kind):
+    """
+    Copy a sequence of column values into a preallocated NumPy array of the
+    appropriate dtype, falling back to a wider dtype if the values don't
+    fit (for example, nulls or REAL values in an INTEGER column).
+    """
+    import numpy as np
+
+    if kind == "int":
+        # SQLite's INTEGER affinity keeps REAL values that aren't whole
+        # numbers, and casting them to int64 would truncate them, so only
+        # use int64 if every value is an int
+        if all(type(value) is int for value in values):
+            array = np.empty(len(values), dtype=np.int64)
+            array[:] = values
+            return array
+        kind = "float"
+
+    if kind == "float":
+        array = np.empty(len(values), dtype=np.float64)
+        try:
+            # Nones become NaNs
+            array[:] = values
+            return array
+        except (TypeError, ValueError):
+            kind = "object"
+
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+
+    if kind == "date":
+        return _parse_dates(array)
+
+    return array
+
+def _parse_dates(values):
+    """
+    Parse an object array of ISO date strings.
+    """
+    import pandas as pd
+
+    # NumPy parses naive ISO strings fastest; fall back to pandas for
+    # anything else, such as UTC offsets
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", DeprecationWarning)
+        try:
+            return values.astype("datetime64[ns]")
+        except (ValueError, DeprecationWarning):
+            pass
+    return pd.to_datetime(values, format="ISO8601")
+
+def _quote_identifier(name):
+    """
+    Return the name quoted as a SQLite identifier.
+    """
+    return '"{0}"'.format(str(name).replace('"', '""'))
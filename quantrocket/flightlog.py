@@ -24,6 +24,10 @@ FlightlogHandler
 stream_logs
     Stream application logs, `tail -f` style.
 
+stream_log_records
+    Stream parsed and filtered application log records, reconnecting if the
+    connection is lost.
+
 download_logfile
     Download the logfile.
 
@@ -52,6 +56,7 @@ Usage Guide:
 __all__ = [
     "FlightlogHandler",
     "stream_logs",
+    "stream_log_records",
     "download_logfile",
     "wait_for_message",
     "get_timezone",
@@ -61,13 +66,20 @@ __all__ = [
 ]
 
 import logging, logging.handlers
-import socket
+import re
+import contextlib
+import json
+import datetime
+import atexit
+import threading
+import time
+import requests
 import six
 import sys
 import os
-from typing import Generator
+from typing import Generator, Union, Literal, Any
 from six.moves import queue, urllib
-from .exceptions import ImproperlyConfigured
+from .exceptions import ImproperlyConfigured, ParameterError
 from .houston import Houston, houston
 from quantrocket.utils._typing import FilepathOrBuffer
 from quantrocket._cli.utils.output import json_to_cli
@@ -77,12 +89,116 @@ FLIGHTLOG_PATH = "/flightlog/handler"
 
 LOG_RECORD_TYPE_BOUNDARY = "||||q5%XfK4#||||"
 
-class _ImpatientHttpHandler(logging.handlers.HTTPHandler):
+class _FlightlogStats(object):
+    """
+    Thread-safe counters of records enqueued, sent, dropped, and failed,
+    and of flush latency, shared by a flightlog handler and its queue.
     """
-    An HttpHandler that sets a short timeout (instead of the default no
-    timeout), as well as serializing the record attribute types so they can
-    be reconstituted.
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.enqueued = 0
+        self.sent = 0
+        self.dropped = 0
+        self.failed = 0
+        self.flushes = 0
+        self.flush_seconds = 0.0
+        self.max_flush_seconds = 0.0
+        self.last_flush_seconds = None
+
+    def increment(self, **counts):
+        with self.lock:
+            for name, count in counts.items():
+                setattr(self, name, getattr(self, name) + count)
+
+    def record_flush(self, seconds):
+        with self.lock:
+            self.flushes += 1
+            self.flush_seconds += seconds
+            self.max_flush_seconds = max(self.max_flush_seconds, seconds)
+            self.last_flush_seconds = seconds
+
+    def to_dict(self):
+        with self.lock:
+            return {
+                "enqueued": self.enqueued,
+                "sent": self.sent,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "flushes": self.flushes,
+                "mean_flush_seconds": self.flush_seconds / self.flushes if self.flushes else None,
+                "max_flush_seconds": self.max_flush_seconds if self.flushes else None,
+                "last_flush_seconds": self.last_flush_seconds,
+            }
+
+# LogRecord attributes sent in the compact format
+COMPACT_LOG_RECORD_FIELDS = (
+    "name",
+    "levelname",
+    "levelno",
+    "pathname",
+    "filename",
+    "module",
+    "lineno",
+    "funcName",
+    "created",
+    "msecs",
+    "process",
+    "processName",
+    "thread",
+    "threadName",
+)
+
+# cache of batch URL: whether flightlog supports the batch endpoint, so that
+# each process only tries an unsupported endpoint once
+_batch_endpoint_support = {}
+
+class _BatchingHttpHandler(logging.Handler):
     """
+    A handler that posts records to flightlog over a pooled keep-alive
+    connection.
+
+    Records are buffered and sent when the buffer reaches batch_size or
+    when flush_interval seconds have passed since the first buffered
+    record. Each request times out after timeout seconds. If a deadline
+    (a time.monotonic() value) is set, records still buffered after the
+    deadline are dropped rather than sent.
+
+    Each record is posted as a form, serializing the record attribute types
+    so they can be reconstituted. If use_batch_endpoint is True, each batch
+    is instead posted to the batch endpoint as JSON lines, one compact
+    record per line; this requires a flightlog version with a batch
+    endpoint. If flightlog doesn't have one, the handler falls back to
+    forms, and the fallback is remembered for the process.
+    """
+
+    def __init__(
+        self,
+        url,
+        credentials=None,
+        batch_size=1,
+        flush_interval=None,
+        timeout=3,
+        stats=None,
+        use_batch_endpoint=False,
+        ):
+        super(_BatchingHttpHandler, self).__init__()
+        self.url = url
+        self.batch_url = url + "/batch"
+        self.use_batch_endpoint = use_batch_endpoint
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.timeout = timeout
+        self.stats = stats or _FlightlogStats()
+        # records are counted as enqueued by the queue handler, if any
+        self.count_enqueued = stats is None
+        self.deadline = None
+        self.session = requests.Session()
+        if credentials:
+            self.session.auth = credentials
+        self.buffer = []
+        self._flush_timer = None
+        self._exc_formatter = logging.Formatter()
 
     def mapLogRecord(self, record):
         dict_with_types = {}
@@ -92,11 +208,232 @@ class _ImpatientHttpHandler(logging.handlers.HTTPHandler):
                 type_name, LOG_RECORD_TYPE_BOUNDARY, v)
         return dict_with_types
 
+    def compactLogRecord(self, record):
+        """
+        Return the record as a JSON line with the message, any formatted
+        exception, and the fields in COMPACT_LOG_RECORD_FIELDS.
+        """
+        data = {field: getattr(record, field, None) for field in COMPACT_LOG_RECORD_FIELDS}
+        data["msg"] = record.getMessage()
+        exc_text = record.exc_text
+        if record.exc_info and not exc_text:
+            exc_text = self._exc_formatter.formatException(record.exc_info)
+        if exc_text:
+            data["exc_text"] = exc_text
+        if record.stack_info:
+            data["stack_info"] = record.stack_info
+        return json.dumps(data, default=str, separators=(",", ":"))
+
     def emit(self, record):
-        orig_timeout = socket.getdefaulttimeout()
-        socket.setdefaulttimeout(3)
-        super(_ImpatientHttpHandler, self).emit(record)
-        socket.setdefaulttimeout(orig_timeout)
+        if self.count_enqueued:
+            self.stats.increment(enqueued=1)
+
+        self.buffer.append(record)
+
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+        elif self.flush_interval and not self._flush_timer:
+            self._flush_timer = threading.Timer(self.flush_interval, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def flush(self):
+        self.acquire()
+        try:
+            if self._flush_timer:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+
+            records, self.buffer = self.buffer, []
+            if not records:
+                return
+
+            start_time = time.monotonic()
+            if self.supports_batches is False or not self._post_batch(records):
+                self._post_forms(records)
+            self.stats.record_flush(time.monotonic() - start_time)
+        finally:
+            self.release()
+
+    @property
+    def supports_batches(self):
+        """
+        False if batches are not in use or flightlog is known not to
+        support them, True if it is known to, and None if not yet known.
+        """
+        if not self.use_batch_endpoint:
+            return False
+        return _batch_endpoint_support.get(self.batch_url)
+
+    def _post_batch(self, records):
+        """
+        Post the records to the batch endpoint. Returns False if flightlog
+        doesn't support batches.
+        """
+        if self.deadline and time.monotonic() >= self.deadline:
+            self.stats.increment(dropped=len(records))
+            return True
+
+        lines = []
+        for record in records:
+            try:
+                lines.append(self.compactLogRecord(record))
+            except Exception:
+                self.stats.increment(failed=1)
+                self.handleError(record)
+        if not lines:
+            return True
+
+        try:
+            response = self.session.post(
+                self.batch_url,
+                data="\n".join(lines).encode("utf-8"),
+                headers={"Content-Type": "application/x-ndjson"},
+                timeout=self.timeout)
+            if response.status_code in (404, 405) and not self.supports_batches:
+                _batch_endpoint_support[self.batch_url] = False
+                return False
+            response.raise_for_status()
+        except Exception:
+            self.stats.increment(failed=len(lines))
+            self.handleError(records[0])
+        else:
+            _batch_endpoint_support[self.batch_url] = True
+            self.stats.increment(sent=len(lines))
+
+        return True
+
+    def _post_forms(self, records):
+        """
+        Post each record as a form.
+        """
+        for i, record in enumerate(records):
+            if self.deadline and time.monotonic() >= self.deadline:
+                self.stats.increment(dropped=len(records) - i)
+                break
+            try:
+                response = self.session.post(
+                    self.url, data=self.mapLogRecord(record), timeout=self.timeout)
+                response.raise_for_status()
+            except Exception:
+                self.stats.increment(failed=1)
+                self.handleError(record)
+            else:
+                self.stats.increment(sent=1)
+
+    def get_stats(self):
+        """
+        Return counters of records enqueued, sent, dropped, and failed, and
+        flush latency.
+        """
+        return self.stats.to_dict()
+
+    @contextlib.contextmanager
+    def batch(self):
+        """
+        Buffer records logged within the context and send them together
+        when the context exits.
+        """
+        batch_size = self.batch_size
+        self.batch_size = float("inf")
+        try:
+            yield self
+        finally:
+            self.batch_size = batch_size
+            self.flush()
+
+    def close(self):
+        try:
+            self.flush()
+            self.session.close()
+        finally:
+            super(_BatchingHttpHandler, self).close()
+
+class _DrainingQueueListener(logging.handlers.QueueListener):
+    """
+    A QueueListener that can be stopped with a timeout.
+    """
+
+    def stop(self, timeout=None):
+        """
+        Stop the listener after it handles the records already queued,
+        waiting at most timeout seconds. Returns True if the listener
+        stopped in time.
+        """
+        thread, self._thread = self._thread, None
+        if not thread:
+            return True
+        try:
+            self.queue.put(self._sentinel, timeout=timeout)
+        except queue.Full:
+            return False
+        thread.join(timeout)
+        return not thread.is_alive()
+
+class _BoundedQueueHandler(logging.handlers.QueueHandler):
+    """
+    A QueueHandler for a bounded queue that drops the oldest or newest
+    record, or blocks, when the queue is full, and that drains the queue
+    when closed, within drain_timeout seconds.
+    """
+
+    def __init__(
+        self,
+        log_queue,
+        listener,
+        overflow="drop_oldest",
+        drain_timeout=5,
+        ):
+        super(_BoundedQueueHandler, self).__init__(log_queue)
+        self.listener = listener
+        self.overflow = overflow
+        self.drain_timeout = drain_timeout
+        self.stats = listener.handlers[0].stats
+
+    def enqueue(self, record):
+        if self.overflow == "block":
+            self.queue.put(record)
+        elif self.overflow == "drop_newest":
+            try:
+                self.queue.put_nowait(record)
+            except queue.Full:
+                self.stats.increment(dropped=1)
+                return
+        else:
+            while True:
+                try:
+                    self.queue.put_nowait(record)
+                    break
+                except queue.Full:
+                    try:
+                        self.queue.get_nowait()
+                    except queue.Empty:
+                        pass
+                    else:
+                        self.stats.increment(dropped=1)
+        self.stats.increment(enqueued=1)
+
+    def get_stats(self) -> dict[str, Union[int, float]]:
+        """
+        Return counters of records enqueued, sent, dropped, and failed, and
+        flush latency.
+        """
+        return self.stats.to_dict()
+
+    def close(self):
+        """
+        Send queued records, giving up after drain_timeout seconds.
+        """
+        try:
+            http_handler = self.listener.handlers[0]
+            http_handler.deadline = time.monotonic() + self.drain_timeout
+            if self.listener.stop(timeout=self.drain_timeout):
+                http_handler.flush()
+            else:
+                # records the listener didn't get to are lost
+                self.stats.increment(dropped=self.queue.qsize())
+        finally:
+            super(_BoundedQueueHandler, self).close()
 
 # cache of bool(background): FlightlogHandler instance. This cache is used
 # to prevent unintentional creation of duplicate handlers (which results in
@@ -104,7 +441,10 @@ class _ImpatientHttpHandler(logging.handlers.HTTPHandler):
 _flightlog_handlers = {}
 
 def FlightlogHandler(
-    background: bool = None
+    background: bool = None,
+    queue_size: int = 10000,
+    overflow: Literal["drop_oldest", "drop_newest", "block"] = "drop_oldest",
+    drain_timeout: float = 5
     ) -> logging.Handler:
     """
     Return a log handler that logs to flightlog.
@@ -115,13 +455,42 @@ def FlightlogHandler(
         If True, causes logging to happen in a background thread so that logging
         doesn't block. Background logging requires Python 3.2 or higher,
         and defaults to True for supported versions and False otherwise.
+        In the background, records are sent in batches, at least once per
+        second; in the foreground, records are sent as they are logged.
+
+    queue_size : int
+        maximum number of records to queue for background logging, or 0 for
+        no limit. Default 10000.
+
+    overflow : str
+        what to do when logging a record while the background queue is full:
+        drop the oldest queued record, drop the new record, or block until
+        the queue has room. Possible choices: drop_oldest, drop_newest,
+        block. Default drop_oldest.
+
+    drain_timeout : float
+        at exit, number of seconds to spend sending queued records before
+        dropping them. Default 5.
 
     Returns
     -------
-    `logging.handlers.QueueHandler` or `quantrocket.flightlog._ImpatientHttpHandler`
+    `quantrocket.flightlog._BoundedQueueHandler` or `quantrocket.flightlog._BatchingHttpHandler`
 
     Notes
     -----
+    The handler is created the first time this function is called and
+    returned again on subsequent calls with the same `background` argument,
+    ignoring the other arguments.
+
+    The handler's `get_stats` method returns counts of records enqueued, sent,
+    dropped, and failed, and flush latency.
+
+    Records are posted one per request. To post each batch in a single
+    request, in a compact format, set the environment variable
+    `FLIGHTLOG_BATCH=true`; this requires a flightlog version with a batch
+    endpoint. With older versions, the handler falls back to one request per
+    record after the first attempt.
+
     Usage Guide:
 
     * Logging: https://qrok.it/dl/qr/logging
@@ -137,12 +506,19 @@ def FlightlogHandler(
     >>> handler = FlightlogHandler()
     >>> logger.addHandler(handler)
     >>> logger.info('my app just opened a position')
+
+    Check whether any records have been dropped:
+
+    >>> handler.get_stats()["dropped"]
     """
+    if overflow not in ("drop_oldest", "drop_newest", "block"):
+        raise ParameterError(
+            "overflow must be one of drop_oldest, drop_newest, block")
+
     base_url = os.environ.get("HOUSTON_URL", None)
     if not base_url:
         raise ImproperlyConfigured("HOUSTON_URL is not set")
     parsed = urllib.parse.urlparse(base_url)
-    secure = parsed.scheme == "https"
     if "HOUSTON_USERNAME" in os.environ and "HOUSTON_PASSWORD" in os.environ:
         credentials = (os.environ["HOUSTON_USERNAME"], os.environ["HOUSTON_PASSWORD"])
     else:
@@ -150,18 +526,9 @@ def FlightlogHandler(
 
     path = os.environ.get("FLIGHTLOG_PATH") or FLIGHTLOG_PATH
 
-    if six.PY2:
-        if secure:
-            raise NotImplementedError("Logging to Flightlog over HTTPS requires Python 3")
-        if credentials:
-            raise NotImplementedError("Logging to Flightlog using Basic Auth requires Python 3")
+    url = "{0}://{1}{2}".format(parsed.scheme, parsed.netloc, path)
 
-    if six.PY2:
-        http_handler = _ImpatientHttpHandler(
-            parsed.netloc, path, method="POST")
-    else:
-        http_handler = _ImpatientHttpHandler(
-            parsed.netloc, path, method="POST", secure=secure, credentials=credentials)
+    use_batch_endpoint = os.environ.get("FLIGHTLOG_BATCH", "").lower() in ("1", "true")
 
     if six.PY2 or sys.version_info.minor < 2:
         if background:
@@ -175,13 +542,21 @@ def FlightlogHandler(
         return _flightlog_handlers[background]
 
     if background:
-        log_queue = queue.Queue(-1)  # no limit on size
-        queue_handler = logging.handlers.QueueHandler(log_queue)
-        listener = logging.handlers.QueueListener(log_queue, http_handler)
+        # batch records in the background
+        http_handler = _BatchingHttpHandler(
+            url, credentials=credentials, batch_size=100, flush_interval=1,
+            stats=_FlightlogStats(), use_batch_endpoint=use_batch_endpoint)
+        log_queue = queue.Queue(queue_size)
+        listener = _DrainingQueueListener(log_queue, http_handler)
         listener.start()
-        handler = queue_handler
+        handler = _BoundedQueueHandler(
+            log_queue, listener, overflow=overflow, drain_timeout=drain_timeout)
+        # drain the queue before logging shuts down
+        atexit.register(handler.close)
     else:
-        handler = http_handler
+        # send records as they are logged
+        handler = _BatchingHttpHandler(
+            url, credentials=credentials, use_batch_endpoint=use_batch_endpoint)
 
     # cache handler by class (based on background arg) in case this function
     # is called again
@@ -206,9 +581,12 @@ def _cli_log_message(msg, logger_name=None, level="INFO"):
     logger.setLevel(levelnum)
     if msg == "-":
         msg = sys.stdin.read()
-    for line in msg.splitlines():
-        if line:
-            logger.log(levelnum, line)
+    # each line is its own record; if the batch endpoint is enabled, the
+    # lines are sent in one request
+    with handler.batch():
+        for line in msg.splitlines():
+            if line:
+                logger.log(levelnum, line)
 
     exit_code = 0
     return None, exit_code
@@ -268,6 +646,205 @@ def stream_logs(
         houston.close()
         return
 
+# parses flightlog lines such as "2024-01-02 09:30:00 quantrocket.master: INFO message"
+_LOG_LINE_REGEX = re.compile(
+    r"^(?P<timestamp>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) "
+    r"(?P<service>\S+): (?P<level>[A-Z]+) (?P<message>.*)$", re.DOTALL)
+
+def stream_log_records(
+    services: Union[list[str], str] = None,
+    min_level: Literal["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"] = None,
+    match: str = None,
+    regex: bool = False,
+    hist: int = None,
+    reconnect: bool = True,
+    resume_hist: int = 1000,
+    max_reconnect_wait: float = 30
+    ) -> Generator[dict[str, Any], None, None]:
+    r"""
+    Stream parsed and filtered application log records, reconnecting if the
+    connection is lost.
+
+    Each log line is parsed into a record with timestamp, service, level,
+    and message. Lines that don't have a timestamp, such as traceback lines,
+    have None for timestamp, service, and level. A plain-string `match` is
+    checked against the undecoded line before any parsing, so that
+    non-matching lines are discarded cheaply.
+
+    The stream reconnects if the connection is lost or if houston returns a
+    5xx error, such as while flightlog restarts. After reconnecting, the
+    stream requests recent log history and resumes after the last line
+    received before the connection was lost.
+
+    Parameters
+    ----------
+    services : list of str, optional
+        limit to records from these services or loggers, for example
+        quantrocket.master
+
+    min_level : str, optional
+        limit to records at or above this level. Possible choices: DEBUG,
+        INFO, WARNING, ERROR, CRITICAL. Lines without a level, or with a
+        non-standard level, are excluded.
+
+    match : str, optional
+        limit to lines containing this string
+
+    regex : bool
+        if True, treat the `match` argument as a regular expression to
+        search the message for (default is to treat it as a plain string)
+
+    hist : int, optional
+        number of log lines to show right away
+
+    reconnect : bool
+        if the connection is lost, reconnect and resume (default True)
+
+    resume_hist : int
+        number of log lines to request when reconnecting, to recover lines
+        logged while disconnected. Default 1000.
+
+    max_reconnect_wait : float
+        maximum number of seconds to wait between reconnection attempts.
+        Default 30.
+
+    Yields
+    ------
+    dict
+        log record with keys timestamp, service, level, and message
+
+    Notes
+    -----
+    Usage Guide:
+
+    * Logging: https://qrok.it/dl/qr/logging
+
+    Examples
+    --------
+    Follow errors from the blotter:
+
+    >>> for record in stream_log_records(services="quantrocket.blotter", min_level="ERROR"):
+            print(record["timestamp"], record["message"])
+
+    Follow messages for a particular database:
+
+    >>> for record in stream_log_records(match=r"\[usstock-1d\]", regex=True):
+            ...
+    """
+    if isinstance(services, str):
+        services = [services]
+    services = set(services or [])
+
+    min_levelno = None
+    if min_level:
+        min_levelno = logging.getLevelName(min_level.upper())
+        if not isinstance(min_levelno, int):
+            raise ParameterError("min_level must be one of DEBUG, INFO, WARNING, ERROR, CRITICAL")
+
+    raw_match = None
+    message_pattern = None
+    if match and regex:
+        message_pattern = re.compile(match)
+    elif match:
+        raw_match = match.encode("utf-8")
+
+    params = {"nocolor": "true"}
+    if hist:
+        params["hist"] = hist
+
+    # position of the last line received, as its timestamp and the number
+    # of lines received with that timestamp
+    last_timestamp = None
+    num_at_last_timestamp = 0
+
+    reconnect_wait = 0
+
+    while True:
+        resume_timestamp = last_timestamp
+        num_to_skip = num_at_last_timestamp
+        response = None
+
+        try:
+            response = houston.get("/flightlog/stream/logs", stream=True, params=params)
+            houston.raise_for_status_with_json(response)
+            reconnect_wait = 0
+
+            for line in response.iter_lines():
+
+                if not line:
+                    continue
+
+                # lines without a timestamp belong to the preceding timestamp
+                if line[4:5] == b"-" and line[10:11] == b" ":
+                    timestamp = line[:19]
+                else:
+                    timestamp = last_timestamp
+
+                # skip lines already received before reconnecting
+                if resume_timestamp is not None:
+                    if timestamp is None or timestamp < resume_timestamp:
+                        continue
+                    if timestamp == resume_timestamp and num_to_skip:
+                        num_to_skip -= 1
+                        continue
+                    resume_timestamp = None
+
+                if timestamp == last_timestamp:
+                    num_at_last_timestamp += 1
+                else:
+                    last_timestamp = timestamp
+                    num_at_last_timestamp = 1
+
+                if raw_match is not None and raw_match not in line:
+                    continue
+
+                record = _parse_log_line(line.decode("utf-8"))
+
+                if services and record["service"] not in services:
+                    continue
+                if min_levelno is not None:
+                    # exclude lines with no level or a non-standard level
+                    levelno = logging.getLevelName(record["level"]) if record["level"] else None
+                    if not isinstance(levelno, int) or levelno < min_levelno:
+                        continue
+                if message_pattern and not message_pattern.search(record["message"]):
+                    continue
+
+                yield record
+
+        except (requests.ConnectionError, requests.exceptions.ChunkedEncodingError):
+            if not reconnect:
+                raise
+        except requests.HTTPError as e:
+            # houston returns 502 or 503 while flightlog restarts
+            if not reconnect or e.response is None or e.response.status_code < 500:
+                raise
+        finally:
+            if response is not None:
+                response.close()
+
+        if not reconnect:
+            return
+
+        # resume from recent history if lines have been received, otherwise
+        # request the original history, if any
+        if last_timestamp is not None:
+            params["hist"] = resume_hist
+        time.sleep(reconnect_wait)
+        reconnect_wait = min(max(reconnect_wait * 2, 1), max_reconnect_wait)
+
+def _parse_log_line(line):
+    """
+    Parse a flightlog line into a dict with keys timestamp, service, level,
+    and message.
+    """
+    parsed = _LOG_LINE_REGEX.match(line)
+    if not parsed:
+        return {"timestamp": None, "service": None, "level": None, "message": line}
+    record = parsed.groupdict()
+    record["timestamp"] = datetime.datetime.strptime(record["timestamp"], "%Y-%m-%d %H:%M:%S")
+    return record
+
 def _cli_print_stream(*args, **kwargs):
     generator = stream_logs(*args, **kwargs)
     for chunk in generator:
@@ -26,6 +26,10 @@ get_alpaca_etb_reindexed_like
     Return a DataFrame of Alpaca easy-to-borrow status, reindexed to match the index
     (dates) and columns (sids) of the input DataFrame.
 
+get_alpaca_etb_asof
+    Return a Series of Alpaca easy-to-borrow status for the requested sids as
+    of a single date.
+
 collect_ibkr_shortable_shares
     Collect Interactive Brokers shortable shares data and save to database.
 
@@ -54,6 +58,10 @@ get_ibkr_borrow_fees_reindexed_like
     Return a DataFrame of Interactive Brokers borrow fees, reindexed to match
     the index (dates) and columns (sids) of the input DataFrame.
 
+get_ibkr_borrow_fees_asof
+    Return a Series of Interactive Brokers borrow fees for the requested sids
+    as of a single date.
+
 get_ibkr_margin_requirements_reindexed_like
     Return a multiindex (Field, Date) DataFrame of Interactive Brokers margin
     requirements, reindexed to match the index (dates) and columns (sids) of
@@ -100,6 +108,10 @@ get_sharadar_fundamentals_reindexed_like
     Sharadar fundamentals, reindexed to match the index (dates)
     and columns (sids) of the input DataFrame.
 
+get_sharadar_fundamentals_asof
+    Return a DataFrame of the latest point-in-time Sharadar fundamentals for
+    the requested sids as of a single date.
+
 get_sharadar_institutions_reindexed_like
     Return a multiindex (Field, Date) DataFrame of Sharadar institutional
     investor data, reindexed to match the index (dates) and columns (sids) of
@@ -142,16 +154,28 @@ get_brain_bsi_reindexed_like
     Return a multiindex (Field, Date) DataFrame of Brain Sentiment Indicator (BSI) data,
     reindexed to match the index (dates) and columns (sids) of the input DataFrame.
 
+get_brain_bsi_asof
+    Return a DataFrame of Brain Sentiment Indicator (BSI) data for the
+    requested sids on a single date.
+
 get_brain_blmcf_reindexed_like
     Return a multiindex (Field, Date) DataFrame of Brain Language Metrics on Company
     Filings (BLMCF) data, reindexed to match the index (dates) and columns (sids) of
     the input DataFrame.
 
+get_brain_blmcf_asof
+    Return a DataFrame of the latest Brain Language Metrics on Company Filings
+    (BLMCF) data for the requested sids as of a single date.
+
 get_brain_blmect_reindexed_like
     Return a multiindex (Field, Date) DataFrame of Brain Language Metrics on Earnings
     Call Transcripts (BLMECT) data, reindexed to match the index (dates) and columns
     (sids) of the input DataFrame.
 
+get_brain_blmect_asof
+    Return a DataFrame of the latest Brain Language Metrics on Earnings Call
+    Transcripts (BLMECT) data for the requested sids as of a single date.
+
 Notes
 -----
 Usage Guide:
@@ -162,8 +186,9 @@ import six
 import sys
 import os
 import datetime
+import tempfile
 import requests
-from typing import TYPE_CHECKING, Union, Literal
+from typing import TYPE_CHECKING, Union, Literal, get_args
 if TYPE_CHECKING:
     import pandas as pd
 from quantrocket.utils._typing import FilepathOrBuffer
@@ -173,10 +198,16 @@ from quantrocket._cli.utils.output import json_to_cli
 from quantrocket._cli.utils.files import write_response_to_filepath_or_buffer
 from quantrocket.exceptions import ParameterError, MissingData, NoFundamentalData
 
+TMP_DIR = os.environ.get("QUANTROCKET_TMP_DIR", tempfile.gettempdir())
+
+# number of rows per chunk when parsing large downloads in chunks
+_CSV_CHUNKSIZE = 100000
+
 __all__ = [
     "collect_alpaca_etb",
     "download_alpaca_etb",
     "get_alpaca_etb_reindexed_like",
+    "get_alpaca_etb_asof",
     "collect_ibkr_shortable_shares",
     "collect_ibkr_borrow_fees",
     "collect_ibkr_margin_requirements",
@@ -185,6 +216,7 @@ __all__ = [
     "download_ibkr_margin_requirements",
     "get_ibkr_shortable_shares_reindexed_like",
     "get_ibkr_borrow_fees_reindexed_like",
+    "get_ibkr_borrow_fees_asof",
     "get_ibkr_margin_requirements_reindexed_like",
     "collect_sharadar_fundamentals",
     "collect_sharadar_insiders",
@@ -197,6 +229,7 @@ __all__ = [
     "download_sharadar_sec8",
     "download_sharadar_sp500",
     "get_sharadar_fundamentals_reindexed_like",
+    "get_sharadar_fundamentals_asof",
     "get_sharadar_institutions_reindexed_like",
     "get_sharadar_sec8_reindexed_like",
     "get_sharadar_sp500_reindexed_like",
@@ -207,8 +240,11 @@ __all__ = [
     "download_brain_blmcf",
     "download_brain_blmect",
     "get_brain_bsi_reindexed_like",
+    "get_brain_bsi_asof",
     "get_brain_blmcf_reindexed_like",
+    "get_brain_blmcf_asof",
     "get_brain_blmect_reindexed_like",
+    "get_brain_blmect_asof",
 ]
 
 def collect_alpaca_etb() -> dict[str, str]:
@@ -367,9 +403,61 @@ def get_alpaca_etb_reindexed_like(
     >>> closes = prices.loc["Close"]
     >>> are_etb = get_alpaca_etb_reindexed_like(closes)
     """
-    etb = _get_stockloan_data_reindexed_like(
-        download_alpaca_etb,
-        reindex_like=reindex_like, is_intraday=False).loc["EasyToBorrow"]
+    try:
+        import pandas as pd
+    except ImportError:
+        raise ImportError("pandas must be installed to use this function")
+
+    etb = _download_stockloan_data_like(
+        download_alpaca_etb, reindex_like=reindex_like, is_intraday=False)
+
+    # each record holds until the sid's next record
+    etb = etb[etb.EasyToBorrow.notnull()]
+    are_etb = _states_to_mask(
+        reindex_like, etb.Sid, etb.Date, etb.EasyToBorrow.astype(bool))
+
+    return _mask_to_frame(are_etb, reindex_like)
+
+def get_alpaca_etb_asof(
+    sids: Union[list[str], str],
+    as_of_date: str = None
+    ) -> 'pd.Series':
+    """
+    Return a Series of Alpaca easy-to-borrow status for the requested sids as
+    of a single date.
+
+    This is a point-in-time cross-section of the data returned by
+    `get_alpaca_etb_reindexed_like`, useful for live trading and screening
+    when only the latest status is needed.
+
+    Parameters
+    ----------
+    sids : list of str, required
+        the sids to return easy-to-borrow status for
+
+    as_of_date : str (YYYY-MM-DD), optional
+        the date as of which to return easy-to-borrow status. Defaults to
+        today.
+
+    Returns
+    -------
+    Series
+        a Boolean Series indicating easy-to-borrow status, indexed by sid
+
+    Notes
+    -----
+    Usage Guide:
+
+    * Alpaca ETB: https://qrok.it/dl/qr/alpaca-etb
+
+    Examples
+    --------
+    Get the current easy-to-borrow status for a list of stocks:
+
+    >>> are_etb = get_alpaca_etb_asof(sids)
+    """
+    etb = _get_stockloan_data_asof(
+        download_alpaca_etb, sids, as_of_date=as_of_date)["EasyToBorrow"]
 
     return etb.fillna(0).astype(bool)
 
@@ -811,25 +899,19 @@ def download_ibkr_margin_requirements(
 def _cli_download_ibkr_margin_requirements(*args, **kwargs):
     return json_to_cli(download_ibkr_margin_requirements, *args, **kwargs)
 
-def _get_stockloan_data_reindexed_like(stockloan_func, reindex_like,
-                                       time=None, is_intraday=True,
-                                       aggregate=False, fields=None, shift=0):
+def _download_stockloan_data_like(stockloan_func, reindex_like,
+                                  is_intraday=True, aggregate=False):
     """
-    Common base function for get_ibkr_shortable_shares_reindexed_like and
-    get_ibkr_borrow_fees_reindexed_like and get_alpaca_etb_reindexed_like.
+    Query stockloan data for the dates and sids of reindex_like and return
+    it as a DataFrame.
 
     Parameters
     ----------
-
     stockloan_func : func
         the download function for the stockloan data
 
     reindex_like : DataFrame
-        the input DataFrame to conform the stockloan data to
-
-    time : str
-        the time of day for which to return stockloan data. Only
-        applicable to intraday stockloan data
+        the input DataFrame to query stockloan data for
 
     is_intraday : bool
         whether the stockloan data is intraday or daily
@@ -837,16 +919,12 @@ def _get_stockloan_data_reindexed_like(stockloan_func, reindex_like,
     aggregate : bool
         whether to query aggregate data
 
-    fields : list of str
-        limit to these fields
-
-    shift : int, optional
-        shift values this many periods. By default, values are not shifted.
+    Returns
+    -------
+    DataFrame
+        stockloan data, with the Date column parsed
     """
-    try:
-        import pandas as pd
-    except ImportError:
-        raise ImportError("pandas must be installed to use this function")
+    import pandas as pd
 
     index_levels = reindex_like.index.names
     if "Time" in index_levels:
@@ -879,6 +957,48 @@ def _get_stockloan_data_reindexed_like(stockloan_func, reindex_like,
     stockloan_data = pd.read_csv(f)
     stockloan_data["Date"] = pd.to_datetime(stockloan_data.Date, utc=is_intraday)
 
+    return stockloan_data
+
+def _get_stockloan_data_reindexed_like(stockloan_func, reindex_like,
+                                       time=None, is_intraday=True,
+                                       aggregate=False, fields=None, shift=0):
+    """
+    Common base function for get_ibkr_shortable_shares_reindexed_like and
+    get_ibkr_borrow_fees_reindexed_like and get_alpaca_etb_reindexed_like.
+
+    Parameters
+    ----------
+
+    stockloan_func : func
+        the download function for the stockloan data
+
+    reindex_like : DataFrame
+        the input DataFrame to conform the stockloan data to
+
+    time : str
+        the time of day for which to return stockloan data. Only
+        applicable to intraday stockloan data
+
+    is_intraday : bool
+        whether the stockloan data is intraday or daily
+
+    aggregate : bool
+        whether to query aggregate data
+
+    fields : list of str
+        limit to these fields
+
+    shift : int, optional
+        shift values this many periods. By default, values are not shifted.
+    """
+    try:
+        import pandas as pd
+    except ImportError:
+        raise ImportError("pandas must be installed to use this function")
+
+    stockloan_data = _download_stockloan_data_like(
+        stockloan_func, reindex_like, is_intraday=is_intraday, aggregate=aggregate)
+
     if is_intraday:
         # Determine timezone, from:
         # - time param if provided
@@ -987,6 +1107,465 @@ def _get_stockloan_data_reindexed_like(stockloan_func, reindex_like,
 
     return stockloan_data
 
+def _parse_as_of_date(as_of_date):
+    """
+    Parse an as-of date into a tz-naive, normalized Timestamp, defaulting
+    to today.
+    """
+    import pandas as pd
+
+    if as_of_date is None:
+        return pd.Timestamp.today().normalize()
+
+    try:
+        as_of_date = pd.Timestamp(as_of_date)
+    except ValueError as e:
+        raise ParameterError("could not parse as_of_date '{0}': {1}".format(
+            as_of_date, str(e)))
+
+    if as_of_date.tz:
+        as_of_date = as_of_date.tz_localize(None)
+
+    return as_of_date.normalize()
+
+def _select_asof(data, sids, date_field="Date", fields=None):
+    """
+    Return a DataFrame (sids x fields) of the latest non-null value of each
+    field for each sid.
+
+    Parameters
+    ----------
+    data : DataFrame
+        records that have already been limited to the as-of date
+
+    sids : list of str
+        the sids to conform the result to
+
+    date_field : str
+        the name of the date column used to order the records
+
+    fields : list of str, optional
+        limit to these fields (in this order)
+    """
+    # last() skips nulls, which mirrors the per-field ffill done by the
+    # *_reindexed_like functions
+    latest = data.sort_values(date_field, kind="stable").groupby("Sid").last()
+
+    if fields:
+        latest = latest.reindex(columns=fields)
+    elif date_field in latest.columns:
+        latest = latest.drop(date_field, axis=1)
+
+    latest = latest.reindex(index=sids)
+    latest.index.name = "Sid"
+    latest.columns.name = None
+    return latest
+
+def _get_csv_dtypes(schema, compact=False):
+    """
+    Return a dict of dtypes to pass to pd.read_csv for a dataset schema.
+
+    If compact is False, an empty dict is returned and pandas infers the
+    dtypes as usual. If compact is True, enumerated string fields are parsed
+    as categoricals and numeric fields are parsed as float32 rather than
+    float64. Dates are left to parse_dates.
+
+    Parameters
+    ----------
+    schema : dict
+        dict with keys "fields" (all fields in the dataset), "dates" (date
+        fields) and "categories" (a dict of categorical fields and their
+        categories, or None to infer the categories)
+
+    compact : bool
+        whether to return compact dtypes
+
+    Returns
+    -------
+    dict
+        dtypes by field
+    """
+    import pandas as pd
+
+    dtypes = {}
+    if not compact:
+        return dtypes
+
+    for field, categories in schema["categories"].items():
+        dtypes[field] = pd.CategoricalDtype(categories) if categories else "category"
+
+    non_numeric_fields = set(schema["dates"]) | set(dtypes)
+    for field in schema["fields"]:
+        if field not in non_numeric_fields:
+            dtypes[field] = "float32"
+
+    return dtypes
+
+def _read_csv_deduped(download_func, dedupe_subset, sort_by=None,
+                      usecols=None, parse_dates=None, chunk_func=None,
+                      chunksize=None):
+    """
+    Download a CSV to a temporary file and parse it in chunks, deduplicating
+    each chunk as it is parsed so that peak memory is bounded by the records
+    that survive deduplication rather than the size of the raw download. The
+    survivors are deduplicated against each other in a single final pass.
+
+    Parameters
+    ----------
+    download_func : func
+        a function that accepts a file-like object and downloads the CSV to it
+
+    dedupe_subset : list of str
+        columns identifying duplicate records; the last record is kept
+
+    sort_by : str or list of str, optional
+        sort by these columns (stably) before deduplicating, so that the last
+        record according to this sort order is kept
+
+    usecols : list-like or callable, optional
+        passed to pd.read_csv
+
+    parse_dates : list of str, optional
+        parse these columns as dates if present
+
+    chunk_func : func, optional
+        a function to apply to each chunk before it is deduplicated, for
+        example to filter out unneeded records
+
+    chunksize : int, optional
+        number of rows per chunk (defaults to _CSV_CHUNKSIZE)
+
+    Returns
+    -------
+    DataFrame
+    """
+    import pandas as pd
+
+    with tempfile.TemporaryFile(mode="w+b", dir=TMP_DIR) as f:
+        download_func(f)
+        f.seek(0)
+
+        chunks = []
+        for chunk in pd.read_csv(
+                f, chunksize=chunksize or _CSV_CHUNKSIZE, usecols=usecols):
+
+            # parse dates per chunk with to_datetime (rather than
+            # read_csv) so that all-null chunks are still datetimes
+            for date_field in (parse_dates or []):
+                if date_field in chunk.columns:
+                    chunk[date_field] = pd.to_datetime(chunk[date_field])
+
+            if chunk_func:
+                chunk = chunk_func(chunk)
+
+            if sort_by:
+                chunk = chunk.sort_values(sort_by, kind="stable")
+
+            chunks.append(chunk.drop_duplicates(subset=dedupe_subset, keep="last"))
+
+    if not chunks:
+        return pd.DataFrame()
+
+    # dedupe the survivors of each chunk against each other once at the end;
+    # the sort is stable, so ties are still resolved in favor of the last
+    # chunk
+    deduped = pd.concat(chunks, ignore_index=True)
+    if sort_by:
+        deduped = deduped.sort_values(sort_by, kind="stable")
+
+    return deduped.drop_duplicates(subset=dedupe_subset, keep="last")
+
+def _get_mask_coordinates(reindex_like, sids, dates):
+    """
+    Return the sorted (tz-naive) index dates of reindex_like, the sort order,
+    and the column positions and dates of the records, for use by the mask
+    builders.
+
+    Record dates are assumed to be in the local timezone of reindex_like, so
+    dates are compared as wall-clock times.
+    """
+    import numpy as np
+
+    index = reindex_like.index
+    if index.tz:
+        index = index.tz_localize(None)
+    index_dates = index.values.astype("datetime64[ns]")
+    order = np.argsort(index_dates, kind="stable")
+    sorted_index_dates = index_dates[order]
+
+    record_cols = reindex_like.columns.get_indexer(sids)
+    record_dates = np.asarray(dates).astype("datetime64[ns]")
+
+    return sorted_index_dates, order, record_cols, record_dates
+
+def _unsort_mask(sorted_mask, order):
+    """
+    Return a mask built on sorted index dates in the original index order.
+    """
+    import numpy as np
+
+    mask = np.empty_like(sorted_mask)
+    mask[order] = sorted_mask
+    return mask
+
+def _events_to_mask(reindex_like, sids, dates):
+    """
+    Return a Boolean ndarray shaped like reindex_like which is True where a
+    sid has an event record on the index date.
+
+    Parameters
+    ----------
+    reindex_like : DataFrame
+        DataFrame with a DatetimeIndex and sids for columns
+
+    sids : array-like
+        the sid of each event record
+
+    dates : array-like of datetime64
+        the (tz-naive) date of each event record
+
+    Returns
+    -------
+    ndarray
+    """
+    import numpy as np
+
+    sorted_index_dates, order, record_cols, record_dates = _get_mask_coordinates(
+        reindex_like, sids, dates)
+
+    sorted_mask = np.zeros(reindex_like.shape, dtype=bool)
+
+    positions = np.searchsorted(sorted_index_dates, record_dates, side="left")
+    found = (record_cols >= 0) & (positions < len(sorted_index_dates))
+    found[found] = sorted_index_dates[positions[found]] == record_dates[found]
+    sorted_mask[positions[found], record_cols[found]] = True
+
+    return _unsort_mask(sorted_mask, order)
+
+def _states_to_mask(reindex_like, sids, dates, states):
+    """
+    Return a Boolean ndarray shaped like reindex_like which is True where a
+    sid's most recent state record on or before the index date is True.
+
+    Each record opens an interval that lasts until the sid's next record, so
+    add/remove records (or periodic status records) are converted to
+    per-sid intervals and painted into the mask without forward-filling a
+    full date x sid grid.
+
+    Parameters
+    ----------
+    reindex_like : DataFrame
+        DataFrame with a DatetimeIndex and sids for columns
+
+    sids : array-like
+        the sid of each state record
+
+    dates : array-like of datetime64
+        the (tz-naive) date of each state record
+
+    states : array-like of bool
+        the state of each record
+
+    Returns
+    -------
+    ndarray
+    """
+    import numpy as np
+
+    sorted_index_dates, order, record_cols, record_dates = _get_mask_coordinates(
+        reindex_like, sids, dates)
+    states = np.asarray(states, dtype=bool)
+
+    in_columns = record_cols >= 0
+    record_cols = record_cols[in_columns]
+    record_dates = record_dates[in_columns]
+    states = states[in_columns]
+
+    # sort records by sid, then date (lexsort is stable, so for duplicate
+    # dates the last record wins)
+    record_order = np.lexsort((record_dates, record_cols))
+    record_cols = record_cols[record_order]
+    record_dates = record_dates[record_order]
+    states = states[record_order]
+
+    num_dates = len(sorted_index_dates)
+    starts = np.searchsorted(sorted_index_dates, record_dates, side="left")
+    # each interval ends at the sid's next record, or else extends to the end
+    ends = np.full(len(starts), num_dates)
+    has_next = record_cols[1:] == record_cols[:-1]
+    ends[:-1][has_next] = starts[1:][has_next]
+
+    is_open = states & (ends > starts)
+    starts = starts[is_open]
+    ends = ends[is_open]
+    record_cols = record_cols[is_open]
+
+    # A sid's non-empty intervals are disjoint, so starts (and ends) are
+    # unique per sid and can be painted as +1/-1 boundaries and cumsummed
+    boundaries = np.zeros((num_dates + 1, reindex_like.shape[1]), dtype=np.int8)
+    boundaries[starts, record_cols] += 1
+    boundaries[ends, record_cols] -= 1
+    sorted_mask = np.cumsum(boundaries[:-1], axis=0, dtype=np.int8) > 0
+
+    return _unsort_mask(sorted_mask, order)
+
+def _mask_to_frame(mask, reindex_like, sparse=False):
+    """
+    Return a Boolean mask (ndarray or scalar) as a DataFrame shaped like
+    reindex_like, optionally with sparse columns.
+    """
+    import pandas as pd
+
+    mask = pd.DataFrame(mask, index=reindex_like.index, columns=reindex_like.columns)
+    if sparse:
+        mask = mask.astype(pd.SparseDtype(bool, False))
+    return mask
+
+def _align_records_asof(records, reindex_like, max_staleness=None):
+    """
+    Return a multiindex (Field, Date) DataFrame of sparse records aligned to
+    reindex_like, where each field on each date holds the sid's latest
+    non-null value on or before that date.
+
+    Like _states_to_mask, each record is converted to an interval of index
+    rows that lasts until the sid's next record (or until max_staleness
+    elapses), and the intervals are painted into an index of record ids with
+    a cumsum over interval boundaries. This avoids reindexing every field to
+    a unioned dates x sids grid and forward-filling it; besides the output,
+    each field needs only one integer array shaped like reindex_like.
+
+    Parameters
+    ----------
+    records : DataFrame
+        records with Sid and (tz-naive) Date columns plus one column per field,
+        deduplicated on (Sid, Date). Dates are assumed to be in the local
+        timezone of reindex_like, so they are compared as wall-clock times.
+
+    reindex_like : DataFrame
+        DataFrame with a DatetimeIndex and sids for columns
+
+    max_staleness : str or Timedelta, optional
+        don't fill values older than this relative to the index date. Pass
+        "0D" to use only values dated exactly on the index date. Default is
+        no limit.
+
+    Returns
+    -------
+    DataFrame
+    """
+    import numpy as np
+    import pandas as pd
+
+    sorted_index_dates, order, all_record_cols, all_record_dates = _get_mask_coordinates(
+        reindex_like, records.Sid, records.Date)
+    num_dates = len(sorted_index_dates)
+
+    if max_staleness is not None:
+        max_staleness = pd.Timedelta(max_staleness).to_timedelta64()
+
+    all_fields = {}
+    for fieldname in records.columns:
+        if fieldname in ("Sid", "Date"):
+            continue
+
+        values = records[fieldname].values
+
+        # Ignore nulls, so that each field is filled from the latest record
+        # that has a value for it
+        is_used = (all_record_cols >= 0) & records[fieldname].notnull().values
+        record_cols = all_record_cols[is_used]
+        record_dates = all_record_dates[is_used]
+        values = values[is_used]
+
+        # sort records by sid, then date
+        record_order = np.lexsort((record_dates, record_cols))
+        record_cols = record_cols[record_order]
+        record_dates = record_dates[record_order]
+        values = values[record_order]
+
+        starts = np.searchsorted(sorted_index_dates, record_dates, side="left")
+        # each interval ends at the sid's next record, or else extends to the end
+        ends = np.full(len(starts), num_dates)
+        has_next = record_cols[1:] == record_cols[:-1]
+        ends[:-1][has_next] = starts[1:][has_next]
+        if max_staleness is not None:
+            ends = np.minimum(ends, np.searchsorted(
+                sorted_index_dates, record_dates + max_staleness, side="right"))
+
+        is_open = ends > starts
+        starts = starts[is_open]
+        ends = ends[is_open]
+        record_cols = record_cols[is_open]
+        values = values[is_open]
+
+        # Paint each interval as +id/-id boundaries and cumsum them, where id
+        # is the record's position in values plus 1. A sid's non-empty
+        # intervals are disjoint, so the cumsum on each index row is the id
+        # of the covering record, or 0 if none.
+        id_dtype = np.int32 if len(values) < np.iinfo(np.int32).max else np.int64
+        ids = np.arange(1, len(values) + 1, dtype=id_dtype)
+        sorted_ids = np.zeros((num_dates + 1, reindex_like.shape[1]), dtype=id_dtype)
+        sorted_ids[starts, record_cols] += ids
+        sorted_ids[ends, record_cols] -= ids
+        np.cumsum(sorted_ids, axis=0, out=sorted_ids)
+        field_ids = _unsort_mask(sorted_ids[:-1], order)
+
+        # look up the values by id, with id 0 holding the missing value
+        if values.dtype.kind in "biuf":
+            values = np.concatenate([[np.nan], values.astype(np.float64)])
+        elif values.dtype.kind == "M":
+            values = np.concatenate([np.array(["NaT"], dtype=values.dtype), values])
+        else:
+            values = np.concatenate([np.array([np.nan], dtype=object), values])
+
+        all_fields[fieldname] = pd.DataFrame(
+            values[field_ids], index=reindex_like.index, columns=reindex_like.columns)
+
+    return pd.concat(all_fields, names=["Field", "Date"])
+
+def _get_stockloan_data_asof(stockloan_func, sids, as_of_date=None):
+    """
+    Common base function for get_ibkr_borrow_fees_asof and get_alpaca_etb_asof.
+
+    Parameters
+    ----------
+    stockloan_func : func
+        the download function for the (daily) stockloan data
+
+    sids : list of str
+        the sids to query
+
+    as_of_date : str (YYYY-MM-DD), optional
+        the date as of which to return stockloan data. Defaults to today.
+
+    Returns
+    -------
+    DataFrame
+        a DataFrame of stockloan data indexed by sid
+    """
+    try:
+        import pandas as pd
+    except ImportError:
+        raise ImportError("pandas must be installed to use this function")
+
+    if not isinstance(sids, (list, tuple)):
+        sids = [sids]
+
+    as_of_date = _parse_as_of_date(as_of_date)
+
+    # Stockloan data is sparse but batched in monthly files, so start >1-month
+    # before the as-of date (same lookback as _get_stockloan_data_reindexed_like)
+    start_date = (as_of_date - pd.Timedelta(days=45)).date().isoformat()
+    end_date = as_of_date.date().isoformat()
+
+    f = six.StringIO()
+    stockloan_func(
+        f, sids=list(sids), start_date=start_date, end_date=end_date)
+    stockloan_data = pd.read_csv(f, parse_dates=["Date"])
+    stockloan_data = stockloan_data[stockloan_data.Date <= as_of_date]
+
+    return _select_asof(stockloan_data, sids)
+
 def get_ibkr_shortable_shares_reindexed_like(
     reindex_like: 'pd.DataFrame',
     aggregate: bool = False,
@@ -1170,6 +1749,46 @@ def get_ibkr_borrow_fees_reindexed_like(
         download_ibkr_borrow_fees,
         reindex_like=reindex_like, is_intraday=False, shift=shift).loc["FeeRate"]
 
+def get_ibkr_borrow_fees_asof(
+    sids: Union[list[str], str],
+    as_of_date: str = None
+    ) -> 'pd.Series':
+    """
+    Return a Series of Interactive Brokers borrow fees for the requested sids
+    as of a single date.
+
+    This is a point-in-time cross-section of the data returned by
+    `get_ibkr_borrow_fees_reindexed_like`, useful for live trading and
+    screening when only the latest borrow fees are needed.
+
+    Parameters
+    ----------
+    sids : list of str, required
+        the sids to return borrow fees for
+
+    as_of_date : str (YYYY-MM-DD), optional
+        the date as of which to return borrow fees. Defaults to today.
+
+    Returns
+    -------
+    Series
+        a Series of borrow fees, indexed by sid
+
+    Notes
+    -----
+    Usage Guide:
+
+    * IBKR Short Sale Data: https://qrok.it/dl/qr/ibkr-short
+
+    Examples
+    --------
+    Get the current borrow fees for a list of stocks:
+
+    >>> borrow_fees = get_ibkr_borrow_fees_asof(sids)
+    """
+    return _get_stockloan_data_asof(
+        download_ibkr_borrow_fees, sids, as_of_date=as_of_date)["FeeRate"]
+
 def get_ibkr_margin_requirements_reindexed_like(
     reindex_like: 'pd.DataFrame',
     time: str = None,
@@ -1508,24 +2127,26 @@ def get_reuters_financials_reindexed_like(reindex_like, coa_codes, fields=["Amou
     if not isinstance(coa_codes, (list, tuple)):
         coa_codes = [coa_codes]
 
-    f = six.StringIO()
-    download_reuters_financials(
-        coa_codes, f, sids=sids, start_date=start_date, end_date=end_date,
-        fields=fields, interim=interim, exclude_restatements=exclude_restatements)
-    financials = pd.read_csv(
-        f, parse_dates=["SourceDate","FiscalPeriodEndDate"])
-
-    # Rename SourceDate to match price history index name
-    financials = financials.rename(columns={"SourceDate": "Date"})
-
-    # Drop any fields we don't need
+    # Don't parse any fields we don't need
     needed_fields = set(fields)
-    needed_fields.update(set(("Sid", "Date", "CoaCode")))
+    needed_fields.update(set(("Sid", "SourceDate", "CoaCode")))
     if max_lag:
         needed_fields.add("FiscalPeriodEndDate")
-    unneeded_fields = set(financials.columns) - needed_fields
-    if unneeded_fields:
-        financials = financials.drop(unneeded_fields, axis=1)
+
+    # There might be duplicate SourceDates if a company announced reports for
+    # several fiscal periods at once. In this case we keep only the last value
+    # (i.e. latest fiscal period). Deduping as the download is parsed keeps
+    # memory bounded by the size of the result.
+    financials = _read_csv_deduped(
+        lambda f: download_reuters_financials(
+            coa_codes, f, sids=sids, start_date=start_date, end_date=end_date,
+            fields=fields, interim=interim, exclude_restatements=exclude_restatements),
+        dedupe_subset=["CoaCode", "Sid", "SourceDate"],
+        usecols=lambda field: field in needed_fields,
+        parse_dates=["SourceDate", "FiscalPeriodEndDate"])
+
+    # Rename SourceDate to match price history index name
+    financials = financials.rename(columns={"SourceDate": "Date"})
 
     # if reindex_like.index is tz-aware, make financials tz-aware so they can
     # be joined (tz-aware or tz-naive are both fine, as SourceDate represents
@@ -1546,10 +2167,6 @@ def get_reuters_financials_reindexed_like(reindex_like, coa_codes, fields=["Amou
             continue
         if "CoaCode" not in fields:
             financials_for_code = financials_for_code.drop("CoaCode", axis=1)
-        # There might be duplicate SourceDates if a company announced
-        # reports for several fiscal periods at once. In this case we keep
-        # only the last value (i.e. latest fiscal period)
-        financials_for_code = financials_for_code.drop_duplicates(subset=["Sid", "Date"], keep="last")
         financials_for_code = financials_for_code.pivot(index="Sid",columns="Date").T
         multiidx = pd.MultiIndex.from_product(
             (financials_for_code.index.get_level_values(0).unique(), union_date_idx),
@@ -1821,23 +2438,35 @@ def get_reuters_estimates_reindexed_like(reindex_like, codes, fields=["Actual"],
     if not isinstance(codes, (list, tuple)):
         codes = [codes]
 
-    f = six.StringIO()
     query_fields = list(fields) # copy fields on Py2 or 3: https://stackoverflow.com/a/2612815/417414
     if "UpdatedDate" not in query_fields:
         query_fields.append("UpdatedDate")
-    download_reuters_estimates(
-        codes, f, sids=sids, start_date=start_date, end_date=end_date,
-        fields=query_fields, period_types=period_types)
     parse_dates = ["UpdatedDate"]
     if "FiscalPeriodEndDate" in fields or max_lag:
         parse_dates.append("FiscalPeriodEndDate")
     if "AnnounceDate" in fields:
         parse_dates.append("AnnounceDate")
-    estimates = pd.read_csv(
-        f, parse_dates=parse_dates)
 
-    # Drop records with no actuals
-    estimates = estimates.loc[estimates.UpdatedDate.notnull()]
+    # Don't parse any fields we don't need
+    needed_fields = set(query_fields)
+    needed_fields.update(set(("Sid", "Indicator")))
+    if max_lag:
+        needed_fields.add("FiscalPeriodEndDate")
+
+    # There might be duplicate UpdatedDates if a company announced reports
+    # for several fiscal periods at once. We keep only the last value (i.e.
+    # latest fiscal period) for each date once UpdatedDate is converted to a
+    # date below, but exact duplicates can already be dropped (keeping the
+    # last one) as the download is parsed, which keeps memory bounded.
+    estimates = _read_csv_deduped(
+        lambda f: download_reuters_estimates(
+            codes, f, sids=sids, start_date=start_date, end_date=end_date,
+            fields=query_fields, period_types=period_types),
+        dedupe_subset=["Indicator", "Sid", "UpdatedDate"],
+        usecols=lambda field: field in needed_fields,
+        parse_dates=parse_dates,
+        # Drop records with no actuals
+        chunk_func=lambda chunk: chunk.loc[chunk.UpdatedDate.notnull()])
 
     # Convert UTC UpdatedDate to security timezone, and cast to date for
     # index
@@ -2233,6 +2862,17 @@ SharadarFundamentalsField = Literal[
     'TICKER',
     'WORKINGCAPITAL']
 
+# Column schema used for parsing Sharadar fundamentals downloads. Fields not
+# listed as dates or categories are numeric.
+_SHARADAR_FUNDAMENTALS_SCHEMA = {
+    "fields": get_args(SharadarFundamentalsField),
+    "dates": ["CALENDARDATE", "DATEKEY", "LASTUPDATED", "REPORTPERIOD"],
+    "categories": {
+        "DIMENSION": ["ARQ", "ARY", "ART", "MRQ", "MRY", "MRT"],
+        "TICKER": None,
+    },
+}
+
 def download_sharadar_fundamentals(
     filepath_or_buffer: FilepathOrBuffer = None,
     start_date: str = None,
@@ -2520,6 +3160,17 @@ SharadarInstitutionsField = Literal[
     'WNTUNITS',
     'WNTVALUE']
 
+# Column schema used for parsing Sharadar institutions downloads. Fields not
+# listed as dates or categories are numeric.
+_SHARADAR_INSTITUTIONS_SCHEMA = {
+    "fields": get_args(SharadarInstitutionsField),
+    "dates": ["CALENDARDATE"],
+    "categories": {
+        "NAME": None,
+        "TICKER": None,
+    },
+}
+
 def download_sharadar_institutions(
     filepath_or_buffer: FilepathOrBuffer = None,
     start_date: str = None,
@@ -2636,6 +3287,15 @@ def download_sharadar_institutions(
 def _cli_download_sharadar_institutions(*args, **kwargs):
     return json_to_cli(download_sharadar_institutions, *args, **kwargs)
 
+# Column schema used for parsing Sharadar SEC Form 8-K downloads
+_SHARADAR_SEC8_SCHEMA = {
+    "fields": ("DATE", "EVENTCODE"),
+    "dates": ["DATE"],
+    "categories": {
+        "EVENTCODE": None,
+    },
+}
+
 def download_sharadar_sec8(
     filepath_or_buffer: FilepathOrBuffer = None,
     start_date: str = None,
@@ -2749,6 +3409,15 @@ def download_sharadar_sec8(
 def _cli_download_sharadar_sec8(*args, **kwargs):
     return json_to_cli(download_sharadar_sec8, *args, **kwargs)
 
+# Column schema used for parsing Sharadar S&P 500 downloads
+_SHARADAR_SP500_SCHEMA = {
+    "fields": ("DATE", "ACTION"),
+    "dates": ["DATE"],
+    "categories": {
+        "ACTION": ["added", "removed"],
+    },
+}
+
 def download_sharadar_sp500(
     filepath_or_buffer: FilepathOrBuffer = None,
     start_date: str = None,
@@ -2866,7 +3535,8 @@ def get_sharadar_fundamentals_reindexed_like(
     fields: Union[SharadarFundamentalsField, list[str]] = None,
     dimension: Literal[
         "ARQ", "ARY", "ART", "MRQ", "MRY", "MRT"] = "ART",
-    period_offset: int = 0
+    period_offset: int = 0,
+    compact: bool = False
     ) -> 'pd.DataFrame':
     """
     Return a multiindex (Field, Date) DataFrame of point-in-time
@@ -2903,6 +3573,13 @@ def get_sharadar_fundamentals_reindexed_like(
         previous quarter, while for annual dimensions, previous period means
         previous year. Value should be a negative integer or 0.
 
+    compact : bool
+        if True, parse numeric fields as float32 rather than float64 and
+        string fields such as DIMENSION and TICKER as categoricals, roughly
+        halving memory usage at the cost of reduced numeric precision.
+        The compact dtypes are retained in the resulting DataFrame when all
+        requested fields are numeric. Default False.
+
     Returns
     -------
     DataFrame
@@ -2992,24 +3669,22 @@ def get_sharadar_fundamentals_reindexed_like(
         filepath_or_buffer=f, sids=sids, start_date=start_date, end_date=end_date,
         fields=fields, dimensions=dimension)
     date_fields = ["DATEKEY"]
+    usecols = None
     if fields:
         for date_field in ("CALENDARDATE", "REPORTPERIOD"):
             if date_field in fields:
                 date_fields.append(date_field)
+        # Don't parse any fields we don't need
+        needed_fields = set(fields)
+        needed_fields.update(set(("Sid", "DATEKEY")))
+        usecols = lambda field: field in needed_fields
     financials = pd.read_csv(
-        f, parse_dates=date_fields)
+        f, parse_dates=date_fields, usecols=usecols,
+        dtype=_get_csv_dtypes(_SHARADAR_FUNDAMENTALS_SCHEMA, compact=compact))
 
     # Rename DATEKEY to match price history index name
     financials = financials.rename(columns={"DATEKEY": "Date"})
 
-    # Drop any fields we don't need
-    if fields:
-        needed_fields = set(fields)
-        needed_fields.update(set(("Sid", "Date")))
-        unneeded_fields = set(financials.columns) - needed_fields
-        if unneeded_fields:
-            financials = financials.drop(unneeded_fields, axis=1)
-
     # if reindex_like.index is tz-aware, make financials tz-aware so they can
     # be joined (tz-aware or tz-naive are both fine, as DATEKEY represents
     # dates which are assumed to be in the local timezone of the reported
@@ -3030,22 +3705,22 @@ def get_sharadar_fundamentals_reindexed_like(
     # reports for several fiscal periods at once. In this case we keep
     # only the last value (i.e. latest fiscal period)
     financials = financials.drop_duplicates(subset=["Sid", "Date"], keep="last")
-    financials = financials.pivot(index="Sid",columns="Date").T
-    multiidx = pd.MultiIndex.from_product(
-        (financials.index.get_level_values(0).unique(), union_date_idx),
-        names=["Field", "Date"])
-    financials = financials.reindex(index=multiidx, columns=reindex_like.columns)
+    # Pivot to (Field, Sid) columns, which (unlike pivoting and transposing)
+    # preserves the dtype of each field
+    financials = financials.set_index(["Date", "Sid"]).unstack("Sid")
 
     # financial values are sparse so ffill (one field at a time)
     all_fields = {}
     if period_offset != 0:
-        are_report_dates = financials.loc["IsReportDate"].notnull()
+        are_report_dates = financials["IsReportDate"].reindex(
+            index=union_date_idx, columns=reindex_like.columns).notnull()
 
-    for fieldname in financials.index.get_level_values("Field").unique():
+    for fieldname in financials.columns.get_level_values(0).unique():
         if fieldname == "IsReportDate":
             continue
 
-        field = financials.loc[fieldname]
+        field = financials[fieldname].reindex(
+            index=union_date_idx, columns=reindex_like.columns)
 
         for _ in range(abs(period_offset)):
             # to get the previous period, we forward-fill, shift, then keep
@@ -3070,10 +3745,107 @@ def get_sharadar_fundamentals_reindexed_like(
 
     return financials
 
+def get_sharadar_fundamentals_asof(
+    sids: Union[list[str], str],
+    as_of_date: str = None,
+    fields: Union[SharadarFundamentalsField, list[str]] = None,
+    dimension: Literal[
+        "ARQ", "ARY", "ART", "MRQ", "MRY", "MRT"] = "ART"
+    ) -> 'pd.DataFrame':
+    """
+    Return a DataFrame of the latest point-in-time Sharadar fundamentals for
+    the requested sids as of a single date.
+
+    This is a point-in-time cross-section of the data returned by
+    `get_sharadar_fundamentals_reindexed_like`, useful for live trading and
+    screening when only the latest fundamentals are needed. As with
+    `get_sharadar_fundamentals_reindexed_like`, indicators become available
+    the day after the Sharadar DATEKEY field (the filing date) to avoid
+    lookahead bias, and each field reflects the latest non-null reading.
+
+    Parameters
+    ----------
+    sids : list of str, required
+        the sids to return fundamentals for
+
+    as_of_date : str (YYYY-MM-DD), optional
+        the date as of which to return fundamentals. Defaults to today.
+
+    fields : list of str
+        a list of fields to include in the resulting DataFrame. Defaults to
+        including all fields.
+
+    dimension : str
+        the dimension of the data. Defaults to As Reported Trailing Twelve
+        Month (ART). Possible choices: ARQ, ARY, ART, MRQ,
+        MRY, MRT. AR=As Reported, MR=Most Recent Reported, Q=Quarterly,
+        Y=Annual, T=Trailing Twelve Month.
+
+    Returns
+    -------
+    DataFrame
+        a DataFrame of fundamentals, with sids for the index and fields for
+        the columns
+
+    Notes
+    -----
+    Usage Guide:
+
+    * Sharadar Fundamentals: https://qrok.it/dl/qr/sharadar-fundamentals
+
+    Examples
+    --------
+    Screen a universe for the current trailing twelve month EPS and revenue:
+
+    >>> fundamentals = get_sharadar_fundamentals_asof(sids, fields=["EPS", "REVENUE"])
+    >>> eps = fundamentals["EPS"]
+    >>> revenue = fundamentals["REVENUE"]
+    """
+    try:
+        import pandas as pd
+    except ImportError:
+        raise ImportError("pandas must be installed to use this function")
+
+    if not isinstance(sids, (list, tuple)):
+        sids = [sids]
+
+    as_of_date = _parse_as_of_date(as_of_date)
+
+    # Since financial reports are sparse, look back as far as
+    # get_sharadar_fundamentals_reindexed_like does
+    start_date = (as_of_date - pd.Timedelta(days=365+180)).date().isoformat()
+    end_date = as_of_date.date().isoformat()
+
+    if fields and not isinstance(fields, (list,tuple)):
+        fields = [fields]
+
+    f = six.StringIO()
+    download_sharadar_fundamentals(
+        filepath_or_buffer=f, sids=list(sids), start_date=start_date,
+        end_date=end_date, fields=fields, dimensions=dimension)
+    date_fields = ["DATEKEY"]
+    if fields:
+        for date_field in ("CALENDARDATE", "REPORTPERIOD"):
+            if date_field in fields:
+                date_fields.append(date_field)
+    financials = pd.read_csv(f, parse_dates=date_fields)
+
+    # DATEKEY is shifted forward 1 day to avoid lookahead bias, so only
+    # reports filed before the as-of date are available
+    financials = financials[financials.DATEKEY < as_of_date]
+
+    # There might be duplicate DATEKEYs if a company announced reports for
+    # several fiscal periods at once. In this case we keep only the last value
+    # (i.e. latest fiscal period)
+    financials = financials.drop_duplicates(subset=["Sid", "DATEKEY"], keep="last")
+
+    return _select_asof(financials, sids, date_field="DATEKEY", fields=fields)
+
 def get_sharadar_institutions_reindexed_like(
     reindex_like: 'pd.DataFrame',
     fields: Union[SharadarInstitutionsField, list[str]] = None,
-    shift: int = 45
+    shift: int = 45,
+    compact: bool = False
     ) -> 'pd.DataFrame':
     """
     Return a multiindex (Field, Date) DataFrame of Sharadar institutional
@@ -3101,6 +3873,13 @@ def get_sharadar_institutions_reindexed_like(
         lag between the quarter end date and the reporting deadline. Defaults
         to 45.
 
+    compact : bool
+        if True, parse numeric fields as float32 rather than float64 and
+        string fields such as NAME and TICKER as categoricals, roughly
+        halving memory usage at the cost of reduced numeric precision.
+        The compact dtypes are retained in the resulting DataFrame when all
+        requested fields are numeric. Default False.
+
     Returns
     -------
     DataFrame
@@ -3158,20 +3937,19 @@ def get_sharadar_institutions_reindexed_like(
     download_sharadar_institutions(
         filepath_or_buffer=f, sids=sids, start_date=start_date, end_date=end_date,
         fields=fields)
+    usecols = None
+    if fields:
+        # Don't parse any fields we don't need
+        needed_fields = set(fields)
+        needed_fields.update(set(("Sid", "CALENDARDATE")))
+        usecols = lambda field: field in needed_fields
     institutions = pd.read_csv(
-        f, parse_dates=["CALENDARDATE"])
+        f, parse_dates=["CALENDARDATE"], usecols=usecols,
+        dtype=_get_csv_dtypes(_SHARADAR_INSTITUTIONS_SCHEMA, compact=compact))
 
     # Rename CALENDARDATE to match price history index name
     institutions = institutions.rename(columns={"CALENDARDATE": "Date"})
 
-    # Drop any fields we don't need
-    if fields:
-        needed_fields = set(fields)
-        needed_fields.update(set(("Sid", "Date")))
-        unneeded_fields = set(institutions.columns) - needed_fields
-        if unneeded_fields:
-            institutions = institutions.drop(unneeded_fields, axis=1)
-
     # if reindex_like.index is tz-aware, make institutions tz-aware so they can
     # be joined
     if reindex_like.index.tz:
@@ -3186,16 +3964,15 @@ def get_sharadar_institutions_reindexed_like(
     union_date_idx = pd.date_range(start=union_date_idx.min(), end=union_date_idx.max(),
                                    freq="D", tz=union_date_idx.tz)
 
-    institutions = institutions.pivot(index="Sid",columns="Date").T
-    multiidx = pd.MultiIndex.from_product(
-        (institutions.index.get_level_values(0).unique(), union_date_idx),
-        names=["Field", "Date"])
-    institutions = institutions.reindex(index=multiidx, columns=reindex_like.columns)
+    # Pivot to (Field, Sid) columns, which (unlike pivoting and transposing)
+    # preserves the dtype of each field
+    institutions = institutions.set_index(["Date", "Sid"]).unstack("Sid")
 
     # values are sparse so ffill (one field at a time)
     all_fields = {}
-    for fieldname in institutions.index.get_level_values("Field").unique():
-        field = institutions.loc[fieldname].ffill()
+    for fieldname in institutions.columns.get_level_values(0).unique():
+        field = institutions[fieldname].reindex(
+            index=union_date_idx, columns=reindex_like.columns).ffill()
 
         # Shift to avoid lookahead bias
         if shift:
@@ -3215,7 +3992,8 @@ def get_sharadar_institutions_reindexed_like(
 
 def get_sharadar_sec8_reindexed_like(
     reindex_like: 'pd.DataFrame',
-    event_codes: Union[list[int], int] = None
+    event_codes: Union[list[int], int] = None,
+    sparse: bool = False
     ) -> 'pd.DataFrame':
     """
     Return a Boolean DataFrame indicating whether securities filed SEC Form
@@ -3233,6 +4011,10 @@ def get_sharadar_sec8_reindexed_like(
     event_codes : list of int, optional
         limit to these event codes
 
+    sparse : bool
+        if True, return a DataFrame with sparse Boolean columns, which
+        reduces memory usage for large DataFrames. Default False.
+
     Returns
     -------
     DataFrame
@@ -3286,31 +4068,22 @@ def get_sharadar_sec8_reindexed_like(
         )
     except NoFundamentalData:
         # If no data for these securities, there were no events
-        return pd.DataFrame(False, index=reindex_like.index, columns=reindex_like.columns)
+        return _mask_to_frame(False, reindex_like, sparse=sparse)
 
-    events = pd.read_csv(f, parse_dates=["DATE"])
+    # event codes are only used to build a mask, so always parse compactly
+    events = pd.read_csv(
+        f, parse_dates=["DATE"],
+        dtype=_get_csv_dtypes(_SHARADAR_SEC8_SCHEMA, compact=True))
 
-    # Rename DATE to match price history index name
-    events = events.rename(columns={"DATE": "Date"})
+    # event dates are in the local timezone of the reported company, so
+    # they are matched to the (wall-clock) dates of reindex_like
+    have_events = _events_to_mask(reindex_like, events.Sid, events.DATE)
 
-    # if reindex_like.index is tz-aware, make financials tz-aware so they can
-    # be joined
-    if reindex_like.index.tz:
-        events["Date"] = events.Date.dt.tz_localize(reindex_like.index.tz.zone)
-
-    # If multiple events, drop duplicates
-    events = events.drop_duplicates(subset=["Sid","Date"])
-
-    # Pivot and reindex
-    events = events.pivot(index="Sid",columns="Date").T
-    events = events.loc["EVENTCODE"]
-    events = events.reindex(index=reindex_like.index, columns=reindex_like.columns)
-
-    have_events = events.notnull()
-    return have_events
+    return _mask_to_frame(have_events, reindex_like, sparse=sparse)
 
 def get_sharadar_sp500_reindexed_like(
-    reindex_like: 'pd.DataFrame'
+    reindex_like: 'pd.DataFrame',
+    sparse: bool = False
     ) -> 'pd.DataFrame':
     """
     Return a Boolean DataFrame indicating whether securities were in the S&P
@@ -3324,6 +4097,10 @@ def get_sharadar_sp500_reindexed_like(
         for the columns, to which the shape of the resulting DataFrame will
         be conformed
 
+    sparse : bool
+        if True, return a DataFrame with sparse Boolean columns, which
+        reduces memory usage for large DataFrames. Default False.
+
     Returns
     -------
     DataFrame
@@ -3374,37 +4151,22 @@ def get_sharadar_sp500_reindexed_like(
             fields=["Sid","DATE","ACTION"])
     except NoFundamentalData:
         # If no data for these securities, they're not in the index
-        return pd.DataFrame(False, index=reindex_like.index, columns=reindex_like.columns)
+        return _mask_to_frame(False, reindex_like, sparse=sparse)
 
+    # actions are only used to build a mask, so always parse compactly
     sp500_changes = pd.read_csv(
-        f, parse_dates=["DATE"])
-
-    # Rename DATE to match price history index name
-    sp500_changes = sp500_changes.rename(columns={"DATE": "Date"})
-
-    # if reindex_like.index is tz-aware, make financials tz-aware so they can
-    # be joined
-    if reindex_like.index.tz:
-        sp500_changes["Date"] = sp500_changes.Date.dt.tz_localize(reindex_like.index.tz.zone)
-
-    deduped_datekeys = sp500_changes.Date.drop_duplicates()
-
-    # Create a unioned index of input DataFrame and statement DATEs
-    union_date_idx = reindex_like.index.union(pd.DatetimeIndex(deduped_datekeys)).sort_values()
-
-    # Reindex with unioned index and ffill to create Boolean dataframe
-    sp500_changes = sp500_changes.pivot(index="Sid",columns="Date").T
-    sp500_changes = sp500_changes.loc["ACTION"]
-    sp500_changes = sp500_changes.reindex(index=union_date_idx)
-    are_in_sp500 = sp500_changes.ffill().fillna("removed") == "added"
+        f, parse_dates=["DATE"],
+        dtype=_get_csv_dtypes(_SHARADAR_SP500_SCHEMA, compact=True))
+    sp500_changes = sp500_changes[sp500_changes.ACTION.notnull()]
 
-    # reindex like input DataFrame
-    are_in_sp500 = are_in_sp500.reindex(
-        index=reindex_like.index,
-        columns=reindex_like.columns,
-        fill_value=False)
+    # each addition or removal holds until the sid's next change; change
+    # dates are in the local timezone, so they are matched to the
+    # (wall-clock) dates of reindex_like
+    are_in_sp500 = _states_to_mask(
+        reindex_like, sp500_changes.Sid, sp500_changes.DATE,
+        sp500_changes.ACTION == "added")
 
-    return are_in_sp500
+    return _mask_to_frame(are_in_sp500, reindex_like, sparse=sparse)
 
 def download_wsh_earnings_dates(
     filepath_or_buffer: FilepathOrBuffer = None,
@@ -3608,24 +4370,28 @@ def get_wsh_earnings_dates_reindexed_like(
     if statuses and not isinstance(statuses, (list, tuple)):
         statuses = [statuses]
 
-    f = six.StringIO()
     query_fields = list(fields) # copy fields on Py2 or 3: https://stackoverflow.com/a/2612815/417414
     if "LastUpdated" not in fields:
         query_fields.append("LastUpdated")
-    download_wsh_earnings_dates(
-        f, sids=sids, start_date=start_date, end_date=end_date,
-        fields=query_fields, statuses=statuses)
-    announcements = pd.read_csv(f, parse_dates=["Date", "LastUpdated"])
+
+    # There might be duplicate Dates for confirmed vs unconfirmed announcements (or other changes to
+    # confirmed or unconfirmed announcements). In this case we keep only the most recently updated
+    # record, deduping as the download is parsed to keep memory bounded
+    needed_fields = set(query_fields)
+    needed_fields.update(set(("Sid", "Date")))
+    announcements = _read_csv_deduped(
+        lambda f: download_wsh_earnings_dates(
+            f, sids=sids, start_date=start_date, end_date=end_date,
+            fields=query_fields, statuses=statuses),
+        dedupe_subset=["Sid", "Date"],
+        sort_by=["LastUpdated"],
+        usecols=lambda field: field in needed_fields,
+        parse_dates=["Date", "LastUpdated"])
 
     # if reindex_like.index is tz-aware, make announcements tz-aware too
     if reindex_like.index.tz:
         announcements["Date"] = announcements.Date.dt.tz_localize(reindex_like.index.tz.zone)
 
-    # There might be duplicate Dates for confirmed vs unconfirmed announcements (or other changes to
-    # confirmed or unconfirmed announcements). In this case we keep only the most recently updated
-    # record
-    announcements = announcements.sort_values(["LastUpdated"]).drop_duplicates(subset=["Sid","Date"], keep="last")
-
     # Drop any fields we don't need
     needed_fields = set(fields)
     needed_fields.update(set(("Sid", "Date")))
@@ -3643,6 +4409,86 @@ def get_wsh_earnings_dates_reindexed_like(
 
     return announcements
 
+def get_wsh_earnings_dates_asof(
+    sids: Union[list[str], str],
+    as_of_date: str = None,
+    fields: Union[list[str], str] = ["Time"],
+    statuses: Union[list[str], str] = ["Confirmed"]
+    ) -> 'pd.DataFrame':
+    """
+    Return a DataFrame of earnings announcements occurring on a single date
+    for the requested sids.
+
+    This is a point-in-time cross-section of the data returned by
+    `get_wsh_earnings_dates_reindexed_like`.
+
+    DEPRECATED. This data is no longer available from Interactive Brokers. Only
+    data that was previously saved to the local database can be queried.
+
+    Parameters
+    ----------
+    sids : list of str, required
+        the sids to return announcements for
+
+    as_of_date : str (YYYY-MM-DD), optional
+        the announcement date to return. Defaults to today.
+
+    fields : list of str
+        a list of fields to include in the resulting DataFrame. Defaults to
+        including the Time field.
+
+    statuses : list of str, optional
+        limit to these confirmation statuses. By default only confirmed
+        announcements are returned. Possible choices: Confirmed, Unconfirmed.
+
+    Returns
+    -------
+    DataFrame
+        a DataFrame of earnings announcements, with sids for the index and
+        fields for the columns. Sids without an announcement on the date
+        are NaN.
+
+    Examples
+    --------
+    Get the announcement times of stocks announcing today:
+
+    >>> announcements = get_wsh_earnings_dates_asof(sids)
+    >>> announce_times = announcements["Time"].dropna()
+    """
+    try:
+        import pandas as pd
+    except ImportError:
+        raise ImportError("pandas must be installed to use this function")
+
+    if not isinstance(sids, (list, tuple)):
+        sids = [sids]
+
+    if not isinstance(fields, (list,tuple)):
+        fields = [fields]
+
+    if statuses and not isinstance(statuses, (list, tuple)):
+        statuses = [statuses]
+
+    as_of_date = _parse_as_of_date(as_of_date).date().isoformat()
+
+    f = six.StringIO()
+    query_fields = list(fields)
+    if "LastUpdated" not in fields:
+        query_fields.append("LastUpdated")
+    download_wsh_earnings_dates(
+        f, sids=list(sids), start_date=as_of_date, end_date=as_of_date,
+        fields=query_fields, statuses=statuses)
+    announcements = pd.read_csv(f, parse_dates=["Date", "LastUpdated"])
+
+    # keep only the most recently updated record for each sid (see
+    # get_wsh_earnings_dates_reindexed_like)
+    announcements = announcements.sort_values(
+        ["LastUpdated"], kind="stable").drop_duplicates(subset=["Sid"], keep="last")
+
+    announcements = announcements.set_index("Sid").reindex(index=sids, columns=fields)
+    announcements.index.name = "Sid"
+    return announcements
+
 def collect_brain_bsi() -> dict[str, str]:
     """
     Collect Brain Sentiment Indicator (BSI) data and save to database.
@@ -3922,19 +4768,84 @@ def get_brain_bsi_reindexed_like(
     bsi = pd.read_csv(
         f, parse_dates=["Date"])
 
-    # if reindex_like.index is tz-aware, make BSI tz-aware so they can
-    # be joined
-    if reindex_like.index.tz:
-        bsi["Date"] = bsi.Date.dt.tz_localize(reindex_like.index.tz.zone)
-
-    bsi = bsi.pivot(index="Sid",columns="Date").T
-    multiidx = pd.MultiIndex.from_product(
-        (bsi.index.get_level_values(0).unique(), reindex_like.index),
-        names=["Field", "Date"])
-    bsi = bsi.reindex(index=multiidx, columns=reindex_like.columns)
+    # Dates are compared as wall-clock dates, so they can be aligned to a
+    # tz-aware or tz-naive reindex_like; scores are not forward-filled
+    bsi = bsi.drop_duplicates(subset=["Sid", "Date"], keep="last")
+    bsi = _align_records_asof(bsi, reindex_like, max_staleness="0D")
 
     return bsi
 
+def get_brain_bsi_asof(
+    sids: Union[list[str], str],
+    as_of_date: str = None,
+    N: Literal[1, 7, 30] = 1,
+    fields: Union[list[str], str] = None,
+    ) -> 'pd.DataFrame':
+    """
+    Return a DataFrame of Brain Sentiment Indicator (BSI) data for the
+    requested sids on a single date.
+
+    This is a point-in-time cross-section of the data returned by
+    `get_brain_bsi_reindexed_like`. As with that function, data are not
+    forward-filled; NaNs mean that no scores were calculated for that
+    security on that date.
+
+    Parameters
+    ----------
+    sids : list of str, required
+        the sids to return sentiment data for
+
+    as_of_date : str (YYYY-MM-DD), optional
+        the date to return sentiment data for. Defaults to today.
+
+    N : int, optional
+        The calculation window over which news articles are aggregated to calculate
+        sentiment scores. Choices are 1, 7, or 30. Defaults to 1.
+
+    fields : list of str
+        a list of fields to include in the resulting DataFrame. Defaults to
+        including all fields.
+
+    Returns
+    -------
+    DataFrame
+        a DataFrame of sentiment data, with sids for the index and fields for
+        the columns
+
+    Notes
+    -----
+    Usage Guide:
+
+    * Brain Sentiment Indicator: https://qrok.it/dl/qr/brain-bsi
+
+    Examples
+    --------
+    Query today's 1-day sentiment scores:
+
+    >>> bsi = get_brain_bsi_asof(sids, N=1, fields=["SENTIMENT_SCORE"])
+    >>> scores = bsi["SENTIMENT_SCORE"]
+    """
+    try:
+        import pandas as pd
+    except ImportError:
+        raise ImportError("pandas must be installed to use this function")
+
+    if not isinstance(sids, (list, tuple)):
+        sids = [sids]
+
+    as_of_date = _parse_as_of_date(as_of_date).date().isoformat()
+
+    if fields and not isinstance(fields, (list,tuple)):
+        fields = [fields]
+
+    f = six.StringIO()
+    download_brain_bsi(
+        filepath_or_buffer=f, N=N, sids=list(sids), start_date=as_of_date,
+        end_date=as_of_date, fields=fields)
+    bsi = pd.read_csv(f, parse_dates=["Date"])
+
+    return _select_asof(bsi, sids, fields=fields)
+
 def download_brain_blmcf(
     filepath_or_buffer: FilepathOrBuffer = None,
     report_category: Literal['10-K', '10-Q'] = None,
@@ -4052,7 +4963,7 @@ def _cli_download_brain_blmcf(*args, **kwargs):
     return json_to_cli(download_brain_blmcf, *args, **kwargs)
 
 def _get_brain_blm_reindexed_like(
-    reindex_like, download_func, fields=None, **kwargs
+    reindex_like, download_func, fields=None, max_staleness=None, **kwargs
     ) -> 'pd.DataFrame':
     """
     Common function for get_brain_blmcf_reindexed_like and
@@ -4073,6 +4984,10 @@ def _get_brain_blm_reindexed_like(
         including all fields. For faster performance, limiting fields to
         those needed is highly recommended, especially for large universes.
 
+    max_staleness : str, optional
+        don't forward-fill metrics older than this (for example '180D'). If
+        omitted, metrics are forward-filled indefinitely.
+
     kwargs : dict, optional
         additional keyword arguments to pass to the download function
 
@@ -4144,54 +5059,95 @@ def _get_brain_blm_reindexed_like(
     metrics = pd.read_csv(
         f, parse_dates=date_fields)
 
-    # if reindex_like.index is tz-aware, make metrics tz-aware so they can
-    # be joined (tz-aware or tz-naive are both fine, as DATEKEY represents
-    # dates which are assumed to be in the local timezone of the reported
-    # company)
-    if reindex_like.index.tz:
-        metrics["Date"] = metrics.Date.dt.tz_localize(reindex_like.index.tz.zone)
-
-    deduped_dates = metrics.Date.drop_duplicates()
-
-    # Create a unioned index of input DataFrame and statement dates
-    union_date_idx = reindex_like.index.union(pd.DatetimeIndex(deduped_dates)).sort_values()
-
     # There might be duplicate dates if a company announced
     # reports for several fiscal periods at once. In this case we keep
     # only the last value (i.e. latest fiscal period)
     metrics = metrics.drop_duplicates(subset=["Sid", "Date"], keep="last")
-    metrics = metrics.pivot(index="Sid",columns="Date").T
-    multiidx = pd.MultiIndex.from_product(
-        (metrics.index.get_level_values(0).unique(), union_date_idx),
-        names=["Field", "Date"])
-    metrics = metrics.reindex(index=multiidx, columns=reindex_like.columns)
 
-    # reports are sparse so ffill (one field at a time)
-    all_fields = {}
+    # reports are sparse, so rather than forward-filling a full grid, align
+    # each sid's reports to the dates that fall within their spans (we don't
+    # shift because Brain already does that). Dates are compared as
+    # wall-clock dates, so they can be aligned to a tz-aware or tz-naive
+    # reindex_like.
+    metrics = _align_records_asof(metrics, reindex_like, max_staleness=max_staleness)
 
-    for fieldname in metrics.index.get_level_values("Field").unique():
+    return metrics
 
-        field = metrics.loc[fieldname]
+def _get_brain_blm_asof(
+    sids, download_func, as_of_date=None, fields=None, **kwargs
+    ) -> 'pd.DataFrame':
+    """
+    Common function for get_brain_blmcf_asof and get_brain_blmect_asof.
 
-        # forward-fill values (we don't shift because Brain already does that)
-        field = field.ffill()
+    Parameters
+    ----------
+    sids : list of str, required
+        the sids to return metrics for
 
-        all_fields[fieldname] = field
+    download_func : function
+        the download function to use
 
-    metrics = pd.concat(all_fields, names=["Field", "Date"])
+    as_of_date : str (YYYY-MM-DD), optional
+        the date as of which to return metrics. Defaults to today.
 
-    # In cases the statements included dates not in the input
-    # DataFrame, drop those now that we've ffilled
-    extra_dates = union_date_idx.difference(reindex_like.index)
-    if not extra_dates.empty:
-        metrics.drop(extra_dates, axis=0, level="Date", inplace=True)
+    fields : list of str
+        a list of fields to include in the resulting DataFrame. Defaults to
+        including all fields.
 
-    return metrics
+    kwargs : dict, optional
+        additional keyword arguments to pass to the download function
+
+    Returns
+    -------
+    DataFrame
+        a DataFrame of metrics, with sids for the index and fields for
+        the columns
+    """
+    try:
+        import pandas as pd
+    except ImportError:
+        raise ImportError("pandas must be installed to use this function")
+
+    if not isinstance(sids, (list, tuple)):
+        sids = [sids]
+
+    as_of_date = _parse_as_of_date(as_of_date)
+
+    # Since company filings are sparse, look back as far as
+    # _get_brain_blm_reindexed_like does
+    start_date = (as_of_date - pd.Timedelta(days=365 + 180)).date().isoformat()
+    end_date = as_of_date.date().isoformat()
+
+    if fields and not isinstance(fields, (list,tuple)):
+        fields = [fields]
+
+    f = six.StringIO()
+    download_func(
+        filepath_or_buffer=f, sids=list(sids), start_date=start_date,
+        end_date=end_date, fields=fields, **kwargs)
+    date_fields = ["Date"]
+    if fields:
+        for date_field in ("LAST_REPORT_DATE", "PREV_REPORT_DATE", "LAST_TRANSCRIPT_DATE", "PREV_TRANSCRIPT_DATE"):
+            if date_field in fields:
+                date_fields.append(date_field)
+    metrics = pd.read_csv(f, parse_dates=date_fields)
+
+    # Brain already shifts the dates, so reports dated on the as-of date
+    # are available
+    metrics = metrics[metrics.Date <= as_of_date]
+
+    # There might be duplicate dates if a company announced reports for
+    # several fiscal periods at once. In this case we keep only the last
+    # value (i.e. latest fiscal period)
+    metrics = metrics.drop_duplicates(subset=["Sid", "Date"], keep="last")
+
+    return _select_asof(metrics, sids, fields=fields)
 
 def get_brain_blmcf_reindexed_like(
     reindex_like: 'pd.DataFrame',
     fields: Union[list[str], str] = None,
     report_category: Literal['10-K', '10-Q'] = None,
+    max_staleness: str = None,
     ) -> 'pd.DataFrame':
     """
     Return a multiindex (Field, Date) DataFrame of Brain Language Metrics
@@ -4222,6 +5178,12 @@ def get_brain_blmcf_reindexed_like(
         limit to this report category. Choices are 10-K or 10-Q. If omitted,
         both report categories are returned.
 
+    max_staleness : str, optional
+        don't forward-fill metrics older than this, expressed as a Pandas
+        Timedelta string (for example '180D'). Dates with no report within
+        this window are NaN. If omitted, metrics are forward-filled
+        indefinitely.
+
     Returns
     -------
     DataFrame
@@ -4247,9 +5209,69 @@ def get_brain_blmcf_reindexed_like(
 
     >>> metrics = get_brain_blmcf_reindexed_like(closes, report_category="10-K", fields=["SENTIMENT"])
     >>> sentiment_scores = metrics.loc["SENTIMENT"]
+
+    Ignore metrics from filings more than 6 months old:
+
+    >>> metrics = get_brain_blmcf_reindexed_like(closes, fields=["SENTIMENT"], max_staleness="180D")
     """
     return _get_brain_blm_reindexed_like(
-        reindex_like, download_brain_blmcf, fields=fields, report_category=report_category
+        reindex_like, download_brain_blmcf, fields=fields,
+        max_staleness=max_staleness, report_category=report_category
+    )
+
+def get_brain_blmcf_asof(
+    sids: Union[list[str], str],
+    as_of_date: str = None,
+    fields: Union[list[str], str] = None,
+    report_category: Literal['10-K', '10-Q'] = None,
+    ) -> 'pd.DataFrame':
+    """
+    Return a DataFrame of the latest Brain Language Metrics on Company
+    Filings (BLMCF) data for the requested sids as of a single date.
+
+    This is a point-in-time cross-section of the data returned by
+    `get_brain_blmcf_reindexed_like`, useful for live trading and screening
+    when only the latest metrics are needed.
+
+    Parameters
+    ----------
+    sids : list of str, required
+        the sids to return metrics for
+
+    as_of_date : str (YYYY-MM-DD), optional
+        the date as of which to return metrics. Defaults to today.
+
+    fields : list of str
+        a list of fields to include in the resulting DataFrame. Defaults to
+        including all fields. Pass '?' or any invalid fieldname to see
+        available fields.
+
+    report_category : str, optional
+        limit to this report category. Choices are 10-K or 10-Q. If omitted,
+        both report categories are returned.
+
+    Returns
+    -------
+    DataFrame
+        a DataFrame of metrics, with sids for the index and fields for
+        the columns
+
+    Notes
+    -----
+    Usage Guide:
+
+    * Brain Language Metrics on Company Filings: https://qrok.it/dl/qr/brain-blmcf
+
+    Examples
+    --------
+    Query the latest sentiment scores:
+
+    >>> metrics = get_brain_blmcf_asof(sids, fields=["SENTIMENT"])
+    >>> sentiment_scores = metrics["SENTIMENT"]
+    """
+    return _get_brain_blm_asof(
+        sids, download_brain_blmcf, as_of_date=as_of_date, fields=fields,
+        report_category=report_category
     )
 
 def download_brain_blmect(
@@ -4364,6 +5386,7 @@ def _cli_download_brain_blmect(*args, **kwargs):
 def get_brain_blmect_reindexed_like(
     reindex_like: 'pd.DataFrame',
     fields: Union[list[str], str] = None,
+    max_staleness: str = None,
     ) -> 'pd.DataFrame':
     """
     Return a multiindex (Field, Date) DataFrame of Brain Language Metrics
@@ -4389,6 +5412,12 @@ def get_brain_blmect_reindexed_like(
         containing "DELTA" or "SIMILARITY" in the name compare the current
         earnings call transcript to the previous earnings call transcript.
 
+    max_staleness : str, optional
+        don't forward-fill metrics older than this, expressed as a Pandas
+        Timedelta string (for example '180D'). Dates with no report within
+        this window are NaN. If omitted, metrics are forward-filled
+        indefinitely.
+
     Returns
     -------
     DataFrame
@@ -4411,5 +5440,54 @@ def get_brain_blmect_reindexed_like(
     >>> litigious_scores = metrics.loc["MD_SCORE_LITIGIOUS"]
     """
     return _get_brain_blm_reindexed_like(
-        reindex_like, download_brain_blmect, fields=fields
-    )
\ No newline at end of file
+        reindex_like, download_brain_blmect, fields=fields, max_staleness=max_staleness
+    )
+
+def get_brain_blmect_asof(
+    sids: Union[list[str], str],
+    as_of_date: str = None,
+    fields: Union[list[str], str] = None,
+    ) -> 'pd.DataFrame':
+    """
+    Return a DataFrame of the latest Brain Language Metrics on Earnings Call
+    Transcripts (BLMECT) data for the requested sids as of a single date.
+
+    This is a point-in-time cross-section of the data returned by
+    `get_brain_blmect_reindexed_like`, useful for live trading and screening
+    when only the latest metrics are needed.
+
+    Parameters
+    ----------
+    sids : list of str, required
+        the sids to return metrics for
+
+    as_of_date : str (YYYY-MM-DD), optional
+        the date as of which to return metrics. Defaults to today.
+
+    fields : list of str
+        a list of fields to include in the resulting DataFrame. Defaults to
+        including all fields. Pass '?' or any invalid fieldname to see
+        available fields.
+
+    Returns
+    -------
+    DataFrame
+        a DataFrame of metrics, with sids for the index and fields for
+        the columns
+
+    Notes
+    -----
+    Usage Guide:
+
+    * Brain Language Metrics on Earnings Call Transcripts: https://qrok.it/dl/qr/brain-blmect
+
+    Examples
+    --------
+    Query the latest management discussion sentiment scores:
+
+    >>> metrics = get_brain_blmect_asof(sids, fields=["MD_SENTIMENT"])
+    >>> sentiment_scores = metrics["MD_SENTIMENT"]
+    """
+    return _get_brain_blm_asof(
+        sids, download_brain_blmect, as_of_date=as_of_date, fields=fields
+    )
@@ -56,6 +56,11 @@ download_master_file
 get_securities
     Return a DataFrame of security details from the securities master database.
 
+sync_master_replica
+    Create or update a local replica of the securities master database, which
+    is used to answer master file queries without a request to the master
+    service.
+
 get_securities_reindexed_like
     Return a multiindex DataFrame of securities master data, reindexed to
     match the index and columns (sids) of `reindex_like`.
@@ -66,6 +71,10 @@ get_contract_nums_reindexed_like
     futures chain as of each date, where 1 is the front contract, 2 is the second
     nearest contract, etc.
 
+SecurityIndex
+    In-process index of securities for fast lookups of sids by symbol or
+    universe and of security details by sid.
+
 create_universe
     Create a universe of securities.
 
@@ -91,16 +100,29 @@ list_calendar_statuses
 round_to_tick_sizes
     Round prices in a CSV file to valid tick sizes.
 
+round_dataframe_to_tick_sizes
+    Round prices in a DataFrame to valid tick sizes.
+
 Notes
 -----
 Usage Guide:
 
 * Securities Master: https://qrok.it/dl/qr/master
 """
+import os
+import io
 import sys
+import csv
+import time
 import six
 import json
+import hashlib
+import sqlite3
+import weakref
+import tempfile
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from urllib.request import pathname2url
 from typing import TYPE_CHECKING, Union, Literal
 if TYPE_CHECKING:
     import pandas as pd
@@ -123,8 +145,10 @@ __all__ = [
     "diff_ibkr_securities",
     "download_master_file",
     "get_securities",
+    "sync_master_replica",
     "get_securities_reindexed_like",
     "get_contract_nums_reindexed_like",
+    "SecurityIndex",
     "create_universe",
     "delete_universe",
     "list_universes",
@@ -133,6 +157,7 @@ __all__ = [
     "collect_ibkr_calendar",
     "list_calendar_statuses",
     "round_to_tick_sizes",
+    "round_dataframe_to_tick_sizes",
 ]
 
 def list_ibkr_exchanges(
@@ -757,11 +782,31 @@ def download_master_file(
 
     output = output or "csv"
 
-    url = "/master/securities.{0}".format(output)
-
     if output not in ("csv", "json"):
         raise ValueError("Invalid ouput: {0}".format(output))
 
+    # answer the query from the local replica, if enabled and the query
+    # is supported
+    response = None
+    if output == "csv":
+        response = _query_master_replica(params)
+
+    if response is None:
+        response = _get_master_file_response(params, output=output)
+
+    filepath_or_buffer = filepath_or_buffer or sys.stdout
+
+    write_response_to_filepath_or_buffer(filepath_or_buffer, response)
+
+def _cli_download_master_file(*args, **kwargs):
+    return json_to_cli(download_master_file, *args, **kwargs)
+
+def _get_master_file_response(params, output="csv"):
+    """
+    Query the master service for the master file and return the response.
+    """
+    url = "/master/securities.{0}".format(output)
+
     response = houston.get(url, params=params)
 
     try:
@@ -772,12 +817,406 @@ def download_master_file(
             raise NoMasterData(e)
         raise
 
-    filepath_or_buffer = filepath_or_buffer or sys.stdout
+    return response
+
+# mmap size for connections to the master replica, so that lookups are
+# served from the OS page cache
+_MASTER_REPLICA_MMAP_SIZE = 256 * 1024 * 1024
+
+# query parameters the master replica can answer, and the core fields they
+# filter on (other parameters, such as vendors or frontmonth, depend on
+# logic in the master service and are always sent to the master service)
+_MASTER_REPLICA_FILTER_FIELDS = {
+    "symbols": "Symbol",
+    "exchanges": "Exchange",
+    "sec_types": "SecType",
+    "currencies": "Currency",
+}
+_MASTER_REPLICA_PARAMS = (
+    "sids",
+    "universes",
+    "exclude_sids",
+    "exclude_universes",
+    "exclude_delisted",
+    "fields",
+    *_MASTER_REPLICA_FILTER_FIELDS)
+
+class _ReplicaResponse:
+    """
+    Response-like wrapper for CSV content queried from the master replica,
+    for use with write_response_to_filepath_or_buffer.
+    """
+    def __init__(self, content):
+        self.content = content
 
-    write_response_to_filepath_or_buffer(filepath_or_buffer, response)
+    def iter_content(self, chunk_size=1024):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
 
-def _cli_download_master_file(*args, **kwargs):
-    return json_to_cli(download_master_file, *args, **kwargs)
+def _get_master_replica_path():
+    """
+    Return the path of the master replica, or None if the replica is not
+    enabled.
+    """
+    return os.environ.get("QUANTROCKET_MASTER_REPLICA") or None
+
+def _connect_master_replica(filepath, readonly=False):
+    """
+    Return a connection to the master replica.
+    """
+    if readonly:
+        conn = sqlite3.connect(
+            "file:{0}?mode=ro".format(pathname2url(os.path.abspath(filepath))), uri=True)
+    else:
+        conn = sqlite3.connect(filepath)
+    conn.execute("PRAGMA mmap_size={0}".format(_MASTER_REPLICA_MMAP_SIZE))
+    return conn
+
+def _quote_identifier(name):
+    return '"{0}"'.format(name.replace('"', '""'))
+
+def _read_master_file_csv(params):
+    """
+    Download the master file from the master service and return the header
+    and a list of rows (as lists of strings).
+    """
+    with tempfile.TemporaryFile(mode="w+b") as f:
+        write_response_to_filepath_or_buffer(f, _get_master_file_response(params))
+        reader = csv.reader(io.TextIOWrapper(f, encoding="utf-8", newline=""))
+        header = next(reader, [])
+        rows = list(reader)
+    return header, rows
+
+def sync_master_replica(filepath: str = None) -> dict[str, int]:
+    """
+    Create or update a local replica of the securities master database,
+    for answering master file queries without a request to the master
+    service.
+
+    The replica is a SQLite database containing all master fields, with
+    indexes on Sid, Symbol, Exchange, and universe membership. Syncing an
+    existing replica only rewrites securities whose details have changed
+    and removes securities that no longer exist.
+
+    Parameters
+    ----------
+    filepath : str, optional
+        path to the SQLite database file. Defaults to the path in the
+        QUANTROCKET_MASTER_REPLICA environment variable.
+
+    Returns
+    -------
+    dict
+        dict of counts of inserted, updated, deleted, and unchanged
+        securities, and the number of synced universes
+
+    Notes
+    -----
+    The replica is opt-in. Set the QUANTROCKET_MASTER_REPLICA environment
+    variable to the path of the replica to have `download_master_file` (and
+    the functions that use it, such as `get_securities`) answer queries
+    from the replica. Queries that filter by sids, symbols, exchanges (MICs),
+    security types, currencies, universes, or any of the exclusion filters
+    except `exclude_expired` and `frontmonth` are answered locally. All
+    other queries, and queries whose filter values are not present in the
+    replica, are sent to the master service.
+
+    The replica is not updated automatically when securities are collected,
+    so re-sync it after collecting listings. Creating or deleting a
+    universe removes that universe from the replica until the next sync.
+
+    Usage Guide:
+
+    * Master file: https://qrok.it/dl/qr/master-file
+
+    Examples
+    --------
+    Sync the replica and enable it for this process:
+
+    >>> import os
+    >>> os.environ["QUANTROCKET_MASTER_REPLICA"] = "/codeload/.master-replica.sqlite"
+    >>> sync_master_replica()
+    >>> securities = get_securities(universes="usstock-active")
+    """
+    filepath = filepath or _get_master_replica_path()
+    if not filepath:
+        raise ParameterError(
+            "filepath is required if the QUANTROCKET_MASTER_REPLICA environment "
+            "variable is not set")
+
+    header, rows = _read_master_file_csv({"fields": "*"})
+
+    # Request a single security with default fields to learn which fields
+    # the master service returns by default
+    core_fields = []
+    if rows:
+        core_fields, _ = _read_master_file_csv({"sids": rows[0][header.index("Sid")]})
+
+    universes = {}
+    for code in list_universes():
+        try:
+            _, universe_rows = _read_master_file_csv({"universes": code, "fields": "Sid"})
+        except NoMasterData:
+            universe_rows = []
+        universes[code] = [row[0] for row in universe_rows]
+
+    conn = _connect_master_replica(filepath)
+    try:
+        with conn:
+            counts = _sync_master_replica_securities(conn, header, rows)
+
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS universes "
+                "(Universe TEXT NOT NULL, Sid TEXT NOT NULL, PRIMARY KEY (Universe, Sid))")
+            conn.execute("CREATE INDEX IF NOT EXISTS universes_sid ON universes (Sid)")
+            conn.execute("DELETE FROM universes")
+            conn.executemany(
+                "INSERT OR IGNORE INTO universes (Universe, Sid) VALUES (?, ?)",
+                [(code, sid) for code, sids in universes.items() for sid in sids])
+
+            conn.executemany(
+                "INSERT OR REPLACE INTO meta (Key, Value) VALUES (?, ?)",
+                [("fields", json.dumps(header)),
+                 ("core_fields", json.dumps(core_fields)),
+                 ("universes", json.dumps(sorted(universes)))])
+    finally:
+        conn.close()
+
+    counts["universes"] = len(universes)
+    return counts
+
+def _cli_sync_master_replica(*args, **kwargs):
+    return json_to_cli(sync_master_replica, *args, **kwargs)
+
+def _sync_master_replica_securities(conn, header, rows):
+    """
+    Upsert changed securities into the securities table of the master
+    replica and delete securities that no longer exist, returning counts.
+    """
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS meta (Key TEXT PRIMARY KEY, Value TEXT)")
+
+    existing_header = conn.execute(
+        "SELECT Value FROM meta WHERE Key = 'fields'").fetchone()
+
+    # Rebuild the table if the available fields have changed
+    if not existing_header or json.loads(existing_header[0]) != header:
+        conn.execute("DROP TABLE IF EXISTS securities")
+        columns = ", ".join(
+            "{0} TEXT{1}".format(
+                _quote_identifier(field), " PRIMARY KEY" if field == "Sid" else "")
+            for field in header)
+        conn.execute("CREATE TABLE securities ({0}, _RowHash TEXT)".format(columns))
+        for field in ("Symbol", "Exchange"):
+            if field in header:
+                conn.execute("CREATE INDEX securities_{0} ON securities ({1})".format(
+                    field.lower(), _quote_identifier(field)))
+
+    existing_hashes = dict(conn.execute("SELECT Sid, _RowHash FROM securities"))
+
+    sid_idx = header.index("Sid")
+    counts = {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+    changed_rows = []
+    for row in rows:
+        row_hash = hashlib.sha1("\x1f".join(row).encode("utf-8")).hexdigest()
+        existing_hash = existing_hashes.pop(row[sid_idx], None)
+        if existing_hash == row_hash:
+            counts["unchanged"] += 1
+            continue
+        counts["updated" if existing_hash else "inserted"] += 1
+        changed_rows.append(row + [row_hash])
+
+    conn.executemany(
+        "INSERT OR REPLACE INTO securities ({0}, _RowHash) VALUES ({1})".format(
+            ", ".join(_quote_identifier(field) for field in header),
+            ", ".join(["?"] * (len(header) + 1))),
+        changed_rows)
+
+    # anything left in existing_hashes is no longer in the master file
+    conn.executemany(
+        "DELETE FROM securities WHERE Sid = ?",
+        [(sid,) for sid in existing_hashes])
+    counts["deleted"] = len(existing_hashes)
+
+    return counts
+
+def _forget_master_replica_universe(code):
+    """
+    Remove a universe from the master replica (if enabled), so that queries
+    for the universe are sent to the master service until the next sync.
+    """
+    filepath = _get_master_replica_path()
+    if not filepath or not os.path.exists(filepath):
+        return
+
+    conn = _connect_master_replica(filepath)
+    try:
+        with conn:
+            universes = conn.execute(
+                "SELECT Value FROM meta WHERE Key = 'universes'").fetchone()
+            if not universes:
+                return
+            universes = [universe for universe in json.loads(universes[0]) if universe != code]
+            conn.execute(
+                "UPDATE meta SET Value = ? WHERE Key = 'universes'", (json.dumps(universes),))
+            conn.execute("DELETE FROM universes WHERE Universe = ?", (code,))
+    except sqlite3.Error:
+        pass
+    finally:
+        conn.close()
+
+def _resolve_master_replica_fields(requested_fields, fields, core_fields):
+    """
+    Return the fields to query from the master replica, or None if any of
+    the requested fields aren't available in the replica.
+    """
+    if not requested_fields:
+        return core_fields or None
+
+    if isinstance(requested_fields, str):
+        requested_fields = [requested_fields]
+
+    resolved = set(["Sid"])
+    for requested_field in requested_fields:
+        if requested_field == "*":
+            matches = fields
+        elif requested_field.endswith("*"):
+            prefix = requested_field[:-1] + "_"
+            matches = [field for field in fields if field.startswith(prefix)]
+        elif requested_field in fields:
+            matches = [requested_field]
+        else:
+            matches = []
+        if not matches:
+            # let the master service report invalid fields
+            return None
+        resolved.update(matches)
+
+    return [field for field in fields if field in resolved]
+
+def _query_master_replica(params):
+    """
+    Answer a master file query from the master replica, returning a
+    response-like object of CSV content, or None if the replica isn't
+    enabled or can't answer the query.
+    """
+    filepath = _get_master_replica_path()
+    if not filepath or not os.path.exists(filepath):
+        return None
+
+    if set(params) - set(_MASTER_REPLICA_PARAMS):
+        return None
+
+    params = {
+        param: [value] if isinstance(value, str) else value
+        for param, value in params.items()}
+
+    try:
+        conn = _connect_master_replica(filepath, readonly=True)
+    except sqlite3.Error:
+        return None
+
+    try:
+        meta = dict(conn.execute("SELECT Key, Value FROM meta"))
+        fields = json.loads(meta["fields"])
+        core_fields = json.loads(meta["core_fields"])
+        synced_universes = set(json.loads(meta["universes"]))
+
+        query_fields = _resolve_master_replica_fields(
+            params.get("fields"), fields, core_fields)
+        if not query_fields:
+            return None
+
+        def _in(column, values):
+            return "{0} IN (SELECT value FROM json_each(?))".format(
+                _quote_identifier(column)), json.dumps(list(values))
+
+        def _in_universes(universes):
+            return (
+                "Sid IN (SELECT Sid FROM universes WHERE Universe IN "
+                "(SELECT value FROM json_each(?)))"), json.dumps(list(universes))
+
+        def _all_found(column, values):
+            values = set(values)
+            clause, arg = _in(column, values)
+            num_found = conn.execute(
+                "SELECT COUNT(DISTINCT {0}) FROM securities WHERE {1}".format(
+                    _quote_identifier(column), clause), (arg,)).fetchone()[0]
+            return num_found >= len(values)
+
+        # Sids listed since the last sync aren't in the replica, so only
+        # answer the query if all sids are found
+        if "sids" in params and not _all_found("Sid", params["sids"]):
+            return None
+
+        inclusions = []
+        for param, field in _MASTER_REPLICA_FILTER_FIELDS.items():
+            if param not in params:
+                continue
+            if field not in fields:
+                return None
+            # The master service also matches vendor-specific values (for
+            # example IBKR exchange codes), so only answer the query if all
+            # values are found in the replica
+            if not _all_found(field, params[param]):
+                return None
+            inclusions.append(_in(field, set(params[param])))
+
+        for param in ("universes", "exclude_universes"):
+            if not set(params.get(param, [])).issubset(synced_universes):
+                return None
+
+        if "universes" in params:
+            inclusions.append(_in_universes(params["universes"]))
+
+        if inclusions:
+            where = " AND ".join(clause for clause, _ in inclusions)
+            args = [arg for _, arg in inclusions]
+            # sids are always included, regardless of the other filters
+            if "sids" in params:
+                clause, arg = _in("Sid", params["sids"])
+                where = "({0}) OR {1}".format(where, clause)
+                args.append(arg)
+        elif "sids" in params:
+            where, arg = _in("Sid", params["sids"])
+            args = [arg]
+        else:
+            # let the master service handle unfiltered queries
+            return None
+
+        exclusions = []
+        if "exclude_sids" in params:
+            exclusions.append(_in("Sid", params["exclude_sids"]))
+        if "exclude_universes" in params:
+            exclusions.append(_in_universes(params["exclude_universes"]))
+        if params.get("exclude_delisted"):
+            if "Delisted" not in fields:
+                return None
+            exclusions.append(("COALESCE(Delisted, '') IN ('1', 'True', 'true')", None))
+        if exclusions:
+            where = "({0}) AND NOT ({1})".format(
+                where, " OR ".join(clause for clause, _ in exclusions))
+            args.extend(arg for _, arg in exclusions if arg is not None)
+
+        rows = conn.execute(
+            "SELECT {0} FROM securities WHERE {1} ORDER BY Sid".format(
+                ", ".join(_quote_identifier(field) for field in query_fields), where),
+            args).fetchall()
+
+    except (sqlite3.Error, KeyError, ValueError):
+        return None
+    finally:
+        conn.close()
+
+    if not rows:
+        raise NoMasterData("no securities match the query parameters")
+
+    f = io.StringIO()
+    writer = csv.writer(f, lineterminator="\n")
+    writer.writerow(query_fields)
+    writer.writerows(rows)
+
+    return _ReplicaResponse(f.getvalue().encode("utf-8"))
 
 def get_securities(
     symbols: Union[list[str], str] = None,
@@ -797,6 +1236,7 @@ def get_securities(
         Literal["alpaca", "edi", "ibkr", "sharadar", "usstock"],
         list[str]] = None,
     fields: Union[Field, list[str]] = None,
+    compact: bool = False,
     ) -> 'pd.DataFrame':
     """
     Return a DataFrame of security details from the securities master database.
@@ -851,6 +1291,12 @@ def get_securities(
         to see available vendor prefixes. Pass "?" or any invalid fieldname
         to see all available fields.
 
+    compact : bool
+        if True, parse string fields with few distinct values (Exchange,
+        Currency, SecType, and Timezone, including vendor-specific versions
+        of these fields) as categoricals, reducing memory usage for large
+        queries. Default False.
+
     Returns
     -------
     DataFrame
@@ -893,6 +1339,11 @@ def get_securities(
     exchanges, and include all IBKR fields:
 
     >>> securities = get_securities(exchanges=["NYSE","NASDAQ"], fields="ibkr*")
+
+    Load all fields for all securities in a universe, using categoricals
+    to reduce memory usage:
+
+    >>> securities = get_securities(universes="usstock", fields="*", compact=True)
     """
     try:
         import pandas as pd
@@ -910,29 +1361,65 @@ def get_securities(
         exclude_expired=exclude_expired, frontmonth=frontmonth,
         vendors=vendors, fields=fields)
 
-    securities = pd.read_csv(f, index_col="Sid")
+    # Read the header to build the schema, then parse the file with it
+    columns = list(pd.read_csv(f, nrows=0).columns)
+    f.seek(0)
+    dtypes, date_fields, bool_fields = _get_master_file_schema(columns, compact=compact)
+
+    securities = pd.read_csv(
+        f, index_col="Sid", dtype=dtypes, parse_dates=date_fields)
+
+    # Boolean fields are parsed as nullable booleans; treat nulls as False
+    for col in bool_fields:
+        securities[col] = securities[col].fillna(False).astype(bool)
 
-    for col in securities.columns:
+    return securities
+
+# Master fields (without vendor prefix) that are Boolean flags
+_MASTER_BOOL_FIELDS = (
+    "Delisted", "Etf", "EasyToBorrow", "Marginable", "Tradable", "Shortable",
+    "IsPrimaryListing")
+
+# Master fields (without vendor prefix) that are dates, in addition to
+# fields that start or end with "Date"
+_MASTER_DATE_FIELDS = (
+    "FirstAdded", "LastAdded", "RecordCreated", "RecordModified",
+    "LastUpdated", "FirstQuarter", "LastQuarter")
+
+# Master fields (without vendor prefix) with few distinct values, which
+# are parsed as categoricals if compact=True
+_MASTER_CATEGORY_FIELDS = ("Exchange", "Currency", "SecType", "Timezone")
+
+def _get_master_file_schema(columns, compact=False):
+    """
+    Return a dict of dtypes, a list of date fields, and a list of Boolean
+    fields for the columns of a master file, for use with pd.read_csv.
+    """
+    dtypes = {}
+    date_fields = []
+    bool_fields = []
+
+    for col in columns:
+        if col == "Sid":
+            continue
         col_without_vendor_prefix = col.split("_")[-1]
-        if col_without_vendor_prefix in (
-            "Delisted", "Etf", "EasyToBorrow", "Marginable", "Tradable", "Shortable",
-            "IsPrimaryListing"):
-            securities[col] = securities[col].fillna(0).astype(bool)
+        if col_without_vendor_prefix in _MASTER_BOOL_FIELDS:
+            dtypes[col] = "boolean"
+            bool_fields.append(col)
         elif (
             col_without_vendor_prefix.endswith("Date")
             or col_without_vendor_prefix.startswith("Date")
-            or col_without_vendor_prefix in (
-                "FirstAdded", "LastAdded", "RecordCreated", "RecordModified",
-                "LastUpdated", "FirstQuarter", "LastQuarter")):
-            # pd.to_datetime handles NaNs in earlier pandas versions (0.22)
-            # while .astype("datetime64[ns]") does not
-            securities[col] = pd.to_datetime(securities[col])
+            or col_without_vendor_prefix in _MASTER_DATE_FIELDS):
+            date_fields.append(col)
+        elif compact and col_without_vendor_prefix in _MASTER_CATEGORY_FIELDS:
+            dtypes[col] = "category"
 
-    return securities
+    return dtypes, date_fields, bool_fields
 
 def get_securities_reindexed_like(
     reindex_like: 'pd.DataFrame',
     fields: Union[Field, list[str]] = None,
+    static: bool = False,
     ) -> 'pd.DataFrame':
     """
     Return a multiindex DataFrame of securities master data, reindexed to
@@ -955,11 +1442,19 @@ def get_securities_reindexed_like(
         vendor prefix plus "*") to see available vendor prefixes. Pass "?" or
         any invalid fieldname to see all available fields.
 
+    static : bool
+        if True, return a DataFrame with one row per field and sids for the
+        columns, instead of repeating each field's values for every row of
+        `reindex_like`. Since master data doesn't vary by date, this is
+        cheaper for large DataFrames and can be broadcast against
+        `reindex_like` as needed. Default False.
+
     Returns
     -------
     DataFrame
         a multiindex (Field, Date) DataFrame of securities master data, shaped
-        like the input DataFrame
+        like the input DataFrame, or a DataFrame of fields x sids if
+        static=True
 
     Notes
     -----
@@ -977,31 +1472,59 @@ def get_securities_reindexed_like(
             closes, fields=["Exchange"])
     >>> exchanges = securities.loc["Exchange"]
     >>> nyse_closes = closes.where(exchanges == "XNYS")
+
+    Get exchanges as a static DataFrame (one row per field), and use it to
+    select columns of the prices DataFrame:
+
+    >>> securities = get_securities_reindexed_like(
+            closes, fields=["Exchange"], static=True)
+    >>> are_nyse = securities.loc["Exchange"] == "XNYS"
+    >>> nyse_closes = closes.loc[:, are_nyse]
     """
     try:
         import pandas as pd
     except ImportError:
         raise ImportError("pandas must be installed to use this function")
 
+    import numpy as np
+
     sids = list(reindex_like.columns)
 
     securities = get_securities(sids=sids, fields=fields)
 
-    if "Sid" in fields:
+    if fields and "Sid" in fields:
         securities["Sid"] = securities.index
 
-    all_master_fields = {}
-
-    for col in sorted(securities.columns):
-        this_col = securities[col]
-        all_master_fields[col] = reindex_like.apply(lambda x: this_col, axis=1)
+    # Fields x sids, aligned to the columns of reindex_like
+    securities = securities.reindex(
+        index=reindex_like.columns, columns=sorted(securities.columns)).T
+    securities.index.name = "Field"
+
+    if static:
+        return securities
+
+    # Master data doesn't vary by date, so repeat each field's row of
+    # values for every row of reindex_like, materializing all fields in a
+    # single allocation (pandas picks a common dtype for the columns, as it
+    # would when concatenating the fields)
+    num_rows = len(reindex_like.index)
+    values = np.repeat(securities.values, num_rows, axis=0)
+
+    # repeat the index of reindex_like for each field (using take to
+    # preserve the timezone)
+    row_positions = np.tile(np.arange(num_rows), len(securities.index))
+    index_arrays = [np.repeat(securities.index.values, num_rows)]
+    for level in range(reindex_like.index.nlevels):
+        index_arrays.append(
+            reindex_like.index.get_level_values(level).take(row_positions))
 
     names = list(reindex_like.index.names)
     names.insert(0, "Field")
 
-    securities = pd.concat(all_master_fields, names=names)
-    securities = securities.reindex(columns=reindex_like.columns)
-    return securities
+    return pd.DataFrame(
+        values,
+        index=pd.MultiIndex.from_arrays(index_arrays, names=names),
+        columns=reindex_like.columns)
 
 def get_contract_nums_reindexed_like(
     reindex_like: 'pd.DataFrame',
@@ -1052,6 +1575,8 @@ def get_contract_nums_reindexed_like(
     except ImportError:
         raise ImportError("pandas must be installed to use this function")
 
+    import numpy as np
+
     index_levels = reindex_like.index.names
 
     if "Date" not in index_levels:
@@ -1073,56 +1598,308 @@ def get_contract_nums_reindexed_like(
     if rollover_dates.empty:
         raise ParameterError("input DataFrame does not appear to contain any futures contracts")
 
+    rollover_dates = rollover_dates.dropna(subset=["RolloverDate", "ibkr_UnderConId"])
+
+    # RolloverDates are dates without timezones, so compare them to the
+    # wall-clock dates of reindex_like. Sequence each unique date once (the
+    # index may have a Time level).
     if reindex_like_dt_index.tz:
-        rollover_dates["RolloverDate"] = rollover_dates.RolloverDate.dt.tz_localize(reindex_like_dt_index.tz.zone)
+        reindex_like_dt_index = reindex_like_dt_index.tz_localize(None)
+    unique_dates, date_positions = np.unique(
+        reindex_like_dt_index.values, return_inverse=True)
 
-    min_date = reindex_like_dt_index.min()
-    max_date = max([rollover_dates.RolloverDate.max(),
-                    reindex_like_dt_index.max()])
+    contract_nums = np.full((len(unique_dates), len(reindex_like.columns)), np.nan)
 
-    # Stack sids by underlying (1 column per underlying)
-    rollover_dates = rollover_dates.set_index(["RolloverDate","ibkr_UnderConId"]).Sid.unstack()
+    rollover_dates = rollover_dates.sort_values(
+        ["ibkr_UnderConId", "RolloverDate"], kind="stable")
 
-    contract_nums = None
+    for _, chain in rollover_dates.groupby("ibkr_UnderConId", sort=False):
 
-    for i in range(limit):
+        # RolloverDate is when we roll out of the contract, so the front
+        # contract as of each date is the first contract whose RolloverDate
+        # is on or after the date
+        front_positions = np.searchsorted(
+            chain.RolloverDate.values, unique_dates, side="left")
 
-        # backshift conids
-        _rollover_dates = rollover_dates.apply(lambda col: col.dropna().shift(-i))
+        chain_cols = reindex_like.columns.get_indexer(chain.Sid)
+        chain_positions = np.flatnonzero(chain_cols >= 0)
+        if not len(chain_positions):
+            continue
 
-        # Reindex to daily frequency
-        _rollover_dates = _rollover_dates.reindex(
-            index=pd.date_range(start=min_date, end=max_date))
+        # each contract's sequence number is its position in the chain
+        # relative to the front contract
+        nums = chain_positions[np.newaxis, :] - front_positions[:, np.newaxis] + 1
+        nums = np.where((nums >= 1) & (nums <= limit), nums, np.nan)
+        contract_nums[:, chain_cols[chain_positions]] = nums
 
-        # RolloverDate is when we roll out of the contract, hence we backfill
-        _rollover_dates = _rollover_dates.bfill()
+    contract_nums = pd.DataFrame(
+        contract_nums[date_positions.ravel()],
+        index=reindex_like.index,
+        columns=reindex_like.columns)
 
-        # Stack to Series of Date, nth sid
-        _rollover_dates = _rollover_dates.stack()
-        _rollover_dates.index = _rollover_dates.index.droplevel("ibkr_UnderConId")
-        _rollover_dates.index.name = "Date"
+    return contract_nums
 
-        # Pivot Series to DataFrame
-        _rollover_dates = _rollover_dates.reset_index(name="Sid")
-        _rollover_dates["ContractNum"] = i + 1
-        _rollover_dates = _rollover_dates.set_index(["Date","Sid"])
-        _contract_nums = _rollover_dates.ContractNum.unstack()
+# SecurityIndex instances, for invalidating cached universe memberships
+# when universes are created or deleted
+_SECURITY_INDEXES = weakref.WeakSet()
 
-        # If MultiIndex input, broadcast across Time level
-        if len(index_levels) > 1:
-            _contract_nums = _contract_nums.reindex(index=reindex_like.index,
-                                                level="Date")
-            _contract_nums = _contract_nums.reindex(columns=reindex_like.columns)
-        else:
-            _contract_nums = _contract_nums.reindex(index=reindex_like_dt_index,
-                                                    columns=reindex_like.columns)
+class SecurityIndex(object):
+    """
+    In-process index of securities master data, for fast lookups of sids
+    by symbol or universe and of security details by sid.
 
-        if contract_nums is None:
-            contract_nums = _contract_nums
-        else:
-            contract_nums = contract_nums.fillna(_contract_nums)
+    The index is built from a single query of the securities master
+    database and answers lookups from memory. Universe memberships are
+    queried the first time each universe is requested and then cached;
+    cached memberships are discarded when the universe is created or
+    deleted with `create_universe` or `delete_universe` in this process.
 
-    return contract_nums
+    Parameters
+    ----------
+    exchanges : list of str, optional
+        limit to these exchanges. You can specify exchanges using the MIC or the
+        vendor's exchange code.
+
+    sec_types : list of str, optional
+        limit to these security types. Possible choices: STK, ETF, FUT, CASH, IND, OPT, FOP, BAG
+
+    currencies : list of str, optional
+        limit to these currencies
+
+    universes : list of str, optional
+        limit to these universes
+
+    exclude_delisted : bool
+        exclude delisted securities (default is to include them)
+
+    vendors : list of str, optional
+        limit to these vendors. Possible choices: alpaca, edi, ibkr,
+        sharadar, usstock
+
+    fields : list of str, optional
+        additional fields to include for looking up security details. Symbol,
+        Exchange, and Delisted are always included.
+
+    Notes
+    -----
+    Usage Guide:
+
+    * Master file: https://qrok.it/dl/qr/master-file
+
+    Examples
+    --------
+    Build an index of US stocks and resolve symbols to sids:
+
+    >>> index = SecurityIndex(exchanges=["XNYS", "XNAS", "ARCX"], sec_types="STK")
+    >>> sids = index.resolve(["AAPL", "MSFT"])
+
+    Look up the sids in a universe, and the details of those sids:
+
+    >>> sids = index.get_universe_sids("my-universe")
+    >>> securities = index.get_details(sids, fields=["Symbol", "Exchange"])
+    """
+
+    def __init__(
+        self,
+        exchanges: Union[list[str], str] = None,
+        sec_types: Union[
+            Literal["STK", "ETF", "FUT", "CASH", "IND", "OPT", "FOP", "BAG"],
+            list[str]] = None,
+        currencies: Union[list[str], str] = None,
+        universes: Union[list[str], str] = None,
+        exclude_delisted: bool = False,
+        vendors: Union[
+            Literal["alpaca", "edi", "ibkr", "sharadar", "usstock"],
+            list[str]] = None,
+        fields: Union[Field, list[str]] = None,
+        ):
+
+        if isinstance(fields, str):
+            fields = [fields]
+        fields = list(fields or [])
+        for field in ("Symbol", "Exchange", "Delisted"):
+            if field not in fields:
+                fields.append(field)
+
+        self._query = dict(
+            exchanges=exchanges, sec_types=sec_types, currencies=currencies,
+            universes=universes, exclude_delisted=exclude_delisted,
+            vendors=vendors, fields=fields)
+
+        self.securities: 'pd.DataFrame' = None
+        self._symbol_sids = {}
+        self._symbol_maps = {}
+        self._universe_sids = {}
+
+        self.refresh()
+
+        _SECURITY_INDEXES.add(self)
+
+    def refresh(self) -> None:
+        """
+        Re-query the securities master database and rebuild the index.
+
+        Returns
+        -------
+        None
+        """
+        self.securities = get_securities(**self._query)
+        self._symbol_sids = {
+            symbol: list(sids) for symbol, sids in
+            self.securities.groupby("Symbol").groups.items()}
+        self._symbol_maps = {}
+        self._universe_sids = {}
+
+    def lookup_sids(self, symbol: str) -> list[str]:
+        """
+        Return all sids with the symbol, including delisted securities and
+        listings on multiple exchanges.
+
+        Parameters
+        ----------
+        symbol : str, required
+            the symbol to look up
+
+        Returns
+        -------
+        list of str
+            the sids with the symbol
+        """
+        return list(self._symbol_sids.get(symbol, []))
+
+    def resolve(
+        self,
+        symbols: Union[list[str], str],
+        exchange: str = None
+        ) -> 'pd.Series':
+        """
+        Resolve symbols to sids.
+
+        Where a symbol has both active and delisted listings, the active
+        listing is used. A symbol that still matches more than one security
+        is ambiguous and raises an error; pass `exchange` to disambiguate.
+
+        Parameters
+        ----------
+        symbols : list of str, required
+            the symbols to resolve
+
+        exchange : str, optional
+            only consider listings on this exchange (MIC)
+
+        Returns
+        -------
+        Series
+            Series of sids indexed by symbol, with NaNs for symbols that are
+            not in the index
+        """
+        import pandas as pd
+
+        if isinstance(symbols, str):
+            symbols = [symbols]
+
+        symbol_map, ambiguous_symbols = self._get_symbol_map(exchange)
+
+        symbols = pd.Index(symbols, name="Symbol")
+        are_ambiguous = symbols.isin(ambiguous_symbols)
+        if are_ambiguous.any():
+            raise ParameterError(
+                "symbols match multiple securities, please specify exchange: {0}".format(
+                    ", ".join(symbols[are_ambiguous].unique())))
+
+        # symbol_map has unique symbols, and may be empty
+        sids = symbol_map.reindex(symbols).values
+
+        return pd.Series(sids, index=symbols, name="Sid")
+
+    def _get_symbol_map(self, exchange=None):
+        """
+        Return a Series mapping symbols to sids, using only unambiguous
+        symbols, and a list of ambiguous symbols. Memoized per exchange.
+        """
+        if exchange in self._symbol_maps:
+            return self._symbol_maps[exchange]
+
+        listings = self.securities[["Symbol", "Exchange", "Delisted"]].reset_index()
+        listings = listings.dropna(subset=["Symbol"])
+        if exchange:
+            listings = listings[listings.Exchange == exchange]
+
+        # prefer active listings for symbols that have any
+        are_active = ~listings.Delisted.astype(bool)
+        have_active = are_active.groupby(listings.Symbol).transform("any")
+        listings = listings[are_active | ~have_active]
+
+        num_listings = listings.Symbol.map(listings.Symbol.value_counts())
+        symbol_map = listings[num_listings == 1].set_index("Symbol").Sid
+        ambiguous_symbols = list(listings.Symbol[num_listings > 1].unique())
+
+        self._symbol_maps[exchange] = symbol_map, ambiguous_symbols
+        return symbol_map, ambiguous_symbols
+
+    def get_details(
+        self,
+        sids: Union[list[str], str],
+        fields: Union[list[str], str] = None
+        ) -> 'pd.DataFrame':
+        """
+        Return security details for the sids.
+
+        Parameters
+        ----------
+        sids : list of str, required
+            the sids to look up
+
+        fields : list of str, optional
+            limit to these fields. Defaults to all indexed fields.
+
+        Returns
+        -------
+        DataFrame
+            a DataFrame of securities, with Sids as the index, with NaNs
+            for sids that are not in the index
+        """
+        if isinstance(sids, str):
+            sids = [sids]
+        if isinstance(fields, str):
+            fields = [fields]
+        return self.securities.reindex(index=sids, columns=fields)
+
+    def get_universe_sids(self, code: str) -> list[str]:
+        """
+        Return the sids in a universe.
+
+        The universe's sids are queried from the securities master database
+        the first time the universe is requested, then cached.
+
+        Parameters
+        ----------
+        code : str, required
+            the universe code
+
+        Returns
+        -------
+        list of str
+            the sids in the universe
+        """
+        if code not in self._universe_sids:
+            f = six.StringIO()
+            try:
+                download_master_file(f, universes=code, fields="Sid")
+            except NoMasterData:
+                sids = []
+            else:
+                sids = [line.strip() for line in f.read().splitlines()[1:] if line.strip()]
+            self._universe_sids[code] = sids
+        return list(self._universe_sids[code])
+
+def _invalidate_security_indexes(code):
+    """
+    Discard cached memberships of the universe from all SecurityIndex
+    instances.
+    """
+    for index in list(_SECURITY_INDEXES):
+        index._universe_sids.pop(code, None)
 
 def create_universe(
     code: str,
@@ -1217,6 +1994,8 @@ def create_universe(
         response = houston.request(method, url, params=params)
 
     houston.raise_for_status_with_json(response)
+    _forget_master_replica_universe(code)
+    _invalidate_security_indexes(code)
     return response.json()
 
 def _cli_create_universe(*args, **kwargs):
@@ -1250,6 +2029,8 @@ def delete_universe(code: str) -> dict[str, str]:
 
     response = houston.delete(url)
     houston.raise_for_status_with_json(response)
+    _forget_master_replica_universe(code)
+    _invalidate_security_indexes(code)
     return response.json()
 
 def _cli_delete_universe(*args, **kwargs):
@@ -1486,7 +2267,8 @@ def list_calendar_statuses(
     sec_type: Literal["STK", "FUT", "CASH", "OPT"] = None,
     in_: str = None,
     ago: str = None,
-    outside_rth: bool = False
+    outside_rth: bool = False,
+    use_cache: bool = False
     ) -> dict[str, str]:
     """
     Check whether exchanges are open or closed.
@@ -1512,6 +2294,15 @@ def list_calendar_statuses(
         check extended hours calendar (default is to check regular
         trading hours calendar)
 
+    use_cache : bool
+        answer from a local cache of calendar statuses where possible, and
+        only query the master service for exchanges that aren't cached or
+        whose cached status has expired. Each status is cached together
+        with the period it applies to (since and until), so it can answer
+        any check that falls within that period. The cache is kept in
+        memory and in a file shared by all processes, and cached statuses
+        are refreshed from the master service at least hourly. Default False.
+
     Returns
     -------
     dict
@@ -1522,6 +2313,14 @@ def list_calendar_statuses(
     Usage Guide:
 
     * Trading Calendars: https://qrok.it/dl/qr/calendars
+
+    Examples
+    --------
+    Check whether NYSE is open, using the local cache (suitable for
+    calling in a loop):
+
+    >>> statuses = list_calendar_statuses("XNYS", use_cache=True)
+    >>> is_open = statuses["XNYS"]["status"] == "open"
     """
     params = {}
     if exchanges:
@@ -1535,6 +2334,9 @@ def list_calendar_statuses(
     if outside_rth:
         params["outside_rth"] = outside_rth
 
+    if use_cache:
+        return _list_cached_calendar_statuses(params)
+
     response = houston.get("/master/calendar", params=params)
     houston.raise_for_status_with_json(response)
     return response.json()
@@ -1542,6 +2344,139 @@ def list_calendar_statuses(
 def _cli_list_calendar_statuses(*args, **kwargs):
     return json_to_cli(list_calendar_statuses, *args, **kwargs)
 
+# In-process cache of calendar statuses, keyed by "exchange|sec_type|outside_rth"
+_CALENDAR_STATUS_CACHE = {}
+
+# Maximum age (in seconds) of a cached calendar status, after which it is
+# refreshed from the master service even if still current, so that changes
+# to calendars (such as newly collected holidays) are picked up
+_CALENDAR_CACHE_MAX_AGE = 3600
+
+def _get_calendar_cache_path():
+    """
+    Return the path of the file cache of calendar statuses.
+    """
+    return os.path.join(
+        os.environ.get("QUANTROCKET_TMP_DIR", tempfile.gettempdir()),
+        "quantrocket.master.calendar.json")
+
+def _get_calendar_cache_key(exchange, params):
+    return "{0}|{1}|{2}".format(
+        exchange, params.get("sec_type") or "", bool(params.get("outside_rth")))
+
+def _load_calendar_cache():
+    """
+    Update the in-process cache of calendar statuses from the file cache.
+    """
+    try:
+        with open(_get_calendar_cache_path()) as f:
+            _CALENDAR_STATUS_CACHE.update(json.load(f))
+    except (OSError, ValueError):
+        pass
+
+def _save_calendar_cache():
+    """
+    Write the in-process cache of calendar statuses to the file cache.
+    """
+    filepath = _get_calendar_cache_path()
+    # write to a temporary file and rename it, so that other processes never
+    # read a partially written file
+    tmp_filepath = "{0}.{1}".format(filepath, os.getpid())
+    try:
+        with open(tmp_filepath, "w") as f:
+            json.dump(_CALENDAR_STATUS_CACHE, f)
+        os.replace(tmp_filepath, filepath)
+    except OSError:
+        pass
+
+def _get_cached_calendar_status(key, in_=None, ago=None):
+    """
+    Return the cached calendar status for the cache key, or None if the
+    status isn't cached or doesn't apply at the time to check.
+    """
+    import pandas as pd
+
+    cached = _CALENDAR_STATUS_CACHE.get(key)
+    if not cached or time.time() - cached["cached_at"] > _CALENDAR_CACHE_MAX_AGE:
+        return None
+
+    status = cached["status"]
+    try:
+        timezone = status["timezone"]
+        since = pd.Timestamp(status["since"])
+        until = pd.Timestamp(status["until"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+    dt = pd.Timestamp.now(timezone)
+    if in_:
+        dt += pd.Timedelta(in_)
+    elif ago:
+        dt -= pd.Timedelta(ago)
+
+    # compare in the exchange timezone, as since and until are local times
+    dt = dt.tz_localize(None)
+    if since.tz:
+        since = since.tz_convert(timezone).tz_localize(None)
+    if until.tz:
+        until = until.tz_convert(timezone).tz_localize(None)
+
+    if since <= dt < until:
+        return status
+
+    return None
+
+def _list_cached_calendar_statuses(params):
+    """
+    Return calendar statuses from the cache, querying the master service
+    for any exchanges that aren't cached or whose status has expired.
+    """
+    try:
+        import pandas as pd
+    except ImportError:
+        raise ImportError("pandas must be installed to use the calendar cache")
+
+    exchanges = params["exchanges"]
+    if isinstance(exchanges, str):
+        exchanges = [exchanges]
+
+    def _get_cached_statuses():
+        cached_statuses = {}
+        for exchange in exchanges:
+            status = _get_cached_calendar_status(
+                _get_calendar_cache_key(exchange, params),
+                in_=params.get("in"), ago=params.get("ago"))
+            if status is not None:
+                cached_statuses[exchange] = status
+        return cached_statuses
+
+    statuses = _get_cached_statuses()
+
+    # another process may have refreshed the file cache
+    if len(statuses) < len(exchanges):
+        _load_calendar_cache()
+        statuses = _get_cached_statuses()
+
+    missing_exchanges = [exchange for exchange in exchanges if exchange not in statuses]
+    if missing_exchanges:
+        params = params.copy()
+        params["exchanges"] = missing_exchanges
+        response = houston.get("/master/calendar", params=params)
+        houston.raise_for_status_with_json(response)
+        fetched_statuses = response.json()
+
+        cached_at = time.time()
+        for exchange, status in fetched_statuses.items():
+            _CALENDAR_STATUS_CACHE[_get_calendar_cache_key(exchange, params)] = {
+                "status": status, "cached_at": cached_at}
+        _save_calendar_cache()
+
+        statuses.update(fetched_statuses)
+
+    return {
+        exchange: statuses[exchange]
+        for exchange in exchanges if exchange in statuses}
+
 def _cli_in_status_since(status, since=None, in_=None, ago=None):
 
     try:
@@ -1604,8 +2539,10 @@ def _cli_in_status_until(status, until=None, in_=None, ago=None):
     actual_until = pd.Timestamp(status["until"])
     return actual_until >= required_until
 
-def _cli_isopen(exchanges, sec_type=None, in_=None, ago=None, since=None, until=None, outside_rth=False):
-    statuses = list_calendar_statuses(exchanges, sec_type=sec_type, in_=in_, ago=ago, outside_rth=outside_rth)
+def _cli_isopen(exchanges, sec_type=None, in_=None, ago=None, since=None, until=None, outside_rth=False, use_cache=False):
+    statuses = list_calendar_statuses(
+        exchanges, sec_type=sec_type, in_=in_, ago=ago, outside_rth=outside_rth,
+        use_cache=use_cache)
     is_open = all([
         calendar["status"] == "open" for calendar in statuses.values()
     ])
@@ -1621,8 +2558,10 @@ def _cli_isopen(exchanges, sec_type=None, in_=None, ago=None, since=None, until=
 
     return '', int(not is_open)
 
-def _cli_isclosed(exchanges, sec_type=None, in_=None, ago=None, since=None, until=None, outside_rth=False):
-    statuses = list_calendar_statuses(exchanges, sec_type=sec_type, in_=in_, ago=ago, outside_rth=outside_rth)
+def _cli_isclosed(exchanges, sec_type=None, in_=None, ago=None, since=None, until=None, outside_rth=False, use_cache=False):
+    statuses = list_calendar_statuses(
+        exchanges, sec_type=sec_type, in_=in_, ago=ago, outside_rth=outside_rth,
+        use_cache=use_cache)
     is_closed = all([
         calendar["status"] == "closed" for calendar in statuses.values()
     ])
@@ -1716,3 +2655,248 @@ def round_to_tick_sizes(
 
 def _cli_round_to_tick_sizes(*args, **kwargs):
     return json_to_cli(round_to_tick_sizes, *args, **kwargs)
+
+# In-process cache of observed tick sizes, keyed by (Sid, Exchange), with
+# values of {tick size: [min price, max price]}, where the min and max price
+# are the lowest and highest prices at which the tick size has been observed
+_TICK_SIZE_CACHE = {}
+
+def round_dataframe_to_tick_sizes(
+    prices: 'pd.DataFrame',
+    round_fields: Union[list[str], str],
+    how: Literal['up', 'down', 'nearest'] = None,
+    append_ticksize: bool = False,
+    batch_size: int = 10000,
+    max_workers: int = 4,
+    use_cache: bool = False
+    ) -> 'pd.DataFrame':
+    """
+    Round prices in a DataFrame to valid tick sizes.
+
+    DataFrame should contain columns `Sid`, `Exchange`, and the columns to
+    be rounded (e.g. `LmtPrice`). Additional columns will be returned
+    unchanged.
+
+    Parameters
+    ----------
+    prices : DataFrame, required
+        DataFrame with prices to be rounded
+
+    round_fields : list of str, required
+        columns to be rounded
+
+    how : str, optional
+        which direction to round to. Possible choices: 'up', 'down', 'nearest'
+        (default is 'nearest')
+
+    append_ticksize : bool
+        append a column of tick sizes for each field to be rounded (default False)
+
+    batch_size : int
+        number of rows to send to the master service per request. Default
+        10000.
+
+    max_workers : int
+        maximum number of concurrent requests to the master service when
+        there is more than one batch. Default 4.
+
+    use_cache : bool
+        cache the tick sizes returned by the master service for each Sid and
+        Exchange, and round prices locally when the tick size for the price
+        is known from the cache. Default False.
+
+    Returns
+    -------
+    DataFrame
+        a copy of the input DataFrame with rounded prices
+
+    Notes
+    -----
+    The tick size cache records, for each Sid, Exchange, and tick size, the
+    lowest and highest prices at which the master service returned that
+    tick size, and only answers from the cache for prices within that
+    range. This assumes that tick sizes don't decrease as prices increase,
+    which is true of the price ladders used by exchanges. Prices outside
+    the cached range are rounded by the master service, and the range is
+    widened accordingly. The cache lasts for the life of the process.
+
+    Usage Guide:
+
+    * Tick sizes: https://qrok.it/dl/qr/tick-sizes
+
+    Examples
+    --------
+    Round the LmtPrice column of a DataFrame of orders:
+
+    >>> orders = round_dataframe_to_tick_sizes(orders, "LmtPrice")
+
+    Round repeatedly (for example once per rebalance) using cached tick
+    sizes where possible:
+
+    >>> orders = round_dataframe_to_tick_sizes(orders, "LmtPrice", use_cache=True)
+    """
+    try:
+        import pandas as pd
+    except ImportError:
+        raise ImportError("pandas must be installed to use this function")
+
+    import numpy as np
+
+    if not round_fields:
+        raise ParameterError("round_fields is required")
+
+    if isinstance(round_fields, str):
+        round_fields = [round_fields]
+
+    missing_columns = set(["Sid", "Exchange"] + round_fields) - set(prices.columns)
+    if missing_columns:
+        raise ParameterError("prices is missing required columns: {0}".format(
+            ", ".join(sorted(missing_columns))))
+
+    if how and how not in ("up", "down", "nearest"):
+        raise ParameterError("how must be 'up', 'down', or 'nearest'")
+
+    rounded = prices.copy()
+    num_rows = len(rounded)
+    sids = rounded["Sid"].astype(str).values
+    exchanges = rounded["Exchange"].astype(str).values
+
+    unrounded_prices = {}
+    tick_sizes = {}
+    for field in round_fields:
+        unrounded_prices[field] = rounded[field].astype(float).values
+        tick_sizes[field] = np.full(num_rows, np.nan)
+        if use_cache:
+            tick_sizes[field] = _get_cached_tick_sizes(
+                sids, exchanges, unrounded_prices[field])
+
+    # Send rows with any price whose tick size isn't cached to the master
+    # service
+    needs_rounding = np.zeros(num_rows, dtype=bool)
+    for field in round_fields:
+        needs_rounding |= (
+            ~np.isnan(unrounded_prices[field]) & np.isnan(tick_sizes[field]))
+
+    server_rows = np.flatnonzero(needs_rounding)
+    if len(server_rows):
+        server_rounded = _round_to_tick_sizes_in_batches(
+            rounded.iloc[server_rows][["Sid", "Exchange"] + round_fields],
+            round_fields, how=how, batch_size=batch_size, max_workers=max_workers)
+
+        for field in round_fields:
+            field_tick_sizes = server_rounded["{0}TickSize".format(field)].values
+            rounded[field] = rounded[field].astype(float)
+            rounded.iloc[server_rows, rounded.columns.get_loc(field)] = server_rounded[field].values
+            tick_sizes[field][server_rows] = field_tick_sizes
+
+            if use_cache:
+                _cache_tick_sizes(
+                    sids[server_rows], exchanges[server_rows],
+                    unrounded_prices[field][server_rows], field_tick_sizes)
+
+    # Round the remaining (cached) prices locally
+    for field in round_fields:
+        local_rows = ~needs_rounding & ~np.isnan(tick_sizes[field])
+        if not local_rows.any():
+            continue
+        steps = unrounded_prices[field][local_rows] / tick_sizes[field][local_rows]
+        # allow for floating point error when prices are already on a tick
+        if how == "up":
+            steps = np.ceil(np.round(steps, 6))
+        elif how == "down":
+            steps = np.floor(np.round(steps, 6))
+        else:
+            steps = np.floor(np.round(steps, 6) + 0.5)
+        rounded[field] = rounded[field].astype(float)
+        rounded.loc[local_rows, field] = np.round(
+            steps * tick_sizes[field][local_rows], 10)
+
+    if append_ticksize:
+        for field in round_fields:
+            rounded["{0}TickSize".format(field)] = tick_sizes[field]
+
+    return rounded
+
+def _round_to_tick_sizes_in_batches(prices, round_fields, how=None, batch_size=10000, max_workers=4):
+    """
+    Round prices with the master service in batches, concurrently if there
+    is more than one batch, and return a DataFrame of rounded prices and
+    tick sizes in the same order as the input.
+    """
+    import pandas as pd
+
+    params = {"round_fields": round_fields, "append_ticksize": True}
+    if how:
+        params["how"] = how
+
+    def _round_batch(batch):
+        response = houston.get(
+            "/master/ticksizes.csv", params=params,
+            data=batch.to_csv(index=False).encode("utf-8"))
+        houston.raise_for_status_with_json(response)
+        rounded_batch = pd.read_csv(io.BytesIO(response.content))
+        if len(rounded_batch) != len(batch):
+            raise ValueError(
+                "expected {0} rows from the master service but got {1}".format(
+                    len(batch), len(rounded_batch)))
+        return rounded_batch
+
+    batch_size = max(int(batch_size), 1)
+    batches = [
+        prices.iloc[i:i + batch_size] for i in range(0, len(prices), batch_size)]
+
+    if len(batches) == 1 or max_workers <= 1:
+        rounded_batches = [_round_batch(batch) for batch in batches]
+    else:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as executor:
+            rounded_batches = list(executor.map(_round_batch, batches))
+
+    return pd.concat(rounded_batches, ignore_index=True)
+
+def _get_cached_tick_sizes(sids, exchanges, prices):
+    """
+    Return an array of cached tick sizes for the prices, NaN where unknown.
+    """
+    import numpy as np
+
+    tick_sizes = np.full(len(prices), np.nan)
+    if not _TICK_SIZE_CACHE:
+        return tick_sizes
+
+    # look up each (Sid, Exchange) once
+    keys = {}
+    for i, key in enumerate(zip(sids, exchanges)):
+        keys.setdefault(key, []).append(i)
+
+    for key, rows in keys.items():
+        cached = _TICK_SIZE_CACHE.get(key)
+        if not cached:
+            continue
+        rows = np.asarray(rows)
+        row_prices = prices[rows]
+        for tick_size, (min_price, max_price) in cached.items():
+            in_range = (row_prices >= min_price) & (row_prices <= max_price)
+            tick_sizes[rows[in_range]] = tick_size
+
+    return tick_sizes
+
+def _cache_tick_sizes(sids, exchanges, prices, tick_sizes):
+    """
+    Widen the cached price range of each (Sid, Exchange, tick size) to
+    include the observed prices.
+    """
+    import pandas as pd
+
+    observed = pd.DataFrame(
+        dict(Sid=sids, Exchange=exchanges, Price=prices, TickSize=tick_sizes)).dropna()
+    observed = observed[observed.TickSize > 0]
+    if observed.empty:
+        return
+
+    observed = observed.groupby(["Sid", "Exchange", "TickSize"]).Price.agg(["min", "max"])
+    for (sid, exchange, tick_size), (min_price, max_price) in observed.iterrows():
+        cached = _TICK_SIZE_CACHE.setdefault((sid, exchange), {})
+        if tick_size in cached:
+            min_price = min(min_price, cached[tick_size][0])
+            max_price = max(max_price, cached[tick_size][1])
+        cached[tick_size] = [min_price, max_price]
@@ -55,6 +55,22 @@ cancel_market_data
 download_market_data_file
     Query market data from a tick database or aggregate database and download to file.
 
+stream_market_data
+    Stream incoming market data over a WebSocket connection.
+
+follow_market_data
+    Poll an aggregate database for new bars, yielding a growing DataFrame of
+    prices.
+
+Classes
+-------
+TickBuffer
+    In-memory buffer of the most recent ticks per sid, for fast access to
+    latest values and recent ticks.
+
+BarAggregator
+    Aggregate streamed ticks into bars incrementally.
+
 Notes
 -----
 Usage Guide:
@@ -62,10 +78,14 @@ Usage Guide:
 * Real-time Data: https://qrok.it/dl/qr/realtime
 """
 import sys
+import io
+import json
+import time
+import base64
 import requests
 import urllib.parse
-import subprocess
-from typing import Union, Literal
+from typing import (
+    Union, Literal, Iterable, Iterator, Callable, AsyncIterable, AsyncIterator)
 from quantrocket.utils._typing import FilepathOrBuffer
 from quantrocket._cli.utils.files import write_response_to_filepath_or_buffer
 from quantrocket.houston import houston
@@ -86,6 +106,10 @@ __all__ = [
     "get_active_collections",
     "cancel_market_data",
     "download_market_data_file",
+    "stream_market_data",
+    "follow_market_data",
+    "TickBuffer",
+    "BarAggregator",
 ]
 
 ibkr_RealtimeField = Literal[
@@ -959,9 +983,330 @@ def download_market_data_file(
 def _cli_download_market_data_file(*args, **kwargs):
     return json_to_cli(download_market_data_file, *args, **kwargs)
 
-def _cli_stream_market_data(sids, exclude_sids, fields):
+def follow_market_data(
+    code: str,
+    start_date: str = None,
+    universes: Union[list[str], str] = None,
+    sids: Union[list[str], str] = None,
+    exclude_universes: Union[list[str], str] = None,
+    exclude_sids: Union[list[str], str] = None,
+    fields: Union[list[str], str] = None,
+    timezone: str = None,
+    interval: float = 5,
+    ) -> Iterator['pd.DataFrame']:
+    """
+    Poll an aggregate database for new bars, yielding a growing DataFrame of
+    prices.
+
+    Each poll requests only the bars at or after the latest bar already
+    received. The latest bar is refreshed and newer bars are appended to
+    the DataFrame. A DataFrame is yielded after each poll that returns
+    data, then the generator waits `interval` seconds before polling again.
+
+    The yielded DataFrame has a Date index and (Field, Sid) columns, so
+    that `prices["LastPriceClose"]` is a DataFrame of dates by sids. It is a
+    view of preallocated arrays, so appending bars doesn't copy existing
+    bars; copy the DataFrame if it needs to be retained across polls.
+
+    Parameters
+    ----------
+    code : str, required
+        the code of the aggregate database to query
+
+    start_date : str (YYYY-MM-DD HH:MM:SS), optional
+        limit to market data on or after this datetime. Can pass a date (YYYY-MM-DD),
+        datetime with optional timezone (YYYY-MM-DD HH:MM:SS TZ), or time with
+        optional timezone. A time without date will be interpreted as referring to
+        today if the time is earlier than now, or yesterday if the time is later than
+        now.
+
+    universes : list of str, optional
+        limit to these universes (default is to return all securities in database)
+
+    sids : list of str, optional
+        limit to these sids
+
+    exclude_universes : list of str, optional
+        exclude these universes
+
+    exclude_sids : list of str, optional
+        exclude these sids
+
+    fields : list of str, optional
+        only return these fields
+
+    timezone : str, optional
+        convert dates to this timezone, for example America/New_York (default
+        is UTC)
+
+    interval : float
+        number of seconds to wait between polls. Default 5.
+
+    Yields
+    ------
+    DataFrame
+        a DataFrame of prices, with a Date index and (Field, Sid) columns
+
+    Notes
+    -----
+    Usage Guide:
+
+    * Real-time Market Data File: https://qrok.it/dl/qr/realtime-file
+
+    Examples
+    --------
+    Follow the closing prices of an aggregate database since 09:30 AM New
+    York time:
+
+    >>> for prices in follow_market_data(
+                "usa-stk-trades-1min",
+                start_date="09:30:00 America/New_York",
+                fields="LastPriceClose",
+                timezone="America/New_York"):
+            closes = prices["LastPriceClose"]
+            ...
+    """
+    follower = _MarketDataFollower(
+        code,
+        start_date=start_date,
+        universes=universes,
+        sids=sids,
+        exclude_universes=exclude_universes,
+        exclude_sids=exclude_sids,
+        fields=fields,
+        timezone=timezone)
+
+    while True:
+        if follower.poll():
+            yield follower.get_prices()
+        time.sleep(interval)
+
+class _MarketDataFollower(object):
+    """
+    Polls an aggregate database for bars at or after the latest bar received
+    and appends them to preallocated Date x (Field, Sid) arrays, whose
+    capacity doubles as needed.
+    """
+
+    def __init__(
+        self,
+        code,
+        start_date=None,
+        timezone=None,
+        **kwargs
+        ):
+        import numpy as np
+        try:
+            import pandas as pd
+        except ImportError:
+            raise ImportError("pandas must be installed to use this function")
+
+        self.code = code
+        self.start_date = start_date
+        self.timezone = timezone
+        self.kwargs = kwargs
+
+        self.columns = pd.MultiIndex.from_arrays([[], []], names=["Field", "Sid"])
+        self._values = np.empty((0, 0))
+        self._dates = np.empty(0, dtype="datetime64[ns]")
+        self._num_rows = 0
+
+    def poll(self):
+        """
+        Query bars at or after the latest bar received and append them.
+        Returns True if any bars were received.
+        """
+        import pandas as pd
+
+        start_date = self.start_date
+        if self._num_rows:
+            latest_date = pd.Timestamp(self._dates[self._num_rows - 1])
+            start_date = latest_date.strftime("%Y-%m-%d %H:%M:%S UTC")
+
+        f = io.StringIO()
+        try:
+            download_market_data_file(self.code, f, start_date=start_date, **self.kwargs)
+        except NoRealtimeData:
+            return False
+
+        f.seek(0)
+        bars = pd.read_csv(f)
+        if bars.empty:
+            return False
+
+        bars["Date"] = pd.to_datetime(
+            bars["Date"], utc=True).dt.tz_localize(None).astype("datetime64[ns]")
+        bars = bars.drop_duplicates(subset=["Sid", "Date"], keep="last")
+        bars = bars.pivot(index="Date", columns="Sid")
+        bars.columns.set_names(["Field", "Sid"], inplace=True)
+
+        self.append(bars)
+        return True
+
+    def append(self, bars):
+        """
+        Append bars, a Date x (Field, Sid) DataFrame sorted by date, updating
+        the latest bar if it is included.
+        """
+        import numpy as np
+
+        dates = bars.index.values
+        if self._num_rows:
+            latest_date = self._dates[self._num_rows - 1]
+            bars = bars[dates >= latest_date]
+            dates = bars.index.values
+        if not len(dates):
+            return
+
+        new_columns = bars.columns.difference(self.columns)
+        if len(new_columns):
+            self._add_columns(new_columns)
+
+        values = np.full((len(bars), len(self.columns)), np.nan)
+        values[:, self.columns.get_indexer(bars.columns)] = bars.values.astype(np.float64)
+
+        # refresh the latest bar, keeping values for sids missing from the poll
+        if self._num_rows and dates[0] == self._dates[self._num_rows - 1]:
+            latest = self._values[self._num_rows - 1]
+            self._values[self._num_rows - 1] = np.where(
+                np.isnan(values[0]), latest, values[0])
+            values = values[1:]
+            dates = dates[1:]
+
+        num_rows = self._num_rows + len(dates)
+        if num_rows > len(self._dates):
+            self._resize(max(num_rows, 2 * len(self._dates)))
+
+        self._values[self._num_rows:num_rows] = values
+        self._dates[self._num_rows:num_rows] = dates
+        self._num_rows = num_rows
+
+    def _add_columns(self, new_columns):
+        """
+        Add (Field, Sid) columns, reallocating the values.
+        """
+        import numpy as np
+
+        columns = self.columns.append(new_columns)
+        values = np.full((len(self._dates), len(columns)), np.nan)
+        values[:, :len(self.columns)] = self._values
+        self.columns = columns
+        self._values = values
+
+    def _resize(self, capacity):
+        """
+        Reallocate the values and dates with room for capacity rows.
+        """
+        import numpy as np
+
+        values = np.full((capacity, len(self.columns)), np.nan)
+        values[:self._num_rows] = self._values[:self._num_rows]
+        dates = np.empty(capacity, dtype="datetime64[ns]")
+        dates[:self._num_rows] = self._dates[:self._num_rows]
+        self._values = values
+        self._dates = dates
+
+    def get_prices(self):
+        """
+        Return the bars received so far as a Date x (Field, Sid) DataFrame
+        that is a view of the values.
+        """
+        import pandas as pd
+
+        dates = pd.DatetimeIndex(self._dates[:self._num_rows], name="Date").tz_localize("UTC")
+        if self.timezone:
+            dates = dates.tz_convert(self.timezone)
+
+        return pd.DataFrame(
+            self._values[:self._num_rows], index=dates, columns=self.columns, copy=False)
+
+def stream_market_data(
+    sids: Union[str, list[str]] = None,
+    exclude_sids: Union[str, list[str]] = None,
+    fields: Union[list[ibkr_RealtimeField], list[str]] = None,
+    batch_size: int = 100,
+    batch_timeout: float = 0.1,
+    reconnect: bool = True,
+    max_reconnect_wait: float = 30,
+    ) -> '_MarketDataStream':
+    """
+    Stream incoming market data over a WebSocket connection.
+
+    This function does not cause data to be collected but connects to the
+    stream of data already being collected. The returned stream can be
+    iterated with `for` or, in asynchronous code, with `async for`, and
+    yields lists of tick records. Each tick record is a dict with keys for
+    the sid, date, and streamed fields.
+
+    Requires the websockets package.
+
+    Parameters
+    ----------
+    sids : list of str, optional
+        limit to these sids
+
+    exclude_sids : list of str, optional
+        exclude these sids
+
+    fields : list of str, optional
+        limit to these fields
+
+    batch_size : int
+        yield a batch of tick records once this many have been received.
+        Default 100.
+
+    batch_timeout : float
+        yield a partial batch of tick records once this many seconds have
+        passed since its first record was received. Default 0.1.
+
+    reconnect : bool
+        if the connection is lost, reconnect and resubscribe with exponential
+        backoff (default True). If False, the stream ends when the connection
+        is closed.
+
+    max_reconnect_wait : float
+        maximum number of seconds to wait between reconnection attempts.
+        Default 30.
+
+    Returns
+    -------
+    iterable
+        an iterable and async iterable of lists of tick records
+
+    Notes
+    -----
+    Usage Guide:
+
+    * WebSockets Streaming: https://qrok.it/dl/qr/realtime-stream
+
+    Examples
+    --------
+    Stream bid and ask prices for a sid:
 
-    url = houston.base_url.replace("http", "ws") + "/realtime/stream"
+    >>> for ticks in stream_market_data(sids="FIBBG265598", fields=["BidPrice", "AskPrice"]):
+            for tick in ticks:
+                print(tick["sid"], tick["date"], tick.get("BidPrice"), tick.get("AskPrice"))
+
+    Stream asynchronously:
+
+    >>> async for ticks in stream_market_data(sids="FIBBG265598"):
+            ...
+    """
+    if batch_size < 1:
+        raise ParameterError("batch_size must be at least 1")
+
+    return _MarketDataStream(
+        _get_stream_url(sids=sids, exclude_sids=exclude_sids, fields=fields),
+        batch_size=batch_size,
+        batch_timeout=batch_timeout,
+        reconnect=reconnect,
+        max_reconnect_wait=max_reconnect_wait)
+
+def _get_stream_url(sids=None, exclude_sids=None, fields=None):
+    """
+    Return the WebSocket URL for streaming market data.
+    """
+    url = houston.base_url.replace("http", "ws", 1) + "/realtime/stream"
 
     params = {}
 
@@ -975,19 +1320,845 @@ def _cli_stream_market_data(sids, exclude_sids, fields):
     if params:
         url += "?" + urllib.parse.urlencode(params, doseq=True)
 
+    return url
+
+def _get_stream_headers():
+    """
+    Return the houston headers, including Basic Auth credentials if
+    applicable, for the WebSocket handshake.
+    """
+    headers = dict(houston.headers)
+    if houston.auth:
+        credentials = "{0}:{1}".format(*houston.auth).encode("utf-8")
+        headers["Authorization"] = "Basic " + base64.b64encode(credentials).decode("ascii")
+    return headers
+
+# marks sids with no forming bar in BarAggregator; also NaT as int64
+_NO_BAR = -2**63
+
+class _MarketDataStream(object):
+    """
+    Iterable and async iterable of batches of market data messages received
+    over a WebSocket connection, which is reopened if lost.
+
+    If parse is False, messages are yielded as received, without JSON
+    parsing.
+    """
+
+    def __init__(
+        self,
+        url,
+        batch_size=100,
+        batch_timeout=0.1,
+        reconnect=True,
+        max_reconnect_wait=30,
+        parse=True,
+        ):
+        self.url = url
+        self.batch_size = batch_size
+        self.batch_timeout = batch_timeout
+        self.reconnect = reconnect
+        self.max_reconnect_wait = max_reconnect_wait
+        self.parse = parse
+
+    def _add_message(self, batch, message):
+        """
+        Add the message's tick records to the batch.
+        """
+        if not self.parse:
+            batch.append(message)
+            return
+
+        records = json.loads(message)
+        if isinstance(records, list):
+            batch.extend(records)
+        else:
+            batch.append(records)
+
+    def _get_reconnect_wait(self, reconnect_wait):
+        """
+        Return the next wait between reconnection attempts, doubling the
+        previous wait up to the maximum.
+        """
+        return min(max(reconnect_wait * 2, 1), self.max_reconnect_wait)
+
+    def __iter__(self):
+        try:
+            from websockets.sync.client import connect
+            from websockets.exceptions import ConnectionClosed, ConnectionClosedOK
+        except ImportError:
+            raise ImportError("websockets must be installed to stream market data")
+
+        headers = _get_stream_headers()
+        reconnect_wait = 0
+
+        while True:
+            batch = []
+            try:
+                with connect(self.url, additional_headers=headers) as websocket:
+                    deadline = None
+                    while True:
+                        timeout = max(deadline - time.monotonic(), 0) if batch else None
+                        try:
+                            message = websocket.recv(timeout=timeout)
+                        except TimeoutError:
+                            yield batch
+                            batch = []
+                            continue
+
+                        # only reset the backoff once the connection has
+                        # delivered data, so that a server which accepts and
+                        # then closes the connection isn't retried in a loop
+                        reconnect_wait = 0
+
+                        if not batch:
+                            deadline = time.monotonic() + self.batch_timeout
+                        self._add_message(batch, message)
+
+                        if len(batch) >= self.batch_size:
+                            yield batch
+                            batch = []
+
+            except (ConnectionClosed, OSError) as e:
+                if batch:
+                    yield batch
+                if not self.reconnect:
+                    if isinstance(e, ConnectionClosedOK):
+                        return
+                    raise
+
+            time.sleep(reconnect_wait)
+            reconnect_wait = self._get_reconnect_wait(reconnect_wait)
+
+    def __aiter__(self):
+        return self._aiter()
+
+    async def _aiter(self):
+        import asyncio
+        try:
+            from websockets.asyncio.client import connect
+            from websockets.exceptions import ConnectionClosed, ConnectionClosedOK
+        except ImportError:
+            raise ImportError("websockets must be installed to stream market data")
+
+        headers = _get_stream_headers()
+        reconnect_wait = 0
+
+        while True:
+            batch = []
+            try:
+                async with connect(self.url, additional_headers=headers) as websocket:
+                    deadline = None
+                    while True:
+                        timeout = max(deadline - time.monotonic(), 0) if batch else None
+                        try:
+                            message = await asyncio.wait_for(websocket.recv(), timeout)
+                        except asyncio.TimeoutError:
+                            yield batch
+                            batch = []
+                            continue
+
+                        # only reset the backoff once the connection has
+                        # delivered data, so that a server which accepts and
+                        # then closes the connection isn't retried in a loop
+                        reconnect_wait = 0
+
+                        if not batch:
+                            deadline = time.monotonic() + self.batch_timeout
+                        self._add_message(batch, message)
+
+                        if len(batch) >= self.batch_size:
+                            yield batch
+                            batch = []
+
+            except (ConnectionClosed, OSError) as e:
+                if batch:
+                    yield batch
+                if not self.reconnect:
+                    if isinstance(e, ConnectionClosedOK):
+                        return
+                    raise
+
+            await asyncio.sleep(reconnect_wait)
+            reconnect_wait = self._get_reconnect_wait(reconnect_wait)
+
+class TickBuffer(object):
+    """
+    In-memory buffer of the most recent ticks per sid, for fast access to the
+    latest values and recent ticks without querying the tick database.
+
+    Ticks are stored in preallocated NumPy arrays holding the most recent
+    `capacity` ticks for each sid, so memory use is fixed. Feed the buffer
+    with tick records from `stream_market_data`. Ticks for sids not in the
+    buffer are ignored, and field values must be numeric.
+
+    Snapshots are views of the underlying arrays rather than copies, so they
+    reflect ticks added later; copy them if they need to be retained.
+
+    Parameters
+    ----------
+    sids : list of str, required
+        the sids to buffer ticks for
+
+    fields : list of str, required
+        the fields to buffer
+
+    capacity : int
+        the number of ticks to keep for each sid. Default 10000.
+
+    Notes
+    -----
+    Usage Guide:
+
+    * WebSockets Streaming: https://qrok.it/dl/qr/realtime-stream
+
+    Examples
+    --------
+    Buffer bid and ask prices from the stream in a background thread:
+
+    >>> sids = ["FIBBG000B9XRY4", "FIBBG000BFWKC0"]
+    >>> fields = ["BidPrice", "AskPrice"]
+    >>> buffer = TickBuffer(sids, fields)
+    >>> stream = stream_market_data(sids=sids, fields=fields)
+    >>> thread = threading.Thread(target=buffer.consume, args=(stream,), daemon=True)
+    >>> thread.start()
+
+    Get the latest bid and ask per sid, and the last 30 seconds of ticks for
+    a sid:
+
+    >>> quotes = buffer.get_latest()
+    >>> ticks = buffer.get_ticks("FIBBG000B9XRY4", seconds=30)
+
+    Get the last 30 seconds of ticks as NumPy arrays:
+
+    >>> times, values = buffer.get_arrays("FIBBG000B9XRY4", seconds=30)
+    """
+
+    def __init__(
+        self,
+        sids: Union[list[str], str],
+        fields: Union[list[ibkr_RealtimeField], list[str]],
+        capacity: int = 10000,
+        ):
+        import numpy as np
+
+        if isinstance(sids, str):
+            sids = [sids]
+        if isinstance(fields, str):
+            fields = [fields]
+        if not sids:
+            raise ParameterError("sids is required")
+        if not fields:
+            raise ParameterError("fields is required")
+        if capacity < 1:
+            raise ParameterError("capacity must be at least 1")
+
+        self.sids: list[str] = list(sids)
+        self.fields: list[str] = list(fields)
+        self.capacity: int = capacity
+
+        self._sid_rows = {sid: i for i, sid in enumerate(self.sids)}
+        self._field_cols = {field: i for i, field in enumerate(self.fields)}
+
+        # Each tick is written twice, at slot and slot + capacity, so that the
+        # most recent ticks are always a contiguous slice ending at
+        # position + capacity
+        self._values = np.full(
+            (len(self.sids), 2 * capacity, len(self.fields)), np.nan)
+        self._times = np.zeros((len(self.sids), 2 * capacity), dtype="datetime64[ns]")
+        self._positions = np.zeros(len(self.sids), dtype=np.int64)
+        self._counts = np.zeros(len(self.sids), dtype=np.int64)
+
+        self._latest = np.full((len(self.sids), len(self.fields)), np.nan)
+        self._latest_times = np.full(len(self.sids), np.datetime64("NaT"), dtype="datetime64[ns]")
+
+    def append(self, records: list[dict]) -> None:
+        """
+        Add tick records to the buffer.
+
+        Parameters
+        ----------
+        records : list of dict, required
+            tick records as yielded by `stream_market_data`
+
+        Returns
+        -------
+        None
+        """
+        import numpy as np
+        import pandas as pd
+
+        rows = np.array(
+            [self._sid_rows.get(record.get("sid"), -1) for record in records],
+            dtype=np.int64)
+        are_buffered = rows >= 0
+        if not are_buffered.any():
+            return
+
+        records = [record for record, is_buffered in zip(records, are_buffered) if is_buffered]
+        rows = rows[are_buffered]
+
+        values = np.array(
+            [[record.get(field, np.nan) for field in self.fields] for record in records],
+            dtype=np.float64)
+        times = pd.to_datetime(
+            [record.get("date") for record in records], utc=True
+            ).tz_localize(None).values.astype("datetime64[ns]")
+
+        # number each sid's ticks within the batch
+        num_ticks = len(rows)
+        order = np.argsort(rows, kind="stable")
+        sorted_rows = rows[order]
+        group_starts = np.flatnonzero(np.r_[True, sorted_rows[1:] != sorted_rows[:-1]])
+        group_sizes = np.diff(np.r_[group_starts, num_ticks])
+        tick_nums = np.empty(num_ticks, dtype=np.int64)
+        tick_nums[order] = np.arange(num_ticks) - np.repeat(group_starts, group_sizes)
+
+        batch_counts = np.bincount(rows, minlength=len(self.sids))
+
+        # only the last capacity ticks per sid survive the batch
+        are_kept = tick_nums >= batch_counts[rows] - self.capacity
+        kept_rows = rows[are_kept]
+        slots = (self._positions[kept_rows] + tick_nums[are_kept]) % self.capacity
+        self._values[kept_rows, slots] = values[are_kept]
+        self._values[kept_rows, slots + self.capacity] = values[are_kept]
+        self._times[kept_rows, slots] = times[are_kept]
+        self._times[kept_rows, slots + self.capacity] = times[are_kept]
+
+        self._positions = (self._positions + batch_counts) % self.capacity
+        self._counts = np.minimum(self._counts + batch_counts, self.capacity)
+
+        # latest values are the last non-null value per sid and field
+        reversed_rows = rows[::-1]
+        unique_rows, last_idx = np.unique(reversed_rows, return_index=True)
+        self._latest_times[unique_rows] = times[::-1][last_idx]
+        for col in range(len(self.fields)):
+            field_values = values[::-1, col]
+            have_values = ~np.isnan(field_values)
+            unique_rows, last_idx = np.unique(reversed_rows[have_values], return_index=True)
+            self._latest[unique_rows, col] = field_values[have_values][last_idx]
+
+    def consume(self, stream: Iterable[list[dict]]) -> None:
+        """
+        Add batches of tick records from a stream to the buffer until the
+        stream ends.
+
+        Parameters
+        ----------
+        stream : iterable, required
+            a stream as returned by `stream_market_data`
+
+        Returns
+        -------
+        None
+        """
+        for records in stream:
+            self.append(records)
+
+    def get_latest(self) -> 'pd.DataFrame':
+        """
+        Return the latest value of each field for each sid.
+
+        The DataFrame is a view of the buffer and reflects ticks added later.
+
+        Returns
+        -------
+        DataFrame
+            a DataFrame of latest values, with sids as the index and fields
+            as columns, with NaNs for sids or fields with no ticks
+        """
+        import pandas as pd
+
+        latest = pd.DataFrame(self._latest, index=self.sids, columns=self.fields, copy=False)
+        latest.index.name = "Sid"
+        return latest
+
+    def get_latest_times(self) -> 'pd.Series':
+        """
+        Return the time of the latest tick for each sid.
+
+        Returns
+        -------
+        Series
+            a Series of UTC tick times, indexed by sid, with NaTs for sids
+            with no ticks
+        """
+        import pandas as pd
+
+        return pd.Series(self._latest_times, index=pd.Index(self.sids, name="Sid"), name="Date")
+
+    def get_arrays(
+        self,
+        sid: str,
+        seconds: float = None
+        ) -> tuple['np.ndarray', 'np.ndarray']:
+        """
+        Return the buffered ticks for a sid as NumPy arrays.
+
+        The arrays are views of the buffer, not copies.
+
+        Parameters
+        ----------
+        sid : str, required
+            the sid
+
+        seconds : float, optional
+            limit to ticks from this many seconds before the latest tick in the
+            buffer, for any sid, until now. Ticks for each sid are expected to
+            arrive in time order. Default is all buffered ticks for the sid.
+
+        Returns
+        -------
+        tuple of (ndarray, ndarray)
+            a 1-d array of UTC tick times and a 2-d array of values, with one
+            column per field, ordered from oldest to newest
+        """
+        import numpy as np
+
+        if sid not in self._sid_rows:
+            raise ParameterError("sid {0} is not in the buffer".format(sid))
+
+        row = self._sid_rows[sid]
+        end = self._positions[row] + self.capacity
+        start = end - self._counts[row]
+
+        times = self._times[row, start:end]
+        values = self._values[row, start:end]
+
+        if seconds is not None and len(times):
+            latest_time = np.nanmax(self._latest_times)
+            cutoff = latest_time - np.timedelta64(int(seconds * 1e9), "ns")
+            first = np.searchsorted(times, cutoff, side="left")
+            times = times[first:]
+            values = values[first:]
+
+        return times, values
+
+    def get_ticks(
+        self,
+        sid: str,
+        seconds: float = None
+        ) -> 'pd.DataFrame':
+        """
+        Return the buffered ticks for a sid as a DataFrame.
+
+        Parameters
+        ----------
+        sid : str, required
+            the sid
+
+        seconds : float, optional
+            limit to ticks from this many seconds before the latest tick in the
+            buffer, for any sid, until now. Default is all buffered ticks for
+            the sid.
+
+        Returns
+        -------
+        DataFrame
+            a DataFrame of ticks, with a UTC DatetimeIndex and fields as
+            columns
+        """
+        import pandas as pd
+
+        times, values = self.get_arrays(sid, seconds=seconds)
+        return pd.DataFrame(
+            values, index=pd.DatetimeIndex(times, name="Date"), columns=self.fields, copy=False)
+
+class BarAggregator(object):
+    """
+    Aggregate streamed ticks into OHLCV bars incrementally, without database
+    round trips.
+
+    Feed the aggregator with tick records from `stream_market_data`. For each
+    batch of tick records, the aggregator emits the bars completed by the
+    batch and the partial bars of sids that ticked, either to a callback or
+    through an async iterator.
+
+    Bars contain the Open, High, Low, and Close of the price field, the Sum
+    of the size field as Volume, the volume-weighted average price as Vwap,
+    and the Count of price ticks. Ticks that have a size but no price are
+    assigned the sid's previous price for Vwap. Bars are aligned to UTC
+    midnight and are labeled with their start time. A bar is complete once
+    a tick for any sid arrives at or after its end; ticks that arrive after
+    their bar is complete are ignored.
+
+    Parameters
+    ----------
+    sids : list of str, required
+        the sids to aggregate ticks for. Ticks for other sids are ignored.
+
+    bar_size : str
+        the bar size as a Pandas timedelta string, for example "1s", "5min",
+        or "1h". Default "1min".
+
+    price_field : str
+        the tick field to use for prices. Default "LastPrice".
+
+    size_field : str
+        the tick field to use for volume. Default "LastSize".
+
+    callback : callable, optional
+        function to call with each DataFrame of bars emitted by `append`
+
+    Notes
+    -----
+    Usage Guide:
+
+    * WebSockets Streaming: https://qrok.it/dl/qr/realtime-stream
+
+    Examples
+    --------
+    Print 1-minute bars as they complete:
+
+    >>> sids = ["FIBBG000B9XRY4", "FIBBG000BFWKC0"]
+    >>> def print_bars(bars):
+            print(bars[bars.Complete])
+    >>> aggregator = BarAggregator(sids, bar_size="1min", callback=print_bars)
+    >>> aggregator.consume(stream_market_data(sids=sids, fields=["LastPrice", "LastSize"]))
+
+    Iterate over 5-second bars asynchronously:
+
+    >>> aggregator = BarAggregator(sids, bar_size="5s")
+    >>> async for bars in aggregator.aggregate(stream_market_data(sids=sids)):
+            ...
+    """
+
+    def __init__(
+        self,
+        sids: Union[list[str], str],
+        bar_size: str = "1min",
+        price_field: str = "LastPrice",
+        size_field: str = "LastSize",
+        callback: Callable[['pd.DataFrame'], None] = None,
+        ):
+        import numpy as np
+        try:
+            import pandas as pd
+        except ImportError:
+            raise ImportError("pandas must be installed to use this class")
+
+        if isinstance(sids, str):
+            sids = [sids]
+        if not sids:
+            raise ParameterError("sids is required")
+
+        self.sids: list[str] = list(sids)
+        self.bar_size: 'pd.Timedelta' = pd.Timedelta(bar_size)
+        if self.bar_size <= pd.Timedelta(0):
+            raise ParameterError("bar_size must be positive")
+        self.price_field: str = price_field
+        self.size_field: str = size_field
+        self.callback = callback
+
+        self._sid_rows = {sid: i for i, sid in enumerate(self.sids)}
+        self._sid_array = np.array(self.sids, dtype=object)
+        self._bar_ns = self.bar_size.value
+
+        # state of the forming bar of each sid; bins are bar start times as
+        # int64 nanoseconds, or _NO_BAR if the sid has no forming bar
+        num_sids = len(self.sids)
+        self._bins = np.full(num_sids, _NO_BAR, dtype=np.int64)
+        self._opens = np.full(num_sids, np.nan)
+        self._highs = np.full(num_sids, np.nan)
+        self._lows = np.full(num_sids, np.nan)
+        self._closes = np.full(num_sids, np.nan)
+        self._volumes = np.zeros(num_sids)
+        self._price_volumes = np.zeros(num_sids)
+        self._counts = np.zeros(num_sids, dtype=np.int64)
+        self._last_prices = np.full(num_sids, np.nan)
+        self._stream_time = _NO_BAR
+
+    def append(self, records: list[dict]) -> 'pd.DataFrame':
+        """
+        Aggregate tick records into bars.
+
+        Parameters
+        ----------
+        records : list of dict, required
+            tick records as yielded by `stream_market_data`
+
+        Returns
+        -------
+        DataFrame
+            bars completed by the tick records, followed by the partial bars
+            of sids that ticked, with columns Sid, Date, Open, High, Low,
+            Close, Volume, Vwap, Count, and Complete
+        """
+        import numpy as np
+        import pandas as pd
+
+        times = pd.to_datetime(
+            [record.get("date") for record in records], utc=True
+            ).tz_localize(None).values.astype("datetime64[ns]").view(np.int64)
+        rows = np.array(
+            [self._sid_rows.get(record.get("sid"), -1) for record in records],
+            dtype=np.int64)
+        all_bins = times // self._bar_ns * self._bar_ns
+        # ignore ticks for unknown sids, ticks without dates, and ticks for
+        # bars that are already complete
+        are_aggregated = (
+            (rows >= 0)
+            & (times != _NO_BAR)
+            & (all_bins + self._bar_ns > self._stream_time))
+
+        completed = []
+        touched_rows = np.array([], dtype=np.int64)
+
+        if are_aggregated.any():
+            kept_records = [
+                record for record, is_aggregated in zip(records, are_aggregated)
+                if is_aggregated]
+            prices = np.array(
+                [record.get(self.price_field, np.nan) for record in kept_records],
+                dtype=np.float64)
+            sizes = np.nan_to_num(np.array(
+                [record.get(self.size_field, np.nan) for record in kept_records],
+                dtype=np.float64))
+            rows = rows[are_aggregated]
+            bins = all_bins[are_aggregated]
+
+            # sort by sid, then bar, preserving arrival order
+            order = np.lexsort((bins, rows))
+            rows, bins, prices, sizes = rows[order], bins[order], prices[order], sizes[order]
+            num_ticks = len(rows)
+            positions = np.arange(num_ticks)
+            have_prices = ~np.isnan(prices)
+
+            # price each tick for Vwap with the sid's most recent price
+            are_sid_starts = np.r_[True, rows[1:] != rows[:-1]]
+            sid_starts = np.maximum.accumulate(np.where(are_sid_starts, positions, 0))
+            price_positions = np.maximum.accumulate(np.where(have_prices, positions, -1))
+            vwap_prices = np.where(
+                price_positions >= sid_starts,
+                prices[np.maximum(price_positions, 0)],
+                self._last_prices[rows])
+            price_volumes = np.nan_to_num(vwap_prices * sizes)
+
+            priced_rows = rows[have_prices]
+            if len(priced_rows):
+                are_sid_ends = np.r_[priced_rows[1:] != priced_rows[:-1], True]
+                self._last_prices[priced_rows[are_sid_ends]] = prices[have_prices][are_sid_ends]
+
+            # aggregate each sid's ticks in each bar
+            segment_starts = np.flatnonzero(are_sid_starts | np.r_[True, bins[1:] != bins[:-1]])
+            padded_prices = np.r_[prices, np.nan]
+            segments = (
+                rows[segment_starts],
+                bins[segment_starts],
+                padded_prices[np.minimum.reduceat(
+                    np.where(have_prices, positions, num_ticks), segment_starts)],
+                np.fmax.reduceat(prices, segment_starts),
+                np.fmin.reduceat(prices, segment_starts),
+                padded_prices[np.maximum.reduceat(
+                    np.where(have_prices, positions, -1), segment_starts)],
+                np.add.reduceat(sizes, segment_starts),
+                np.add.reduceat(price_volumes, segment_starts),
+                np.add.reduceat(have_prices.astype(np.int64), segment_starts),
+            )
+            (segment_rows, segment_bins, segment_opens, segment_highs, segment_lows,
+             segment_closes, segment_volumes, segment_price_volumes, segment_counts) = segments
+
+            current_bins = self._bins[segment_rows]
+            are_current = segment_bins == current_bins
+            are_new = segment_bins > current_bins
+
+            # merge ticks for the forming bars
+            merged_rows = segment_rows[are_current]
+            self._opens[merged_rows] = np.where(
+                np.isnan(self._opens[merged_rows]),
+                segment_opens[are_current],
+                self._opens[merged_rows])
+            self._highs[merged_rows] = np.fmax(self._highs[merged_rows], segment_highs[are_current])
+            self._lows[merged_rows] = np.fmin(self._lows[merged_rows], segment_lows[are_current])
+            self._closes[merged_rows] = np.where(
+                np.isnan(segment_closes[are_current]),
+                self._closes[merged_rows],
+                segment_closes[are_current])
+            self._volumes[merged_rows] += segment_volumes[are_current]
+            self._price_volumes[merged_rows] += segment_price_volumes[are_current]
+            self._counts[merged_rows] += segment_counts[are_current]
+
+            # ticks for later bars complete the forming bars; of the new bars,
+            # the last for each sid is forming and the rest are complete
+            new_segments = np.flatnonzero(are_new)
+            new_rows = segment_rows[new_segments]
+            completed.append(self._pop_bars(np.unique(new_rows)))
+            are_last = np.ones(len(new_rows), dtype=bool)
+            are_last[:-1] = new_rows[1:] != new_rows[:-1]
+            completed.append(tuple(
+                values[new_segments[~are_last]] for values in segments))
+            forming = new_segments[are_last]
+            forming_rows = segment_rows[forming]
+            self._bins[forming_rows] = segment_bins[forming]
+            self._opens[forming_rows] = segment_opens[forming]
+            self._highs[forming_rows] = segment_highs[forming]
+            self._lows[forming_rows] = segment_lows[forming]
+            self._closes[forming_rows] = segment_closes[forming]
+            self._volumes[forming_rows] = segment_volumes[forming]
+            self._price_volumes[forming_rows] = segment_price_volumes[forming]
+            self._counts[forming_rows] = segment_counts[forming]
+
+            touched_rows = np.unique(segment_rows[are_current | are_new])
+
+        # bars that ended before the latest tick for any sid are complete
+        valid_times = times[times != _NO_BAR]
+        if len(valid_times):
+            self._stream_time = max(self._stream_time, int(valid_times.max()))
+        have_ended = (self._bins != _NO_BAR) & (self._bins + self._bar_ns <= self._stream_time)
+        completed.append(self._pop_bars(np.flatnonzero(have_ended)))
+
+        touched_rows = touched_rows[self._bins[touched_rows] != _NO_BAR]
+        bars = self._to_frame(completed, [self._get_bars(touched_rows)])
+
+        if self.callback and len(bars):
+            self.callback(bars)
+
+        return bars
+
+    def _get_bars(self, rows):
+        """
+        Return the forming bars of the rows as a tuple of arrays.
+        """
+        return (
+            rows,
+            self._bins[rows],
+            self._opens[rows],
+            self._highs[rows],
+            self._lows[rows],
+            self._closes[rows],
+            self._volumes[rows],
+            self._price_volumes[rows],
+            self._counts[rows],
+        )
+
+    def _pop_bars(self, rows):
+        """
+        Return and clear the forming bars of the rows.
+        """
+        rows = rows[self._bins[rows] != _NO_BAR]
+        bars = self._get_bars(rows)
+        self._bins[rows] = _NO_BAR
+        return bars
+
+    def _to_frame(self, completed, partial):
+        """
+        Return a DataFrame of completed and partial bars from lists of tuples
+        of arrays.
+        """
+        import numpy as np
+        import pandas as pd
+
+        parts = completed + partial
+        (rows, bins, opens, highs, lows, closes, volumes, price_volumes,
+         counts) = [np.concatenate(values) for values in zip(*parts)]
+        num_completed = sum(len(part[0]) for part in completed)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            vwaps = np.where(volumes > 0, price_volumes / volumes, np.nan)
+
+        bars = pd.DataFrame({
+            "Sid": self._sid_array[rows],
+            "Date": bins.view("datetime64[ns]"),
+            "Open": opens,
+            "High": highs,
+            "Low": lows,
+            "Close": closes,
+            "Volume": volumes,
+            "Vwap": vwaps,
+            "Count": counts,
+            "Complete": np.arange(len(rows)) < num_completed,
+        })
+        return bars.sort_values(
+            ["Complete", "Date", "Sid"], ascending=[False, True, True],
+            kind="stable").reset_index(drop=True)
+
+    def get_partial_bars(self) -> 'pd.DataFrame':
+        """
+        Return the forming bars of all sids.
+
+        Returns
+        -------
+        DataFrame
+            partial bars, with columns Sid, Date, Open, High, Low, Close,
+            Volume, Vwap, Count, and Complete
+        """
+        import numpy as np
+
+        rows = np.flatnonzero(self._bins != _NO_BAR)
+        return self._to_frame([], [self._get_bars(rows)])
+
+    def flush(self) -> 'pd.DataFrame':
+        """
+        Complete and return the forming bars of all sids, for example at the
+        end of the session.
+
+        Returns
+        -------
+        DataFrame
+            completed bars, with columns Sid, Date, Open, High, Low, Close,
+            Volume, Vwap, Count, and Complete
+        """
+        import numpy as np
+
+        bars = self._to_frame([self._pop_bars(np.arange(len(self.sids)))], [])
+        if self.callback and len(bars):
+            self.callback(bars)
+        return bars
+
+    def consume(self, stream: Iterable[list[dict]]) -> None:
+        """
+        Aggregate batches of tick records from a stream until the stream
+        ends, passing bars to the callback.
+
+        Parameters
+        ----------
+        stream : iterable, required
+            a stream as returned by `stream_market_data`
+
+        Returns
+        -------
+        None
+        """
+        for records in stream:
+            self.append(records)
+
+    async def aggregate(self, stream: AsyncIterable[list[dict]]) -> AsyncIterator['pd.DataFrame']:
+        """
+        Aggregate batches of tick records from a stream, yielding bars.
+
+        Parameters
+        ----------
+        stream : async iterable, required
+            a stream as returned by `stream_market_data`
+
+        Yields
+        ------
+        DataFrame
+            bars completed by each batch, followed by the partial bars of
+            sids that ticked
+        """
+        async for records in stream:
+            bars = self.append(records)
+            if len(bars):
+                yield bars
+
+def _cli_stream_market_data(sids, exclude_sids, fields):
+
+    stream = _MarketDataStream(
+        _get_stream_url(sids=sids, exclude_sids=exclude_sids, fields=fields),
+        batch_size=1,
+        parse=False)
+
     try:
-        with subprocess.Popen(["wscat", "-c", url],
-                              stdout=subprocess.PIPE,
-                              bufsize=1,
-                              universal_newlines=True) as p:
-            for line in p.stdout:
-                print(line, end='')
-    except FileNotFoundError as e:
-        if "wscat" in repr(e):
+        for messages in stream:
+            for message in messages:
+                print(message, flush=True)
+    except ImportError as e:
+        if "websockets" in repr(e):
             return json_to_cli(lambda: {
                 "status": "error",
-                "msg": "wscat must be installed to stream data "
-                "(install with `npm install -g wscat`)"})
+                "msg": "websockets must be installed to stream data "
+                "(install with `pip install websockets`)"})
         raise
     except KeyboardInterrupt:
         return None, 0